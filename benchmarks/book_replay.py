@@ -0,0 +1,49 @@
+"""
+Replays recorded order book sessions through BookEngine and checks the book after gaps and checksum mismatches.
+
+    python -m benchmarks.book_replay [n]   # fixtures in benchmarks/fixtures, n replays each for messages per second
+
+binance_depth_gap: diff 106-108 skips 104-105, the REST snapshot taken on resync (lastUpdateId 107) ends inside
+the triggering diff, which has to be replayed over it without another resync.
+okx_books_checksum: update with a wrong checksum, resync from REST snapshot, next update chains to its seqId.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from src.book_engine import BinanceDiffFeed, BookEngine, BookFeed, OkxBooksFeed, RecordedSnapshots, TopOfBook, replay
+from src.client import SYMBOLS
+from src.models import SymbolId
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+SESSIONS = {
+    # fixture: (symbol id, feed, initial REST snapshot, expected resyncs, expected top of book)
+    'binance_depth_gap': (SymbolId('BINA_SPOT_BTCUSDT'), BinanceDiffFeed, True, 2, TopOfBook(100.5, 0.3, 100.8, 0.2)),
+    'okx_books_checksum': (SymbolId('OKEX_SPOT_BTC-USDT'), OkxBooksFeed, False, 1, TopOfBook(100., 1.5, 100.7, 0.4)),
+}
+
+
+async def run(name: str, feed: type[BookFeed], symbol_id: SymbolId, initial: bool) -> BookEngine:
+    path = FIXTURES / f'{name}.ndjson'
+    engine = BookEngine(SYMBOLS.by_id(symbol_id), feed(), RecordedSnapshots(path))
+    if initial:
+        await engine.resync()
+    await replay(path, engine)
+    return engine
+
+
+async def main(n: int = 1000) -> None:
+    for name, (symbol_id, feed, initial, resyncs, top) in SESSIONS.items():
+        engine = await run(name, feed, symbol_id, initial)
+        assert engine.resyncs == resyncs, f'{name}: {engine.resyncs} resyncs instead of {resyncs}'
+        assert engine.book.top() == top, f'{name}: {engine.book.top()} instead of {top}'
+        start = time.perf_counter()
+        for _ in range(n):
+            engine = await run(name, feed, symbol_id, initial)
+        seconds = time.perf_counter() - start
+        print(f'{name:<24}ok, {engine.resyncs} resyncs, {n * engine.updates / seconds:,.0f} messages/s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,47 @@
+"""
+Compares binary codec with pydantic JSON path for OHLC lists.
+
+    python -m benchmarks.codec [n_candles]
+"""
+import sys
+import timeit
+
+import pendulum
+from pydantic import parse_raw_as
+
+from src.codec import encode_ohlc, decode_ohlc, OhlcColumns
+from src.enums import TimeFrameEnum
+from src.models import OHLC, SymbolId
+
+
+def sample_ohlc(n: int) -> list[OHLC]:
+    start = pendulum.datetime(2022, 1, 1)
+    return [OHLC(period=start.add(minutes=i), open=40_000 + i, high=40_010 + i, low=39_990 + i, close=40_005 + i)
+            for i in range(n)]
+
+
+def report(name: str, statement, number: int) -> float:
+    seconds = min(timeit.repeat(statement, number=number, repeat=5)) / number
+    print(f'{name:<28}{seconds * 1000:>10.3f} ms')
+    return seconds
+
+
+def main(n: int = 10_000) -> None:
+    ohlc = sample_ohlc(n)
+    symbol_id = SymbolId('BINA_SPOT_BTCUSDT')
+    as_json = '[' + ','.join(o.json() for o in ohlc) + ']'
+    as_binary = encode_ohlc(ohlc, symbol_id, TimeFrameEnum.MINUTE)
+    print(f'{n} candles, json {len(as_json):,} B, binary {len(as_binary):,} B '
+          f'({len(as_json) / len(as_binary):.1f}x smaller)')
+    number = 10
+    json_encode = report('json encode', lambda: '[' + ','.join(o.json() for o in ohlc) + ']', number)
+    binary_encode = report('binary encode', lambda: encode_ohlc(ohlc, symbol_id, TimeFrameEnum.MINUTE), number)
+    json_decode = report('json decode', lambda: parse_raw_as(list[OHLC], as_json), number)
+    binary_decode = report('binary decode (models)', lambda: decode_ohlc(as_binary), number)
+    columns_decode = report('binary decode (columns)', lambda: OhlcColumns.decode(as_binary), number)
+    print(f'encode speedup {json_encode / binary_encode:.1f}x, decode speedup {json_decode / binary_decode:.1f}x '
+          f'(models), {json_decode / columns_decode:.0f}x (columns)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
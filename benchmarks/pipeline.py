@@ -0,0 +1,72 @@
+"""
+End to end benchmark of client.get_ohlc -> _fetch_endpoint -> parsers -> utils.get_median_ohlc without network.
+
+    python -m benchmarks.pipeline record recordings/ohlc             # one pass against venues, saved to disk
+    python -m benchmarks.pipeline replay recordings/ohlc [n] [speed]  # n passes served from disk
+"""
+import asyncio
+import sys
+import time
+from collections import defaultdict
+
+from src import client
+from src.enums import SymbolTypeEnum, TimeFrameEnum
+from src.replay import recording, replaying
+from utils import get_median_ohlc
+
+SYMBOL_TYPE = SymbolTypeEnum.SPOT
+TIMEFRAME = TimeFrameEnum.MINUTE
+
+
+async def timed(coroutine) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = await coroutine
+    return time.perf_counter() - start, result
+
+
+async def run_pipeline(latencies: dict[str, list[float]]) -> None:
+    exchange_ids = [exchange_id for exchange_id, venue in client.CLIENTS.items()
+                    if venue.SYMBOLS.find(symbol_type=SYMBOL_TYPE)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed(client.get_ohlc(exchange_id, SYMBOL_TYPE, TIMEFRAME))
+                                     for exchange_id in exchange_ids), return_exceptions=True)
+    ohlc = []
+    for exchange_id, result in zip(exchange_ids, results):
+        if isinstance(result, tuple) and result[1]:
+            latencies[exchange_id.value].append(result[0])
+            ohlc.extend(result[1])
+    median_start = time.perf_counter()
+    get_median_ohlc(ohlc)
+    latencies['median'].append(time.perf_counter() - median_start)
+    latencies['pipeline'].append(time.perf_counter() - start)
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+async def main(mode: str, root: str, n: int = 20, speed: float = float('inf')) -> None:
+    latencies = defaultdict(list)
+    if mode == 'record':
+        with recording(root) as transport:
+            await run_pipeline(latencies)
+            await transport.close()
+        print(f'recorded to {root}')
+        return
+    with replaying(root, speed) as replayer:
+        print(f'{len(replayer)} recorded responses, speed {speed}')
+        start = time.perf_counter()
+        for _ in range(n):
+            await run_pipeline(latencies)
+        duration = time.perf_counter() - start
+    print(f'{n} pipelines in {duration:.2f}s, {n / duration:.1f} pipelines/s, {replayer.misses} misses')
+    print(f'{"":<10}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"n":>6}')
+    for name, values in sorted(latencies.items()):
+        print(f'{name:<10}' + ''.join(f'{percentile(values, p) * 1000:>10.1f}' for p in (.5, .9, .99))
+              + f'{len(values):>6}')
+
+
+if __name__ == '__main__':
+    mode, root, *args = sys.argv[1:]
+    asyncio.run(main(mode, root, *(int(args[0]),) if args else (), *(float(args[1]),) if len(args) > 1 else ()))
@@ -0,0 +1,471 @@
+"""
+Incremental order book maintenance from websocket diffs.
+
+Transport agnostic: decoded websocket messages are passed to BookEngine.handle, which applies them through
+a venue feed (Binance depth diffs, OKX books with CRC32 checksum, Bybit L2 deltas, BitMEX L2). Gaps and checksum
+mismatches trigger resync from REST snapshot (raw response of the venue _fetch_orderbook). Top of book
+changes are published to async subscribers.
+
+    engine = BookEngine.for_venue(Binance.SPOT, symbol, BinanceDiffFeed())
+    async for top in engine.top_of_book(): ...
+    ...
+    await engine.handle(json.loads(ws_message))
+
+Recorded sessions (messages and the REST snapshots fetched meanwhile) are replayed offline:
+
+    engine = BookEngine(symbol, BinanceDiffFeed(), RecordedSnapshots(path))
+    await engine.resync()
+    await replay(path, engine)
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import itertools
+import json
+import time
+import zlib
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, NamedTuple
+
+from loguru import logger
+
+from src.models import OrderBook, Symbol
+
+
+class BookGap(Exception):
+    """Missed update, book has to be resynced."""
+
+
+class ChecksumMismatch(BookGap):
+    pass
+
+
+class TopOfBook(NamedTuple):
+    bid: float | None
+    bid_size: float | None
+    ask: float | None
+    ask_size: float | None
+
+
+class _BookSide:
+    """Price levels of one side, sorted keys for best level lookup and dict for sizes (and raw strings)."""
+
+    def __init__(self, descending: bool) -> None:
+        self._sign = -1 if descending else 1
+        self._keys: list[float] = []  # sign * price, ascending, i.e. best level first
+        self.sizes: dict[float, float] = {}
+        self.raw: dict[float, tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self.sizes.clear()
+        self.raw.clear()
+
+    def set(self, price: float | str, size: float | str) -> None:
+        p, s = float(price), float(size)
+        key = self._sign * p
+        if s == 0:
+            if self.sizes.pop(p, None) is not None:
+                del self._keys[bisect_left(self._keys, key)]
+                self.raw.pop(p, None)
+            return
+        if p not in self.sizes:
+            insort(self._keys, key)
+        self.sizes[p] = s
+        if isinstance(price, str) and isinstance(size, str):
+            self.raw[p] = (price, size)
+
+    def best(self) -> tuple[float | None, float | None]:
+        if not self._keys:
+            return None, None
+        p = self._sign * self._keys[0]
+        return p, self.sizes[p]
+
+    def prices(self, depth: int | None = None) -> Iterable[float]:
+        return (self._sign * key for key in self._keys[:depth])
+
+
+class LiveBook:
+
+    def __init__(self) -> None:
+        self.bids = _BookSide(descending=True)
+        self.asks = _BookSide(descending=False)
+
+    def clear(self) -> None:
+        self.bids.clear()
+        self.asks.clear()
+
+    def load(self, bids: Iterable, asks: Iterable) -> None:
+        self.clear()
+        for level in bids:
+            self.bids.set(level[0], level[1])
+        for level in asks:
+            self.asks.set(level[0], level[1])
+
+    def top(self) -> TopOfBook:
+        return TopOfBook(*self.bids.best(), *self.asks.best())
+
+    def snapshot(self, depth: int | None = None, **kwargs) -> OrderBook:
+        bid_prices = array('d', self.bids.prices(depth))
+        ask_prices = array('d', self.asks.prices(depth))
+        return OrderBook(bid_prices, array('d', (self.bids.sizes[p] for p in bid_prices)),
+                         ask_prices, array('d', (self.asks.sizes[p] for p in ask_prices)), **kwargs)
+
+
+##################
+# Venue feeds
+##################
+class BookFeed(abc.ABC):
+
+    def __init__(self) -> None:
+        self.book = LiveBook()
+        self.synced = False
+
+    @abc.abstractmethod
+    def load_snapshot(self, response: Any) -> None:
+        """Loads raw REST snapshot (response of venue _fetch_orderbook)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def apply(self, message: Any) -> None:
+        """Applies websocket message, raises BookGap when book can not be trusted anymore."""
+        raise NotImplementedError
+
+
+class BinanceDiffFeed(BookFeed):
+    """
+    <symbol>@depth streams. Diffs are buffered until REST snapshot is loaded, then applied from lastUpdateId.
+    https://binance-docs.github.io/apidocs/spot/en/#how-to-manage-a-local-order-book-correctly
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._last_update_id: int | None = None
+        self._buffer: list[dict] = []
+
+    def load_snapshot(self, response: dict) -> None:
+        self.book.load(response['bids'], response['asks'])
+        self._last_update_id = response['lastUpdateId']
+        self.synced = False
+        buffered, self._buffer = self._buffer, []
+        for message in buffered:
+            self.apply(message)
+
+    def apply(self, message: dict) -> None:
+        message = message.get('data', message)  # combined stream envelope
+        if self._last_update_id is None:
+            self._buffer.append(message)
+            return
+        first, last = message['U'], message['u']
+        if last <= self._last_update_id:
+            return
+        if not self.synced:
+            if not first <= self._last_update_id + 1 <= last:
+                raise BookGap(f'diff {first}-{last} does not follow snapshot {self._last_update_id}')
+        elif 'pu' in message:  # futures chain diffs by previous final update id
+            if message['pu'] != self._last_update_id:
+                raise BookGap(f'diff pu {message["pu"]} != {self._last_update_id}')
+        elif first != self._last_update_id + 1:
+            raise BookGap(f'diff {first} != {self._last_update_id} + 1')
+        for price, size in message['b']:
+            self.book.bids.set(price, size)
+        for price, size in message['a']:
+            self.book.asks.set(price, size)
+        self._last_update_id = last
+        self.synced = True
+
+    def reset(self) -> None:
+        self._last_update_id = None
+
+
+class OkxBooksFeed(BookFeed):
+    """
+    `books` channel, snapshot + incremental updates validated by CRC32 of top 25 levels.
+    https://www.okx.com/docs-v5/en/#websocket-api-public-channel-order-book-channel
+    """
+    CHECKSUM_DEPTH = 25
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._seq_id: int | None = None
+
+    def load_snapshot(self, response: dict) -> None:
+        data = response['data'][0]
+        self.book.load(data['bids'], data['asks'])
+        self._seq_id = data.get('seqId')
+        self.synced = True
+
+    def checksum(self) -> int:
+        bids, asks = self.book.bids, self.book.asks
+        bid_prices = list(bids.prices(self.CHECKSUM_DEPTH))
+        ask_prices = list(asks.prices(self.CHECKSUM_DEPTH))
+        parts = []
+
+        def raw(side: _BookSide, price: float) -> tuple[str, str]:
+            return side.raw.get(price) or (str(price), str(side.sizes[price]))
+
+        for i in range(max(len(bid_prices), len(ask_prices))):
+            if i < len(bid_prices):
+                parts.extend(raw(bids, bid_prices[i]))
+            if i < len(ask_prices):
+                parts.extend(raw(asks, ask_prices[i]))
+        crc = zlib.crc32(':'.join(parts).encode())
+        return crc - (1 << 32) if crc >= 1 << 31 else crc
+
+    def apply(self, message: dict) -> None:
+        if 'data' not in message:  # subscription events
+            return
+        data = message['data'][0]
+        if message.get('action') == 'snapshot':
+            self.book.load(data['bids'], data['asks'])
+            self.synced = True
+        else:
+            if not self.synced:
+                raise BookGap('update before snapshot')
+            if self._seq_id is not None and data.get('prevSeqId') not in (None, self._seq_id):
+                raise BookGap(f'prevSeqId {data.get("prevSeqId")} != {self._seq_id}')
+            for level in data['bids']:
+                self.book.bids.set(level[0], level[1])
+            for level in data['asks']:
+                self.book.asks.set(level[0], level[1])
+        self._seq_id = data.get('seqId')
+        if 'checksum' in data and self.checksum() != data['checksum']:
+            self.synced = False
+            raise ChecksumMismatch(f'checksum {self.checksum()} != {data["checksum"]}')
+
+
+class BybitDeltaFeed(BookFeed):
+    """
+    orderBookL2_25 / orderBook_200 topics, snapshot and delete / update / insert deltas.
+    https://bybit-exchange.github.io/docs/inverse/#t-websocketorderbook25
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._sequence: int | None = None
+
+    def _set(self, level: dict, delete: bool = False) -> None:
+        side = self.book.bids if level['side'] == 'Buy' else self.book.asks
+        side.set(level['price'], 0 if delete else level['size'])
+
+    def load_snapshot(self, response: dict) -> None:
+        self.book.clear()
+        for level in response['result']:
+            self._set(level)
+        self._sequence = None
+        self.synced = True
+
+    def apply(self, message: dict) -> None:
+        if 'data' not in message:
+            return
+        data = message['data']
+        sequence = message.get('cross_seq')
+        if message.get('type') == 'snapshot':
+            self.book.clear()
+            for level in data['order_book'] if isinstance(data, dict) else data:
+                self._set(level)
+            self.synced = True
+        else:
+            if not self.synced:
+                raise BookGap('delta before snapshot')
+            if sequence is not None and self._sequence is not None and sequence < self._sequence:
+                raise BookGap(f'cross_seq {sequence} went back from {self._sequence}')
+            for level in data.get('delete', ()):
+                self._set(level, delete=True)
+            for level in itertools.chain(data.get('update', ()), data.get('insert', ())):
+                self._set(level)
+        self._sequence = sequence if sequence is not None else self._sequence
+
+
+class BitmexL2Feed(BookFeed):
+    """
+    orderBookL2 / orderBookL2_25 tables, partial then insert / update / delete keyed by level id.
+    https://www.bitmex.com/app/wsAPI#OrderBookL2
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._levels: dict[int, tuple[str, float]] = {}  # id -> (side, price)
+
+    def _insert(self, levels: Iterable[dict]) -> None:
+        for level in levels:
+            self._levels[level['id']] = (level['side'], level['price'])
+            (self.book.bids if level['side'] == 'Buy' else self.book.asks).set(level['price'], level['size'])
+
+    def load_snapshot(self, response: list[dict]) -> None:
+        self.book.clear()
+        self._levels.clear()
+        self._insert(response)
+        self.synced = True
+
+    def apply(self, message: dict) -> None:
+        action = message.get('action')
+        if action is None:
+            return
+        if action == 'partial':
+            self.load_snapshot(message['data'])
+            return
+        if not self.synced:
+            raise BookGap(f'{action} before partial')
+        if action == 'insert':
+            self._insert(message['data'])
+            return
+        for level in message['data']:
+            if level['id'] not in self._levels:
+                raise BookGap(f'{action} of unknown level {level["id"]}')
+            side, price = self._levels[level['id']]
+            if action == 'delete':
+                del self._levels[level['id']]
+            (self.book.bids if side == 'Buy' else self.book.asks).set(price, 0 if action == 'delete' else level['size'])
+
+
+##################
+# Engine
+##################
+class BookEngine:
+
+    def __init__(self, symbol: Symbol, feed: BookFeed, fetch_snapshot: Callable[[], Awaitable[Any]] | None = None,
+                 max_resyncs: int = 10) -> None:
+        """
+        :param fetch_snapshot: coroutine function returning raw REST snapshot for the feed, None for feeds
+            sending snapshots over websocket (resync then waits for the next snapshot / resubscription)
+        :param max_resyncs: consecutive resyncs (without a message applied in between) before giving up
+        """
+        self.symbol = symbol
+        self.feed = feed
+        self._fetch_snapshot = fetch_snapshot
+        self._subscribers: set[asyncio.Queue] = set()
+        self._top: TopOfBook | None = None
+        self._resync_lock = asyncio.Lock()
+        self.max_resyncs = max_resyncs
+        self.resyncs = 0
+        self._failed_resyncs = 0  # since the last applied message
+        self.updates = 0
+
+    @classmethod
+    def for_venue(cls, venue: Any, symbol: Symbol, feed: BookFeed, depth: int = 1000) -> BookEngine:
+        """Engine resyncing from venue REST order book (see BaseExchange._fetch_orderbook)."""
+        return cls(symbol, feed, lambda: venue._fetch_orderbook(symbol, depth))
+
+    @property
+    def book(self) -> LiveBook:
+        return self.feed.book
+
+    def snapshot(self, depth: int | None = None) -> OrderBook:
+        return self.feed.book.snapshot(depth, symbol_id=self.symbol.id)
+
+    async def resync(self, message: Any = None) -> None:
+        """
+        :param message: message that triggered the resync, diff feeds replay it over the snapshot (it may end
+            after the snapshot lastUpdateId)
+        """
+        async with self._resync_lock:
+            self.resyncs += 1
+            if self._fetch_snapshot is None:
+                self.feed.synced = False
+                return
+            if isinstance(self.feed, BinanceDiffFeed):
+                self.feed.reset()  # buffer diffs while snapshot is being fetched
+                if message is not None:
+                    self.feed.apply(message)
+            response = await self._fetch_snapshot()
+            if response is None:
+                raise BookGap(f'{self.symbol.id} snapshot not available')
+            self.feed.load_snapshot(response)
+            self._publish()
+
+    async def handle(self, message: Any) -> None:
+        try:
+            self.feed.apply(message)
+        except BookGap as e:
+            logger.warning(f'{self.symbol.id} {e}, resyncing')
+            if self._failed_resyncs >= self.max_resyncs:
+                raise
+            self._failed_resyncs += 1
+            try:
+                await self.resync(message)
+            except BookGap as e:  # e.g. buffered diffs not connecting to the snapshot, next message resyncs again
+                logger.warning(f'{self.symbol.id} {e} after resync')
+            # other feeds drop the triggering message, the snapshot supersedes it and sequence checked feeds would
+            # not accept it over a snapshot without sequence anyway
+            return
+        self._failed_resyncs = 0
+        self.updates += 1
+        self._publish()
+
+    def _publish(self) -> None:
+        top = self.feed.book.top()
+        if top == self._top:
+            return
+        self._top = top
+        for queue in self._subscribers:
+            # conflate, slow subscriber gets the latest top of book only
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(top)
+
+    async def top_of_book(self) -> AsyncIterator[TopOfBook]:
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        try:
+            if self._top is not None:
+                queue.put_nowait(self._top)
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+
+##################
+# Replay harness
+##################
+class MessageRecorder:
+    """Appends websocket messages with receive time to newline delimited JSON for later replay."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._file = open(path, 'a')
+
+    def __call__(self, message: Any) -> None:
+        self._file.write(json.dumps({'t': time.time(), 'message': message}) + '\n')
+
+    def snapshot(self, response: Any) -> None:
+        """Records REST snapshot, served back by RecordedSnapshots on replay."""
+        self._file.write(json.dumps({'t': time.time(), 'snapshot': response}) + '\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class RecordedSnapshots:
+    """fetch_snapshot of BookEngine serving the recorded REST snapshots in recorded order, None when exhausted."""
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path) as f:
+            self._snapshots = deque(record['snapshot'] for record in map(json.loads, f) if 'snapshot' in record)
+
+    async def __call__(self) -> Any:
+        return self._snapshots.popleft() if self._snapshots else None
+
+
+async def replay(path: str | Path, engine: BookEngine, speed: float = float('inf')) -> int:
+    """Feeds recorded messages into engine (at recorded pace divided by speed), returns number of messages."""
+    n = 0
+    previous = None
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if 'message' not in record:  # snapshots are served by RecordedSnapshots
+                continue
+            if previous is not None and speed != float('inf'):
+                await asyncio.sleep(max(0., record['t'] - previous) / speed)
+            previous = record['t']
+            await engine.handle(record['message'])
+            n += 1
+    return n
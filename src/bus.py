@@ -0,0 +1,185 @@
+"""
+In-process async pub/sub of market data updates.
+
+Topics are (ProductEnum, SymbolId). Every subscriber has its own bounded queue, overflow is handled by its
+OverflowPolicyEnum, so one slow consumer does not hold back the others (unless it asks for BLOCK). The published
+Message is shared by all the subscribers, nothing is copied.
+
+    bus = Bus()
+    asyncio.create_task(poll_into(bus, symbols))
+    async with bus.subscribe(ProductEnum.OHLC, policy=OverflowPolicyEnum.CONFLATE) as subscription:
+        async for message in subscription:
+            message.symbol_id, message.payload
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from collections import OrderedDict, deque
+from typing import Any, NamedTuple
+
+from loguru import logger
+
+from src import client
+from src.enums import OverflowPolicyEnum, ProductEnum, SymbolTypeEnum, TimeFrameEnum
+from src.models import Symbol, SymbolId
+
+Topic = tuple[ProductEnum | None, SymbolId | None]  # None matches any
+
+
+class Message(NamedTuple):
+    product: ProductEnum
+    symbol_id: SymbolId
+    payload: Any
+
+
+class Subscription:
+
+    def __init__(self, bus: Bus, topic: Topic, policy: OverflowPolicyEnum, maxsize: int) -> None:
+        self.topic = topic
+        self.policy = policy
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._bus = bus
+        self._queue: deque[Message] = deque()
+        self._latest: OrderedDict[tuple[ProductEnum, SymbolId], Message] = OrderedDict()  # CONFLATE only
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._latest) if self.policy == OverflowPolicyEnum.CONFLATE else len(self._queue)
+
+    async def __aenter__(self) -> Subscription:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> Message:
+        if (message := await self.get()) is None:
+            raise StopAsyncIteration
+        return message
+
+    async def put(self, message: Message) -> None:
+        match self.policy:
+            case OverflowPolicyEnum.CONFLATE:
+                key = message.product, message.symbol_id
+                if key in self._latest:
+                    self.dropped += 1
+                elif len(self._latest) >= self.maxsize:
+                    self._latest.popitem(last=False)
+                    self.dropped += 1
+                self._latest[key] = message  # replaced value keeps its place in line
+            case OverflowPolicyEnum.DROP_OLDEST:
+                if len(self._queue) >= self.maxsize:
+                    self._queue.popleft()
+                    self.dropped += 1
+                self._queue.append(message)
+            case OverflowPolicyEnum.BLOCK:
+                while len(self._queue) >= self.maxsize and not self._closed:
+                    self._writable.clear()
+                    await self._writable.wait()
+                if self._closed:
+                    return
+                self._queue.append(message)
+        self._readable.set()
+
+    async def get(self) -> Message | None:
+        """Next message, None once closed."""
+        while not len(self):
+            if self._closed:
+                return None
+            self._readable.clear()
+            await self._readable.wait()
+        if self.policy == OverflowPolicyEnum.CONFLATE:
+            return self._latest.popitem(last=False)[1]
+        message = self._queue.popleft()
+        self._writable.set()
+        return message
+
+    def close(self) -> None:
+        self._closed = True
+        self._bus._unsubscribe(self)
+        self._readable.set()
+        self._writable.set()
+
+
+class Bus:
+
+    def __init__(self) -> None:
+        self._subscriptions: dict[Topic, list[Subscription]] = {}
+
+    def subscribe(self, product: ProductEnum | None = None, symbol_id: SymbolId | None = None,
+                  policy: OverflowPolicyEnum = OverflowPolicyEnum.DROP_OLDEST, maxsize: int = 1000) -> Subscription:
+        subscription = Subscription(self, (product, symbol_id), policy, maxsize)
+        self._subscriptions.setdefault(subscription.topic, []).append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in (subscriptions := self._subscriptions.get(subscription.topic, [])):
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.topic]
+
+    def subscribers(self, product: ProductEnum, symbol_id: SymbolId) -> list[Subscription]:
+        return [subscription for topic in ((product, symbol_id), (product, None), (None, symbol_id), (None, None))
+                for subscription in self._subscriptions.get(topic, ())]
+
+    async def publish(self, product: ProductEnum, symbol_id: SymbolId, payload: Any) -> int:
+        """Delivers payload to all the matching subscribers, returns their count."""
+        message = Message(product, symbol_id, payload)
+        subscriptions = self.subscribers(product, symbol_id)
+        blocking = []
+        for subscription in subscriptions:
+            if subscription.policy == OverflowPolicyEnum.BLOCK:
+                blocking.append(subscription.put(message))
+            else:
+                await subscription.put(message)  # never waits
+        if blocking:
+            await asyncio.gather(*blocking)
+        return len(subscriptions)
+
+
+async def poll_into(bus: Bus, symbols: list[Symbol], interval: float = 5.,
+                    timeframe: TimeFrameEnum = TimeFrameEnum.MINUTE) -> None:
+    """
+    Single poll loop publishing new closed candles (OHLC) and funding rates (FUNDING) one by one and every running
+    funding (RUNNING_FUNDING) of symbols. The first fetch of a symbol publishes only its latest candle and funding
+    rate, not the whole history venues return. Runs until cancelled.
+    """
+    last_period: dict[SymbolId, dt.datetime] = {}
+    last_funding: dict[SymbolId, dt.datetime] = {}
+
+    def newer(items: list, key: str, last: dict[SymbolId, dt.datetime], symbol_id: SymbolId) -> list:
+        items = sorted(items, key=lambda item: getattr(item, key))
+        if symbol_id not in last:
+            items = items[-1:]
+        return [item for item in items if symbol_id not in last or getattr(item, key) > last[symbol_id]]
+
+    async def poll(symbol: Symbol) -> None:
+        kwargs = {'base': symbol.base}
+        ohlc = await client.get_ohlc(symbol.exchange_id, symbol.symbol_type, timeframe, **kwargs) or []
+        for o in newer(ohlc, 'period', last_period, symbol.id):
+            last_period[symbol.id] = o.period
+            await bus.publish(ProductEnum.OHLC, symbol.id, o)
+        if symbol.symbol_type != SymbolTypeEnum.SPOT:
+            fundings = await client.get_funding(symbol.exchange_id, symbol.symbol_type, **kwargs) or []
+            for funding in newer(fundings, 'timestamp', last_funding, symbol.id):
+                last_funding[symbol.id] = funding.timestamp
+                await bus.publish(ProductEnum.FUNDING, symbol.id, funding)
+            running_funding = await client.get_running_funding(symbol.exchange_id, symbol.symbol_type, **kwargs)
+            if running_funding is not None:
+                await bus.publish(ProductEnum.RUNNING_FUNDING, symbol.id, running_funding)
+
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        for symbol, result in zip(symbols, await asyncio.gather(*map(poll, symbols), return_exceptions=True)):
+            if isinstance(result, Exception) and not isinstance(result, NotImplementedError):
+                logger.warning(f'Bus poll {symbol.id}: {result!r}')
+        await asyncio.sleep(max(0., interval - (loop.time() - started)))
@@ -1,7 +1,17 @@
-from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum
+import asyncio
+import functools
+import operator
+import os
+
+from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum, AssetEnum
 from src.exchanges import Binance, Bitfinex, Bitstamp, Bitmex, Bybit, Coinbase, Deribit, Ftx, Huobi, Kraken, Okex, \
     Phemex
-from src.models import OHLC, FundingRate
+from src.models import OHLC, FundingRate, SymbolSet, OrderBook, Trade, MarkPrice, OpenInterest
+from src.models.funding_rate import RunningFundingRate
+from src.coordinator import CoordinatorClient
+from src.monitor import MONITOR
+from src.quality import VenueQuality
+from src.ratelimit import RATE_LIMITER
 
 CLIENTS = {
     ExchangeEnum.BINANCE: Binance(),
@@ -18,6 +28,13 @@ CLIENTS = {
     ExchangeEnum.PHEMEX: Phemex(),
 }
 
+SYMBOLS: SymbolSet = functools.reduce(operator.add, (client.SYMBOLS for client in CLIENTS.values()))
+
+QUALITY = VenueQuality()
+
+if os.environ.get('HB_RATELIMIT_SOCKET'):
+    RATE_LIMITER.use_coordinator(CoordinatorClient())
+
 
 async def get_ohlc(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum, **kwargs) -> list[
     OHLC]:
@@ -28,5 +45,65 @@ async def get_funding(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum, **
     return await CLIENTS[exchange_id].get_funding(symbol_type, **kwargs)
 
 
-async def get_running_funding(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum) -> FundingRate:
-    return await CLIENTS[exchange_id].get_running_funding(symbol_type)
+async def get_running_funding(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum,
+                              base: AssetEnum = AssetEnum.BTC) -> RunningFundingRate:
+    return await CLIENTS[exchange_id].get_running_funding(symbol_type, base=base)
+
+
+async def get_running_fundings(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum,
+                               bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
+    return await CLIENTS[exchange_id].get_running_fundings(symbol_type, bases)
+
+
+async def get_mark_price(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum, **kwargs) -> MarkPrice:
+    return await CLIENTS[exchange_id].get_mark_price(symbol_type, **kwargs)
+
+
+async def get_open_interest(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum, **kwargs) -> OpenInterest:
+    return await CLIENTS[exchange_id].get_open_interest(symbol_type, **kwargs)
+
+
+async def get_composite_ohlc(symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum,
+                             exchange_ids: list[ExchangeEnum] = None, quality: VenueQuality = QUALITY,
+                             **kwargs) -> list[OHLC]:
+    """Returns quality weighted median OHLC across venues. Chronically bad venues are not fetched at all."""
+    exchange_ids = [exchange_id for exchange_id in (exchange_ids or CLIENTS) if not quality.should_skip(exchange_id)]
+    fetched = await asyncio.gather(*(get_ohlc(exchange_id, symbol_type, timeframe, **kwargs)
+                                     for exchange_id in exchange_ids), return_exceptions=True)
+    # failed and empty venues are kept with no candles, so they are scored as stale
+    ohlc_by_venue = {exchange_id: ohlc if isinstance(ohlc, list) else []
+                     for exchange_id, ohlc in zip(exchange_ids, fetched)}
+    return quality.median_ohlc(ohlc_by_venue)
+
+
+async def sync_clocks() -> None:
+    """Samples server time of all the venues providing server time endpoint."""
+    await asyncio.gather(*(client.sync_clock() for client in CLIENTS.values()))
+
+
+def get_runtime_snapshot() -> dict:
+    """Event loop lag, requests in flight, open clients, I/O vs parsing time per venue and limiter queues."""
+    return MONITOR.snapshot()
+
+
+async def get_orderbook(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum, **kwargs) -> OrderBook:
+    return await CLIENTS[exchange_id].get_orderbook(symbol_type, **kwargs)
+
+
+async def get_orderbooks(symbol_type: SymbolTypeEnum, exchange_ids: list[ExchangeEnum] = None, timeout: float = 0.8,
+                         **kwargs) -> dict[ExchangeEnum, OrderBook]:
+    """Fan-out order book snapshot, venues not responding within timeout (in seconds) are left out."""
+    exchange_ids = [exchange_id for exchange_id in (exchange_ids or CLIENTS)
+                    if CLIENTS[exchange_id].SYMBOLS.find(symbol_type=symbol_type)]
+    tasks = {asyncio.create_task(get_orderbook(exchange_id, symbol_type, **kwargs)): exchange_id
+             for exchange_id in exchange_ids}
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    return {tasks[task]: task.result() for task in done if not task.exception() and task.result() is not None}
+
+
+async def get_trades(exchange_id: ExchangeEnum, symbol_type: SymbolTypeEnum, **kwargs) -> list[Trade]:
+    return await CLIENTS[exchange_id].get_trades(symbol_type, **kwargs)
@@ -0,0 +1,60 @@
+"""
+Per venue clock offset estimation.
+
+Every request is a sample: the server time (from server time endpoint or response `Date` header) is compared
+with the local midpoint of the request. Samples with the smallest round trip (+ timestamp resolution)
+bound the offset the best, so the offset is taken from the most precise recent sample (NTP clock filter).
+Second resolution `Date` headers are kept in their own window and used only until a precise sample exists.
+Clocks are per host (API base path), spot and derivatives hosts of a venue may differ.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
+from typing import Hashable
+
+import pendulum
+
+
+class ClockOffset:
+
+    def __init__(self, window: int = 32) -> None:
+        # (uncertainty, offset) in seconds
+        self._precise: deque[tuple[float, float]] = deque(maxlen=window)
+        self._coarse: deque[tuple[float, float]] = deque(maxlen=window)
+        self._offset = 0.
+
+    @property
+    def offset(self) -> float:
+        """Server time minus local time in seconds."""
+        return self._offset
+
+    def add_sample(self, server_time: dt.datetime, sent: float, received: float, resolution: float = 0.001,
+                   coarse: bool = False) -> None:
+        """
+        :param server_time: server time, truncated to resolution
+        :param sent: local unix time when request was sent
+        :param received: local unix time when response was received
+        :param resolution: resolution of server time in seconds
+        :param coarse: sample of the fallback window (Date headers), precise samples take precedence
+        """
+        midpoint = (sent + received) / 2
+        offset = server_time.timestamp() + resolution / 2 - midpoint
+        uncertainty = (received - sent) / 2 + resolution / 2
+        (self._coarse if coarse else self._precise).append((uncertainty, offset))
+        self._offset = min(self._precise or self._coarse)[1]
+
+    def add_date_header(self, date: str | None, sent: float, received: float) -> None:
+        if not date:
+            return
+        try:
+            self.add_sample(parsedate_to_datetime(date), sent, received, resolution=1., coarse=True)
+        except (TypeError, ValueError):
+            pass
+
+    def now(self) -> pendulum.DateTime:
+        return pendulum.now('UTC').add(microseconds=int(self._offset * 1_000_000))
+
+
+CLOCKS: dict[Hashable, ClockOffset] = defaultdict(ClockOffset)  # by host (API base path)
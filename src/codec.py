@@ -0,0 +1,175 @@
+"""
+Compact binary codec for OHLC and funding rate series.
+
+Layout (little endian)::
+
+    header   magic(4s) version(B) kind(B) timeframe(H) symbol_id_len(H) reserved(H) n(I) reserved(I)
+    symbol   utf-8 SymbolId padded to 8 bytes
+    columns  n x int64 timestamps in ms, then n x float64 per value column
+
+Columns are 8 byte aligned, so decoding casts memoryviews over the input buffer without copying.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import ClassVar, Sequence
+
+import pendulum
+
+from src.enums import TimeFrameEnum
+from src.models import OHLC, FundingRate, SymbolId
+
+MAGIC = b'HBXC'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHHHII')
+
+
+class CodecError(Exception):
+    pass
+
+
+def to_ms(timestamp: dt.datetime) -> int:
+    return int(timestamp.timestamp() * 1000)
+
+
+def from_ms(ms: int) -> dt.datetime:
+    return pendulum.from_timestamp(ms / 1000)
+
+
+def _column(values: Sequence[int | float], typecode: str) -> array:
+    column = values if isinstance(values, array) and values.typecode == typecode else array(typecode, values)
+    if sys.byteorder != 'little':
+        column = array(typecode, column)
+        column.byteswap()
+    return column
+
+
+def _view(buffer: memoryview, offset: int, n: int, typecode: str) -> memoryview | array:
+    view = buffer[offset:offset + 8 * n].cast(typecode)
+    if sys.byteorder != 'little':
+        view = array(typecode, view)
+        view.byteswap()
+    return view
+
+
+@dataclass(frozen=True)
+class _Columns:
+    KIND: ClassVar[int]
+    VALUES: ClassVar[tuple[str, ...]]
+
+    timestamp: Sequence[int]  # ms since epoch
+    symbol_id: SymbolId | None
+    timeframe: TimeFrameEnum | None
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def encode(self) -> bytes:
+        symbol_id = (self.symbol_id or '').encode()
+        padding = -len(symbol_id) % 8
+        n = len(self)
+        parts = [
+            HEADER.pack(MAGIC, VERSION, self.KIND, self.timeframe.value if self.timeframe else 0,
+                        len(symbol_id), 0, n, 0),
+            symbol_id, bytes(padding),
+            _column(self.timestamp, 'q').tobytes(),
+        ]
+        for name in self.VALUES:
+            if len(values := getattr(self, name)) != n:
+                raise CodecError(f'Column {name} has {len(values)} values instead of {n}')
+            parts.append(_column(values, 'd').tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes | bytearray | memoryview):
+        """Columns of returned instance are views into data (no copy on little endian hosts)."""
+        buffer = memoryview(data).cast('B')
+        try:
+            magic, version, kind, timeframe, symbol_id_len, _, n, _ = HEADER.unpack_from(buffer)
+        except struct.error as e:
+            raise CodecError('Truncated header') from e
+        if magic != MAGIC or version != VERSION or kind != cls.KIND:
+            raise CodecError(f'Not a {cls.__name__} v{VERSION} payload')
+        offset = HEADER.size
+        symbol_id = bytes(buffer[offset:offset + symbol_id_len]).decode()
+        offset += symbol_id_len + (-symbol_id_len % 8)
+        if len(buffer) < offset + 8 * n * (1 + len(cls.VALUES)):
+            raise CodecError('Truncated columns')
+        columns = {'timestamp': _view(buffer, offset, n, 'q')}
+        for name in cls.VALUES:
+            offset += 8 * n
+            columns[name] = _view(buffer, offset, n, 'd')
+        return cls(
+            symbol_id=SymbolId(symbol_id) if symbol_id else None,
+            timeframe=TimeFrameEnum(timeframe) if timeframe else None,
+            **columns,
+        )
+
+
+@dataclass(frozen=True)
+class OhlcColumns(_Columns):
+    KIND = 1
+    VALUES = ('open', 'high', 'low', 'close')
+
+    open: Sequence[float]
+    high: Sequence[float]
+    low: Sequence[float]
+    close: Sequence[float]
+
+    @classmethod
+    def from_models(cls, ohlc: list[OHLC], symbol_id: SymbolId | None = None,
+                    timeframe: TimeFrameEnum | None = None) -> OhlcColumns:
+        return cls(
+            timestamp=array('q', (to_ms(o.period) for o in ohlc)),
+            open=array('d', (o.open for o in ohlc)),
+            high=array('d', (o.high for o in ohlc)),
+            low=array('d', (o.low for o in ohlc)),
+            close=array('d', (o.close for o in ohlc)),
+            symbol_id=symbol_id,
+            timeframe=timeframe,
+        )
+
+    def to_models(self) -> list[OHLC]:
+        return [OHLC.construct(period=from_ms(t), open=o, high=h, low=l, close=c)
+                for t, o, h, l, c in zip(self.timestamp, self.open, self.high, self.low, self.close)]
+
+
+@dataclass(frozen=True)
+class FundingColumns(_Columns):
+    KIND = 2
+    VALUES = ('funding_rate',)
+
+    funding_rate: Sequence[float]
+
+    @classmethod
+    def from_models(cls, funding: list[FundingRate], symbol_id: SymbolId | None = None) -> FundingColumns:
+        return cls(
+            timestamp=array('q', (to_ms(f.timestamp) for f in funding)),
+            funding_rate=array('d', (f.funding_rate for f in funding)),
+            symbol_id=symbol_id,
+            timeframe=None,
+        )
+
+    def to_models(self) -> list[FundingRate]:
+        return [FundingRate.construct(timestamp=from_ms(t), funding_rate=r)
+                for t, r in zip(self.timestamp, self.funding_rate)]
+
+
+def encode_ohlc(ohlc: list[OHLC], symbol_id: SymbolId | None = None, timeframe: TimeFrameEnum | None = None) -> bytes:
+    return OhlcColumns.from_models(ohlc, symbol_id, timeframe).encode()
+
+
+def decode_ohlc(data: bytes | bytearray | memoryview) -> list[OHLC]:
+    return OhlcColumns.decode(data).to_models()
+
+
+def encode_funding(funding: list[FundingRate], symbol_id: SymbolId | None = None) -> bytes:
+    return FundingColumns.from_models(funding, symbol_id).encode()
+
+
+def decode_funding(data: bytes | bytearray | memoryview) -> list[FundingRate]:
+    return FundingColumns.decode(data).to_models()
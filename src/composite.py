@@ -0,0 +1,113 @@
+"""
+Streaming cross-venue composite OHLC.
+
+Same bars as utils.get_median_ohlc, but a new or revised venue candle only touches its own period: every period
+keeps sorted small arrays of the venue values per field, so the median is an insort (remove + insort for revisions)
+and an index away. Updated composite bar is returned (and passed to listeners) right away.
+
+    composite = StreamingComposite(min_venues=3, listeners=[publish])
+    bar = composite.update(ExchangeEnum.BINANCE, ohlc)
+"""
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+from bisect import bisect_left, insort
+from typing import Callable
+
+from src.enums import ExchangeEnum
+from src.models import OHLC
+from src.quality import FIELDS, VenueQuality
+
+
+def _median(values: list[float]) -> float:
+    n = len(values)
+    middle = n // 2
+    return values[middle] if n % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+class _Period:
+    __slots__ = ('candles', 'values')
+
+    def __init__(self) -> None:
+        self.candles: dict[ExchangeEnum, OHLC] = {}
+        self.values: tuple[list[float], ...] = tuple([] for _ in FIELDS)
+
+    def put(self, venue: ExchangeEnum, ohlc: OHLC) -> bool:
+        """Returns False when the candle is identical to the one already held."""
+        if (previous := self.candles.get(venue)) is not None:
+            if previous == ohlc:
+                return False
+            self.remove(venue)
+        self.candles[venue] = ohlc
+        for field, values in zip(FIELDS, self.values):
+            insort(values, getattr(ohlc, field))
+        return True
+
+    def remove(self, venue: ExchangeEnum) -> None:
+        ohlc = self.candles.pop(venue)
+        for field, values in zip(FIELDS, self.values):
+            del values[bisect_left(values, getattr(ohlc, field))]
+
+    def bar(self, period: dt.datetime) -> OHLC:
+        open, high, low, close = (_median(values) for values in self.values)
+        return OHLC.construct(period=period, open=open, high=high, low=low, close=close)
+
+
+class StreamingComposite:
+
+    def __init__(self, min_venues: int = 1, max_periods: int = 1440, quality: VenueQuality | None = None,
+                 listeners: list[Callable[[OHLC], None]] | None = None) -> None:
+        """
+        :param min_venues: bar is emitted once at least this many venues delivered the period
+        :param max_periods: number of the latest periods kept for revisions
+        :param quality: venues excluded by it are left out of the median
+        """
+        self.min_venues = min_venues
+        self.max_periods = max_periods
+        self.quality = quality
+        self.listeners = listeners if listeners is not None else []
+        self._periods: dict[dt.datetime, _Period] = {}
+        self._order: list[dt.datetime] = []  # min heap of held periods
+
+    def __len__(self) -> int:
+        return len(self._periods)
+
+    def bar(self, period: dt.datetime) -> OHLC | None:
+        if (held := self._periods.get(period)) is None or len(held.candles) < self.min_venues:
+            return None
+        return held.bar(period)
+
+    def bars(self) -> list[OHLC]:
+        return [bar for period in sorted(self._periods) if (bar := self.bar(period)) is not None]
+
+    def update(self, venue: ExchangeEnum, ohlc: OHLC) -> OHLC | None:
+        """Adds (or revises) venue candle, returns updated composite bar of its period if there is one."""
+        if self.quality is not None and self.quality.is_excluded(venue):
+            return None
+        if (held := self._periods.get(ohlc.period)) is None:
+            if len(self._periods) >= self.max_periods:
+                if ohlc.period < self._order[0]:
+                    return None  # older than anything held
+                del self._periods[heapq.heappop(self._order)]
+            held = self._periods[ohlc.period] = _Period()
+            heapq.heappush(self._order, ohlc.period)
+        if not held.put(venue, ohlc) or len(held.candles) < self.min_venues:
+            return None
+        bar = held.bar(ohlc.period)
+        for listener in self.listeners:
+            listener(bar)
+        return bar
+
+    def update_many(self, venue: ExchangeEnum, ohlc: list[OHLC]) -> list[OHLC]:
+        return [bar for o in ohlc if (bar := self.update(venue, o)) is not None]
+
+    def remove_venue(self, venue: ExchangeEnum) -> list[OHLC]:
+        """Drops all the candles of venue (e.g. newly excluded one), returns the changed bars."""
+        changed = []
+        for period, held in self._periods.items():
+            if venue in held.candles:
+                held.remove(venue)
+                if len(held.candles) >= self.min_venues:
+                    changed.append(held.bar(period))
+        return changed
@@ -0,0 +1,261 @@
+"""
+Host wide rate limit coordinator.
+
+All the processes hitting venues from one IP (poller, backfills, notebooks) ask one daemon for tokens over a unix
+socket, so together they stay within the venue budgets. Waiting requests are served by priority, live first.
+
+    python -m src.coordinator [socket path]                          # daemon
+
+    RATE_LIMITER.use_coordinator(CoordinatorClient(name='backfill'))  # in every process, or set HB_RATELIMIT_SOCKET
+    with priority(PriorityEnum.BACKFILL):
+        ...
+
+Protocol is newline delimited JSON:
+    {"op": "hello", "name": "backfill", "pid": 123}
+    {"op": "acquire", "id": 1, "venue": "BINA", "tokens": 1, "priority": 2}  ->  {"id": 1}  once granted
+    {"op": "cancel", "id": 1}                                                 # client stopped waiting
+    {"op": "stats"}                                                           ->  {"stats": {...}}
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Hashable
+
+from loguru import logger
+
+from src.enums import PriorityEnum
+from src.monitor import MONITOR
+from src.ratelimit import REQUESTS_PER_SECOND, TokenBucket
+
+SOCKET_PATH = os.environ.get('HB_RATELIMIT_SOCKET', '/tmp/hb-ratelimit.sock')
+
+
+####################
+# Daemon
+####################
+class _VenueQueue:
+    """Grants tokens of one venue bucket to waiters by (priority, arrival)."""
+
+    def __init__(self, rate: float) -> None:
+        self.bucket = TokenBucket(rate)
+        self.waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def push(self, tokens: float, priority: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._sequence), tokens, future))
+        self._wakeup.set()
+        return future
+
+    async def _run(self) -> None:
+        while True:
+            if not self.waiters:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, _, tokens, future = self.waiters[0]
+            if future.done():  # client gone
+                heapq.heappop(self.waiters)
+            elif self.bucket.try_acquire(tokens):
+                heapq.heappop(self.waiters)
+                future.set_result(None)
+            else:
+                await asyncio.sleep(self.bucket.wait_time(tokens))
+
+    def close(self) -> None:
+        self._task.cancel()
+
+
+class _ProcessUsage:
+
+    def __init__(self, name: str, pid: int | None) -> None:
+        self.name = name
+        self.pid = pid
+        self.granted: dict[str, float] = defaultdict(float)
+        self.waited: dict[str, float] = defaultdict(float)  # in seconds
+        self.pending = 0
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'pid': self.pid, 'granted': dict(self.granted), 'waited': dict(self.waited),
+                'pending': self.pending}
+
+
+class RateCoordinator:
+
+    def __init__(self, path: str = SOCKET_PATH, rates: dict[Hashable, float] = None) -> None:
+        self.path = path
+        self.rates = {getattr(venue, 'value', venue): rate for venue, rate in (rates or REQUESTS_PER_SECOND).items()}
+        self._queues: dict[str, _VenueQueue] = {}
+        self._usage: dict[int, _ProcessUsage] = {}
+        self._connections = itertools.count()
+
+    def stats(self) -> dict:
+        return {
+            'processes': [usage.to_dict() for usage in self._usage.values()],
+            'waiting': {venue: sum(not future.done() for *_, future in queue.waiters)
+                        for venue, queue in self._queues.items()},
+        }
+
+    async def _grant(self, writer: asyncio.StreamWriter, usage: _ProcessUsage, request: dict) -> None:
+        venue, tokens = request['venue'], request.get('tokens', 1.)
+        start = time.monotonic()
+        if venue in self.rates:
+            if venue not in self._queues:
+                self._queues[venue] = _VenueQueue(self.rates[venue])
+            usage.pending += 1
+            try:
+                await self._queues[venue].push(tokens, request.get('priority', PriorityEnum.DEFAULT))
+            finally:
+                usage.pending -= 1
+        usage.granted[venue] += tokens
+        usage.waited[venue] += time.monotonic() - start
+        writer.write(json.dumps({'id': request['id']}).encode() + b'\n')
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = next(self._connections)
+        usage = self._usage[connection] = _ProcessUsage(f'connection-{connection}', None)
+        grants: dict[int, asyncio.Task] = {}
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                match request.get('op'):
+                    case 'hello':
+                        usage.name, usage.pid = request.get('name', usage.name), request.get('pid')
+                    case 'acquire':
+                        request_id = request['id']
+                        grant = grants[request_id] = asyncio.create_task(self._grant(writer, usage, request))
+                        grant.add_done_callback(lambda _, request_id=request_id: grants.pop(request_id, None))
+                    case 'cancel':
+                        if (grant := grants.pop(request.get('id'), None)) is not None:
+                            grant.cancel()
+                    case 'stats':
+                        writer.write(json.dumps({'stats': self.stats()}).encode() + b'\n')
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning(f'Rate limit coordinator: {usage.name} {e}')
+        finally:
+            for grant in list(grants.values()):
+                grant.cancel()  # cancels the queued future too
+            del self._usage[connection]
+            writer.close()
+
+    async def serve(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        logger.info(f'Rate limit coordinator listening on {self.path}')
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for queue in self._queues.values():
+                queue.close()
+
+
+####################
+# Client
+####################
+class CoordinatorClient:
+    """
+    Asks the daemon for tokens. Connects lazily (per event loop), when the daemon is not running or does not
+    answer within timeout seconds requests are not held back by it.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH, name: str | None = None, timeout: float | None = 60.) -> None:
+        self.path = path
+        self.name = name or os.path.basename(sys.argv[0]) or 'python'
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._connecting: asyncio.Lock | None = None
+        self._unavailable_logged = False
+        MONITOR.register_queue('coordinator', lambda: len(self._pending))
+
+    async def _connect(self) -> bool:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._writer is not None and not self._writer.is_closing():
+            return True
+        if self._loop is not loop:
+            self._loop, self._connecting, self._writer = loop, asyncio.Lock(), None
+        async with self._connecting:
+            if self._writer is not None and not self._writer.is_closing():
+                return True
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                if not self._unavailable_logged:
+                    logger.warning(f'Rate limit coordinator not available at {self.path}: {e}')
+                    self._unavailable_logged = True
+                return False
+            self._unavailable_logged = False
+            self._pending = {}  # of this connection, the reader fails them when it drops
+            self._send({'op': 'hello', 'name': self.name, 'pid': os.getpid()})
+            loop.create_task(self._read(self._reader, self._writer, self._pending))
+            return True
+
+    def _send(self, message: dict) -> None:
+        self._writer.write(json.dumps(message).encode() + b'\n')
+
+    async def _read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                    pending: dict[int, asyncio.Future]) -> None:
+        try:
+            while line := await reader.readline():
+                response = json.loads(line)
+                if (future := pending.pop(response.get('id'), None)) is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            if self._writer is writer:  # a reconnect may already have replaced it
+                self._writer = None
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('Rate limit coordinator disconnected.'))
+            pending.clear()
+
+    async def acquire(self, venue: Hashable, tokens: float = 1.,
+                      priority: PriorityEnum = PriorityEnum.DEFAULT) -> None:
+        if not await self._connect():
+            return
+        request_id, writer, pending = next(self._ids), self._writer, self._pending
+        future = pending[request_id] = asyncio.get_running_loop().create_future()
+        self._send({'op': 'acquire', 'id': request_id, 'venue': getattr(venue, 'value', venue), 'tokens': tokens,
+                    'priority': int(priority)})
+        granted = False
+        try:
+            await asyncio.wait_for(future, self.timeout)
+            granted = True
+        except asyncio.TimeoutError:
+            logger.warning(f'Rate limit coordinator did not answer within {self.timeout}s. '
+                           f'Request to {venue} not coordinated.')
+        except ConnectionError as e:
+            logger.warning(f'{e} Request to {venue} not coordinated.')
+        finally:
+            pending.pop(request_id, None)
+            if not granted and self._writer is writer and not writer.is_closing():  # free the queued tokens
+                self._send({'op': 'cancel', 'id': request_id})
+
+    async def stats(self) -> dict:
+        """Usage of all the processes as seen by the daemon."""
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)  # own connection, responses carry no id
+        except OSError:
+            return {}
+        try:
+            writer.write(json.dumps({'op': 'stats'}).encode() + b'\n')
+            return json.loads(await reader.readline())['stats']
+        finally:
+            writer.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(RateCoordinator(sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH).serve())
@@ -0,0 +1,211 @@
+"""
+Aligned venue x period x field OHLC matrices on disk, memory-mapped.
+
+Directory holds `data.f64` (float64, little endian, NaN for gaps) and sidecar `index.json` with the SymbolIds
+(venue axis), period start and step. File is period-major (period, venue, field), so new periods are appended in
+place and opening years of minute data is just a mmap, nothing is parsed or copied:
+
+    dataset = AlignedDataset.create('data/btc_spot', symbol_ids, start=pendulum.datetime(2022, 1, 1),
+                                    step=dt.timedelta(minutes=1))
+    dataset.write(symbol_id, ohlc)                    # in place, grows the file as needed
+    dataset.flush()                                   # msync of the written range, close() flushes too
+    await fetch_into(dataset, TimeFrameEnum.MINUTE)   # latest candles of all the symbols
+
+    dataset = AlignedDataset.open('data/btc_spot')
+    dataset.matrix[period, venue, field]              # memoryview with shape (periods, venues, fields)
+    dataset.series(symbol_id, 'close')                # strided zero-copy view
+    np.frombuffer(dataset.buffer, '<f8').reshape(dataset.shape)   # if numpy is around
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any
+
+import pendulum
+from loguru import logger
+
+from src.codec import to_ms
+from src.enums import TimeFrameEnum
+from src.models import OHLC, SymbolId
+
+FIELDS = ('open', 'high', 'low', 'close')
+DATA_FILE = 'data.f64'
+INDEX_FILE = 'index.json'
+ITEM_SIZE = 8
+NAN_BYTES = struct.pack('<d', math.nan)
+
+
+class AlignedDataset:
+
+    def __init__(self, path: str, symbol_ids: list[SymbolId], start: int, step: int, periods: int,
+                 writable: bool = False) -> None:
+        """Use create or open."""
+        if sys.byteorder != 'little':
+            raise NotImplementedError('Memory-mapped views need little endian host.')
+        self.path = path
+        self.symbol_ids = symbol_ids
+        self.start = start  # ms
+        self.step = step  # ms
+        self.periods = periods
+        self.writable = writable
+        self._venues = {symbol_id: i for i, symbol_id in enumerate(symbol_ids)}
+        self._file = open(os.path.join(path, DATA_FILE), 'r+b' if writable else 'rb')
+        self._mmap: mmap.mmap | None = None
+        self._dirty: tuple[int, int] | None = None  # byte range written since the last flush
+        self._map()
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.periods, len(self.symbol_ids), len(FIELDS)
+
+    @property
+    def row_size(self) -> int:
+        return len(self.symbol_ids) * len(FIELDS) * ITEM_SIZE
+
+    @property
+    def buffer(self) -> memoryview:
+        return memoryview(self._mmap) if self._mmap is not None else memoryview(b'')
+
+    @property
+    def flat(self) -> memoryview:
+        return self.buffer.cast('d')
+
+    @property
+    def matrix(self) -> memoryview:
+        return self.buffer.cast('d', self.shape) if self.periods else self.flat
+
+    def period(self, row: int) -> dt.datetime:
+        return pendulum.from_timestamp((self.start + row * self.step) / 1000)
+
+    def row(self, period: dt.datetime) -> int:
+        return (to_ms(period) - self.start) // self.step
+
+    def series(self, symbol_id: SymbolId, field: str = 'close') -> memoryview:
+        offset = self._venues[symbol_id] * len(FIELDS) + FIELDS.index(field)
+        return self.flat[offset::len(self.symbol_ids) * len(FIELDS)]
+
+    ##################
+    # Files
+    ##################
+    def _map(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # views handed out keep the old mapping alive until released
+        size = self.periods * self.row_size
+        self._mmap = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_WRITE if self.writable
+                               else mmap.ACCESS_READ) if size else None
+
+    def _index(self) -> dict[str, Any]:
+        return {'symbol_ids': self.symbol_ids, 'start': self.start, 'step': self.step, 'periods': self.periods,
+                'fields': FIELDS, 'layout': ['period', 'venue', 'field'], 'dtype': '<f8'}
+
+    def _write_index(self) -> None:
+        path = os.path.join(self.path, INDEX_FILE)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(self._index(), f)
+        os.replace(f'{path}.tmp', path)  # readers never see half written index
+
+    @classmethod
+    def create(cls, path: str, symbol_ids: list[SymbolId], start: dt.datetime,
+               step: dt.timedelta | TimeFrameEnum) -> AlignedDataset:
+        step = dt.timedelta(minutes=step.value) if isinstance(step, TimeFrameEnum) else step
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, DATA_FILE), 'wb').close()
+        dataset = cls(path, list(symbol_ids), to_ms(start), int(step.total_seconds() * 1000), 0, writable=True)
+        dataset._write_index()
+        return dataset
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> AlignedDataset:
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            index = json.load(f)
+        return cls(path, [SymbolId(symbol_id) for symbol_id in index['symbol_ids']], index['start'], index['step'],
+                   index['periods'], writable)
+
+    def refresh(self) -> None:
+        """Picks up periods appended by a writer since opening."""
+        with open(os.path.join(self.path, INDEX_FILE)) as f:
+            periods = json.load(f)['periods']
+        if periods != self.periods:
+            self.periods = periods
+            self._map()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self.flush()
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> AlignedDataset:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    ##################
+    # Writing
+    ##################
+    def _extend(self, periods: int) -> None:
+        """Appends NaN rows up to periods."""
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(NAN_BYTES * (len(self.symbol_ids) * len(FIELDS)) * (periods - self.periods))
+        self._file.flush()
+        self.periods = periods
+        self._map()
+        self._write_index()
+
+    def write(self, symbol_id: SymbolId, ohlc: list[OHLC]) -> int:
+        """Writes candles of symbol in place (before start are skipped), returns number written."""
+        if not self.writable:
+            raise PermissionError('Dataset opened read only.')
+        venue = self._venues[symbol_id]
+        rows = [(row, o) for o in ohlc if (row := self.row(o.period)) >= 0]
+        if not rows:
+            return 0
+        if (last := max(row for row, _ in rows)) >= self.periods:
+            self._extend(last + 1)
+        flat = self.flat
+        width = len(self.symbol_ids) * len(FIELDS)
+        for row, o in rows:
+            offset = row * width + venue * len(FIELDS)
+            flat[offset:offset + len(FIELDS)] = array('d', (o.open, o.high, o.low, o.close))
+        first, last = min(row for row, _ in rows) * self.row_size, (last + 1) * self.row_size
+        self._dirty = (min(first, self._dirty[0]), max(last, self._dirty[1])) if self._dirty else (first, last)
+        return len(rows)
+
+    def flush(self) -> None:
+        """Syncs pages written since the last flush to disk (readers mapping the file see writes without it)."""
+        if self._dirty is None or self._mmap is None:
+            return
+        first, last = self._dirty
+        first -= first % mmap.PAGESIZE
+        self._mmap.flush(first, min(last, len(self._mmap)) - first)
+        self._dirty = None
+
+
+async def fetch_into(dataset: AlignedDataset, timeframe: TimeFrameEnum = TimeFrameEnum.MINUTE) -> int:
+    """Fetches latest candles of all the dataset symbols and writes them, returns number of written candles."""
+    from src import client  # venues are not needed by readers
+
+    symbols = [client.SYMBOLS.by_id(symbol_id) for symbol_id in dataset.symbol_ids]
+    fetched = await asyncio.gather(*(client.get_ohlc(symbol.exchange_id, symbol.symbol_type, timeframe,
+                                                     base=symbol.base) for symbol in symbols), return_exceptions=True)
+    written = 0
+    for symbol, ohlc in zip(symbols, fetched):
+        if isinstance(ohlc, Exception):
+            logger.warning(f'Dataset {symbol.id}: {ohlc!r}')
+        elif ohlc:
+            written += dataset.write(symbol.id, ohlc)
+    dataset.flush()
+    return written
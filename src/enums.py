@@ -7,6 +7,9 @@ from enum import Enum
 
 class AssetEnum(str, Enum):
     BTC = 'BTC'
+    ETH = 'ETH'
+    SOL = 'SOL'
+    XRP = 'XRP'
     USD = 'USD'
 
 ###################
@@ -36,6 +39,25 @@ class TimeFrameEnum(int, Enum):
 class ProductEnum(str, Enum):
     OHLC = 'OHLC'
     FUNDING = 'FUNDING'
+    RUNNING_FUNDING = 'RUNNING_FUNDING'
+    ORDERBOOK = 'ORDERBOOK'
+    TRADES = 'TRADES'
+    MARK_PRICE = 'MARK_PRICE'
+    OPEN_INTEREST = 'OPEN_INTEREST'
+
+
+class PriorityEnum(int, Enum):
+    # lower is served first by the rate limit coordinator
+    LIVE = 0
+    DEFAULT = 1
+    BACKFILL = 2
+
+
+class OverflowPolicyEnum(str, Enum):
+    # what a full subscriber queue does with a new message
+    DROP_OLDEST = 'DROP_OLDEST'
+    CONFLATE = 'CONFLATE'  # keeps only the latest message per topic
+    BLOCK = 'BLOCK'  # publisher waits
 
 
 class SymbolTypeEnum(str, Enum):
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import ClassVar, Any, AsyncGenerator
+from typing import ClassVar, Any, AsyncGenerator, Awaitable, Callable
 import datetime as dt
 
 import httpx
@@ -10,9 +16,41 @@ import pendulum
 from devtools import debug
 from loguru import logger
 
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol, FundingRate
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, SymbolSet, Symbol, FundingRate, SymbolNativeId, OrderBook, MarkPrice, OpenInterest
 from src.models.funding_rate import RunningFundingRate
+from src.models.trade import Trade
+from src.clock import CLOCKS
+from src.monitor import MONITOR
+from src.ratelimit import RATE_LIMITER
+from src.tick_cache import TICK_CACHE
+from src.tracing import span
+
+
+RESPONSES_SIZE = 1024  # unchanged response detection keeps this many latest (endpoint, params)
+
+
+def _overlap(previous: list, response: list) -> tuple[int, int]:
+    """(start, length) such that response[:length] == previous[start:start + length], length 0 when no overlap."""
+    if not previous or not response:
+        return 0, 0
+    try:
+        start = previous.index(response[0])
+    except ValueError:
+        return 0, 0
+    length = 0
+    for old, new in zip(itertools.islice(previous, start, None), response):
+        if old != new:
+            break
+        length += 1
+    return start, length
+
+
+def next_funding_timestamp(now: dt.datetime, interval: dt.timedelta) -> pendulum.DateTime:
+    """Next settlement of venue settling every interval on the clock (e.g. 00:00, 08:00, 16:00 UTC for 8h)."""
+    interval_ms = int(interval.total_seconds() * 1000)
+    now_ms = int(now.timestamp() * 1000)
+    return pendulum.from_timestamp((now_ms - now_ms % interval_ms + interval_ms) / 1000)
 
 
 class AbstractBaseExchange(abc.ABC):
@@ -21,36 +59,180 @@ class AbstractBaseExchange(abc.ABC):
     async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum) -> list[OHLC]:
         raise NotImplementedError
 
+    @classmethod
+    async def get_running_fundings(cls, symbol_type: SymbolTypeEnum,
+                                   bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
+        raise NotImplementedError
+
+    @classmethod
+    async def get_mark_price(cls, symbol_type: SymbolTypeEnum, **kwargs) -> MarkPrice:
+        raise NotImplementedError
+
+    @classmethod
+    async def get_open_interest(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OpenInterest:
+        raise NotImplementedError
+
+    @classmethod
+    async def get_trades(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[Trade]:
+        raise NotImplementedError
+
+    @classmethod
+    def _venue(cls, symbol_type: SymbolTypeEnum | None) -> BaseExchange | None:
+        """Venue serving symbol_type by the wrapper attribute naming (PERP_USD, PERP or SPOT), any without it."""
+        if symbol_type is None:
+            return next((venue for venue in vars(cls).values() if isinstance(venue, BaseExchange)), None)
+        for name in (symbol_type.name, symbol_type.name.split('_')[0]):
+            if isinstance(venue := getattr(cls, name, None), BaseExchange):
+                return venue
+        return None
+
+    @classmethod
+    def now(cls, symbol_type: SymbolTypeEnum | None = None) -> pendulum.DateTime:
+        """Current time on clock of the venue serving symbol_type."""
+        venue = cls._venue(symbol_type)
+        return venue.now() if venue is not None else pendulum.now('UTC')
+
+    @classmethod
+    async def sync_clock(cls) -> None:
+        for venue in vars(cls).values():
+            if isinstance(venue, BaseExchange):
+                await venue.sync_clock()
+
 
 class BaseExchange:
     API_BASE_PATH: ClassVar[str]
     EXCHANGE_ID: ClassVar[ExchangeEnum]
     SYMBOLS: ClassVar[SymbolSet]
+    SERVER_TIME_ENDPOINT: ClassVar[str | None] = None
+    SERVER_TIME_RESOLUTION: ClassVar[float] = 0.001  # in seconds
+    TRANSPORT: ClassVar[httpx.AsyncBaseTransport | None] = None  # e.g. record / replay transport, see src.replay
+    _CLIENT_POOL: ClassVar[dict[str, tuple[ExchangeEnum, httpx.AsyncClient]] | None] = None  # see client_pool
+    # (base path, endpoint, params) -> (fingerprint of body, decoded body), see _decode
+    _RESPONSES: ClassVar[OrderedDict[tuple[str, str, str], tuple[bytes, Any]]] = OrderedDict()
+    # (venue class, product, ...) -> (response, parsed, rows aligned), see _parse_incremental
+    _PARSED: ClassVar[dict[tuple, tuple[Any, list, bool]]] = {}
 
     @classmethod
-    def _get_symbol(cls, symbol_type: SymbolTypeEnum) -> Symbol:
-        return cls.SYMBOLS.find(symbol_type=symbol_type).get_one()
+    def _get_symbol(cls, symbol_type: SymbolTypeEnum, base: AssetEnum = AssetEnum.BTC) -> Symbol:
+        return cls.SYMBOLS.find(symbol_type=symbol_type, base=base).get_one()
+
+    @staticmethod
+    @asynccontextmanager
+    async def client_pool() -> AsyncGenerator:
+        """Within the context every venue host keeps one client (connection pool) instead of one per request."""
+        pool = BaseExchange._CLIENT_POOL = {}
+        try:
+            yield pool
+        finally:
+            BaseExchange._CLIENT_POOL = None
+            for venue, client in pool.values():
+                await client.aclose()
+                MONITOR.client_closed(venue)
 
     @classmethod
     @asynccontextmanager
     async def _get_client(cls) -> AsyncGenerator:
-        client = httpx.AsyncClient(base_url=cls.API_BASE_PATH)
+        if (pool := BaseExchange._CLIENT_POOL) is not None:
+            if cls.API_BASE_PATH not in pool:
+                client = httpx.AsyncClient(base_url=cls.API_BASE_PATH, transport=cls.TRANSPORT)
+                pool[cls.API_BASE_PATH] = (cls.EXCHANGE_ID, client)
+                MONITOR.client_opened(cls.EXCHANGE_ID)
+            yield pool[cls.API_BASE_PATH][1]
+            return
+        client = httpx.AsyncClient(base_url=cls.API_BASE_PATH, transport=cls.TRANSPORT)
+        MONITOR.client_opened(cls.EXCHANGE_ID)
         try:
             yield client
         finally:
             await client.aclose()
+            MONITOR.client_closed(cls.EXCHANGE_ID)
 
     @classmethod
     async def _fetch_endpoint(cls, endpoint: str, params: dict[str, str | int] = None) -> Any:
+        await RATE_LIMITER.acquire(cls.EXCHANGE_ID)
         async with cls._get_client() as client:
-            response = await client.get(endpoint, follow_redirects=True, params=params)
+            with span(cls, '_fetch_endpoint') as fetch_span, MONITOR.request(cls.EXCHANGE_ID):
+                sent = time.time()
+                response = await client.get(endpoint, follow_redirects=True, params=params)
+                fetch_span.payload = len(response.content)
+            CLOCKS[cls.API_BASE_PATH].add_date_header(response.headers.get('date'), sent, time.time())
             logger.debug(response.url)
             if response.status_code == httpx.codes.OK:
-                return response.json()
+                return cls._decode(endpoint, params, response.content)
             else:
                 logger.warning(f'{cls.__name__} {response.status_code}{response.json()}')
                 return None
 
+    @classmethod
+    def _decode(cls, endpoint: str, params: dict[str, str | int] | None, content: bytes) -> Any:
+        """
+        Decoded JSON body. While the body of an endpoint with the same params is unchanged (e.g. funding history
+        between settlements), the very same previously decoded object is returned, so parsers can skip it by identity.
+        """
+        key = (cls.API_BASE_PATH, endpoint, repr(sorted((params or {}).items())))
+        fingerprint = hashlib.blake2b(content, digest_size=16).digest()
+        responses = BaseExchange._RESPONSES
+        if (previous := responses.get(key)) is not None and previous[0] == fingerprint:
+            responses.move_to_end(key)
+            MONITOR.unchanged(cls.EXCHANGE_ID)
+            return previous[1]
+        decoded = responses[key] = fingerprint, json.loads(content)
+        responses.move_to_end(key)
+        if len(responses) > RESPONSES_SIZE:
+            responses.popitem(last=False)
+        return decoded[1]
+
+    @classmethod
+    def _parse_incremental(cls, key: tuple, response: Any, parse: Callable[[Any], list]) -> list:
+        """
+        parse(response) memoized per key. Same response object as the last time (see _decode) returns the last result.
+        For list responses of append-only histories (oldest first, parsed row by row) only the rows past the overlap
+        with the previous response are parsed, the overlapping ones are reused.
+        """
+        key = (cls,) + key
+        previous = BaseExchange._PARSED.get(key)
+        if previous is not None and previous[0] is response:
+            return previous[1]
+        start, length = 0, 0
+        if previous is not None and previous[2] and isinstance(response, list):
+            start, length = _overlap(previous[0], response)
+        if length:
+            parsed = previous[1][start:start + length] + parse(response[length:])
+        else:
+            parsed = parse(response)
+        BaseExchange._PARSED[key] = (response, parsed, isinstance(response, list) and len(parsed) == len(response))
+        return parsed
+
+    @classmethod
+    async def _fetch_shared(cls, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns result of factory shared by all the consumers of this venue within the current tick."""
+        return await TICK_CACHE.get((cls.API_BASE_PATH, key), factory)
+
+    #################
+    # Clock
+    #################
+    @classmethod
+    def now(cls, symbol_type: SymbolTypeEnum | None = None) -> pendulum.DateTime:
+        """Current time on venue clock."""
+        return CLOCKS[cls.API_BASE_PATH].now()
+
+    @staticmethod
+    def _parse_server_time(response: Any) -> dt.datetime:
+        raise NotImplementedError
+
+    @classmethod
+    @logger.catch
+    async def sync_clock(cls) -> None:
+        """Samples venue server time endpoint, more precise than Date headers sampled on every request."""
+        if cls.SERVER_TIME_ENDPOINT is None:
+            return
+        sent = time.time()
+        response = await cls._fetch_endpoint(cls.SERVER_TIME_ENDPOINT)
+        received = time.time()
+        if response is not None:
+            CLOCKS[cls.API_BASE_PATH].add_sample(cls._parse_server_time(response), sent, received,
+                                               cls.SERVER_TIME_RESOLUTION)
+
     #################
     # OHLC
     #################
@@ -71,15 +253,19 @@ class BaseExchange:
     @classmethod
     @logger.catch
     async def _get_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum) -> list[OHLC]:
-        parsed_ohlc = cls._parse_ohlc(await cls._fetch_ohlc(symbol, timeframe))
-        return cls._ohlc_fix(parsed_ohlc, symbol, timeframe)
+        with span(cls, '_fetch_ohlc'):
+            fetched_ohlc = await cls._fetch_ohlc(symbol, timeframe)
+        with span(cls, '_parse_ohlc'), MONITOR.parsing(cls.EXCHANGE_ID):
+            return cls._parse_incremental(('ohlc', symbol.id, timeframe), fetched_ohlc,
+                                          lambda rows: cls._ohlc_fix(cls._parse_ohlc(rows), symbol, timeframe))
 
     @classmethod
     async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum, since: dt.datetime = None,
-                       include_unfinished: bool = False):
-        fetched_ohlc = sorted(await cls._get_ohlc(cls._get_symbol(symbol_type), timeframe), key=lambda x: x.period)
+                       include_unfinished: bool = False, base: AssetEnum = AssetEnum.BTC):
+        symbol = cls._get_symbol(symbol_type, base)
+        fetched_ohlc = sorted(await cls._get_ohlc(symbol, timeframe), key=lambda x: x.period)
         since = since if since else fetched_ohlc[0].period - dt.timedelta(minutes=1)
-        until = pendulum.now('UTC').subtract(minutes=0 if include_unfinished else timeframe.value)
+        until = cls.now().subtract(minutes=0 if include_unfinished else timeframe.value)
         return [ohlc for ohlc in fetched_ohlc if since < ohlc.period < until]
 
     ##################
@@ -98,9 +284,14 @@ class BaseExchange:
 
     @classmethod
     @logger.catch(default=[])
-    async def get_funding(cls, symbol_type: SymbolTypeEnum, since: dt.datetime = None) -> list[FundingRate]:
-        symbol = cls._get_symbol(symbol_type)
-        fetched_funding = sorted(cls._parse_funding(await cls._fetch_funding(symbol)), key=lambda x: x.timestamp)
+    async def get_funding(cls, symbol_type: SymbolTypeEnum, since: dt.datetime = None,
+                          base: AssetEnum = AssetEnum.BTC) -> list[FundingRate]:
+        symbol = cls._get_symbol(symbol_type, base)
+        with span(cls, '_fetch_funding'):
+            fetched_funding = await cls._fetch_funding(symbol)
+        with span(cls, '_parse_funding'), MONITOR.parsing(cls.EXCHANGE_ID):
+            parsed_funding = cls._parse_incremental(('funding', symbol.id), fetched_funding, cls._parse_funding)
+            fetched_funding = sorted(parsed_funding, key=lambda x: x.timestamp)
         since = since if since else fetched_funding[0].timestamp - dt.timedelta(minutes=1)
         return [funding for funding in fetched_funding if funding.timestamp > since]
 
@@ -118,12 +309,132 @@ class BaseExchange:
         raise NotImplementedError
 
     @classmethod
-    @logger.catch(default=None)
-    async def get_running_funding(cls, symbol_type: SymbolTypeEnum) -> RunningFundingRate:
-        symbol = cls._get_symbol(symbol_type)
-        fetched_running_funding_rate = await cls._fetch_running_funding(symbol)
-        running_funding_rate = cls._parse_running_funding(fetched_running_funding_rate)
-        now = pendulum.now('UTC')
-        if abs((running_funding_rate.timestamp - now).seconds)> 60:
+    async def _fetch_running_funding_batch(cls, symbols: list[Symbol]) -> dict[SymbolNativeId, Any]:
+        # venues with a batch (all tickers) endpoint override this to fetch all symbols in one request
+        responses = await asyncio.gather(*(cls._fetch_running_funding(symbol) for symbol in symbols))
+        return {symbol.native_id: response for symbol, response in zip(symbols, responses)}
+
+    @classmethod
+    def _check_running_funding(cls, running_funding_rate: RunningFundingRate) -> RunningFundingRate:
+        now = cls.now()
+        if abs((running_funding_rate.timestamp - now).total_seconds()) > 60:
             raise ValueError(f'Running funding rate {running_funding_rate} not up to date for {now}.')
-        return running_funding_rate
\ No newline at end of file
+        return running_funding_rate
+
+    @classmethod
+    @logger.catch(default=None)
+    async def get_running_funding(cls, symbol_type: SymbolTypeEnum,
+                                  base: AssetEnum = AssetEnum.BTC) -> RunningFundingRate:
+        symbol = cls._get_symbol(symbol_type, base)
+        with span(cls, '_fetch_running_funding'):
+            fetched_running_funding_rate = await cls._fetch_running_funding(symbol)
+        with span(cls, '_parse_running_funding'), MONITOR.parsing(cls.EXCHANGE_ID):
+            running_funding_rate = cls._parse_running_funding(fetched_running_funding_rate)
+        return cls._check_running_funding(running_funding_rate)
+
+    @classmethod
+    @logger.catch(default={})
+    async def get_running_fundings(cls, symbol_type: SymbolTypeEnum,
+                                   bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
+        """Returns running funding for multiple base assets, demultiplexed from as few requests as venue allows."""
+        symbols = [cls._get_symbol(symbol_type, base) for base in bases]
+        with span(cls, '_fetch_running_funding_batch'):
+            fetched = await cls._fetch_running_funding_batch(symbols)
+        running_funding_rates = {}
+        for symbol in symbols:
+            if (record := fetched.get(symbol.native_id)) is None:
+                logger.warning(f'{cls.__name__} no running funding for {symbol.id}')
+                continue
+            try:
+                with MONITOR.parsing(cls.EXCHANGE_ID):
+                    running_funding_rate = cls._parse_running_funding(record)
+                running_funding_rates[symbol.base] = cls._check_running_funding(running_funding_rate)
+            except Exception as e:
+                logger.warning(f'{cls.__name__} {symbol.id}: {e}')
+        return running_funding_rates
+
+    ##################
+    # Mark price & open interest
+    ##################
+    # parsed from the running funding response, within a tick they cost no extra request where it is shared
+    @classmethod
+    def _parse_mark_price(cls, response: dict[str, Any]) -> MarkPrice:
+        raise NotImplementedError
+
+    @classmethod
+    def _parse_open_interest(cls, response: dict[str, Any]) -> OpenInterest:
+        raise NotImplementedError
+
+    @classmethod
+    async def _fetch_open_interest(cls, symbol: Symbol):
+        # venues without open interest in the running funding response override this
+        return await cls._fetch_running_funding(symbol)
+
+    @classmethod
+    @logger.catch(default=None)
+    async def get_mark_price(cls, symbol_type: SymbolTypeEnum, base: AssetEnum = AssetEnum.BTC) -> MarkPrice:
+        symbol = cls._get_symbol(symbol_type, base)
+        with span(cls, '_fetch_running_funding'):
+            fetched_running_funding_rate = await cls._fetch_running_funding(symbol)
+        with span(cls, '_parse_mark_price'), MONITOR.parsing(cls.EXCHANGE_ID):
+            return cls._parse_mark_price(fetched_running_funding_rate)
+
+    @classmethod
+    @logger.catch(default=None)
+    async def get_open_interest(cls, symbol_type: SymbolTypeEnum, base: AssetEnum = AssetEnum.BTC) -> OpenInterest:
+        symbol = cls._get_symbol(symbol_type, base)
+        with span(cls, '_fetch_open_interest'):
+            fetched_open_interest = await cls._fetch_open_interest(symbol)
+        with span(cls, '_parse_open_interest'), MONITOR.parsing(cls.EXCHANGE_ID):
+            return cls._parse_open_interest(fetched_open_interest)
+
+    ##################
+    # Order book
+    ##################
+    @staticmethod
+    @abc.abstractmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        raise NotImplementedError
+
+    @classmethod
+    @abc.abstractmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        raise NotImplementedError
+
+    @classmethod
+    @logger.catch(default=None)
+    async def get_orderbook(cls, symbol_type: SymbolTypeEnum, depth: int = 100,
+                            base: AssetEnum = AssetEnum.BTC) -> OrderBook:
+        symbol = cls._get_symbol(symbol_type, base)
+        with span(cls, '_fetch_orderbook'):
+            fetched_orderbook = await cls._fetch_orderbook(symbol, depth)
+        with span(cls, '_parse_orderbook'), MONITOR.parsing(cls.EXCHANGE_ID):
+            orderbook = cls._parse_orderbook(fetched_orderbook)
+        orderbook.symbol_id = symbol.id
+        orderbook.timestamp = orderbook.timestamp or cls.now()
+        return orderbook
+
+    ##################
+    # Trades
+    ##################
+    @staticmethod
+    @abc.abstractmethod
+    def _parse_trades(response: dict[str, Any]) -> list[Trade]:
+        raise NotImplementedError
+
+    @classmethod
+    @abc.abstractmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        raise NotImplementedError
+
+    @classmethod
+    @logger.catch(default=[])
+    async def get_trades(cls, symbol_type: SymbolTypeEnum, since: dt.datetime = None,
+                         base: AssetEnum = AssetEnum.BTC) -> list[Trade]:
+        """Recent public trades, oldest first."""
+        symbol = cls._get_symbol(symbol_type, base)
+        with span(cls, '_fetch_trades'):
+            fetched_trades = await cls._fetch_trades(symbol)
+        with span(cls, '_parse_trades'), MONITOR.parsing(cls.EXCHANGE_ID):
+            trades = sorted(cls._parse_trades(fetched_trades), key=lambda x: x.timestamp)
+        return [trade for trade in trades if since is None or trade.timestamp > since]
@@ -1,12 +1,13 @@
 import datetime as dt
+from collections import defaultdict
 from typing import Any, ClassVar
 
 import pendulum
 from pydantic import Field, validator, parse_obj_as
 
-from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum
+from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum, AssetEnum
 from src.exchanges.base import BaseExchange, AbstractBaseExchange
-from src.models import OHLC, SymbolSet, Symbol, FundingRate
+from src.models import OHLC, SymbolSet, Symbol, FundingRate, SymbolNativeId, OrderBook, Trade, MarkPrice, OpenInterest
 from src.models.funding_rate import RunningFundingRate
 
 TIMEFRAME = {
@@ -32,8 +33,22 @@ class BinanceBaseExchange(BaseExchange):
         Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.SPOT, native_id='BTCUSDT'),
         Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='BTCUSD_PERP'),
         Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_USD, native_id='BTCUSDT'),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.SPOT, native_id='ETHUSDT', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='ETHUSD_PERP', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_USD, native_id='ETHUSDT', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.SPOT, native_id='SOLUSDT', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='SOLUSD_PERP', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_USD, native_id='SOLUSDT', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.SPOT, native_id='XRPUSDT', base=AssetEnum.XRP),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='XRPUSD_PERP', base=AssetEnum.XRP),
+        Symbol(exchange_id=ExchangeEnum.BINANCE, symbol_type=SymbolTypeEnum.PERP_USD, native_id='XRPUSDT', base=AssetEnum.XRP),
     ])
 
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://binance-docs.github.io/apidocs/spot/en/#check-server-time
+        return pendulum.from_timestamp(response['serverTime'] / 1000)
+
     @classmethod
     def _fetch_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum):
         # https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-data
@@ -65,7 +80,7 @@ class BinanceBaseExchange(BaseExchange):
         limit = 1000
         params = {
             'symbol': symbol.native_id,
-            'startTime': pendulum.now('UTC').subtract(days=int(limit / 3)).int_timestamp * 1000,
+            'startTime': cls.now().subtract(days=int(limit / 3)).int_timestamp * 1000,
             'limit': limit
         }
         return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params=params)
@@ -77,21 +92,43 @@ class BinanceBaseExchange(BaseExchange):
     #################
     # Running funding
     #################
-    @classmethod
-    async def _fetch_running_funding(cls, symbol: Symbol):
+    RUNNING_FUNDING_ENDPOINT = {
         # https://binance-docs.github.io/apidocs/delivery/en/#index-price-and-mark-price
         # https://binance-docs.github.io/apidocs/futures/en/#mark-price
-        endpoint = {
-            SymbolTypeEnum.PERP_BTC: '/dapi/v1/premiumIndex',
-            SymbolTypeEnum.PERP_USD: '/fapi/v1/premiumIndex',
-        }
-        params = {'symbol': symbol.native_id}
-        return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params=params)
+        SymbolTypeEnum.PERP_BTC: '/dapi/v1/premiumIndex',
+        SymbolTypeEnum.PERP_USD: '/fapi/v1/premiumIndex',
+    }
+
+    @classmethod
+    async def _fetch_running_funding(cls, symbol: Symbol):
+        return (await cls._fetch_running_funding_batch([symbol])).get(symbol.native_id)
+
+    @classmethod
+    async def _fetch_running_funding_batch(cls, symbols: list[Symbol]) -> dict[SymbolNativeId, Any]:
+        # premiumIndex without symbol returns all the symbols, one request per symbol type
+        by_symbol_type = defaultdict(set)
+        for symbol in symbols:
+            by_symbol_type[symbol.symbol_type].add(symbol.native_id)
+        records = {}
+        for symbol_type, native_ids in by_symbol_type.items():
+            premium_index = await cls._fetch_premium_index(symbol_type)
+            records |= {native_id: premium_index[native_id] for native_id in native_ids if native_id in premium_index}
+        return records
+
+    @classmethod
+    async def _fetch_premium_index(cls, symbol_type: SymbolTypeEnum) -> dict[SymbolNativeId, Any]:
+        endpoint = cls.RUNNING_FUNDING_ENDPOINT[symbol_type]
+
+        async def fetch_and_index():
+            response = await cls._fetch_endpoint(endpoint)
+            return {record['symbol']: record for record in response} if response else None
+
+        return await cls._fetch_shared(endpoint, fetch_and_index)
 
     @staticmethod
     def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
         # for Coin-M list is returned
-        result = response if not isinstance(response, list) else response.pop()
+        result = response if not isinstance(response, list) else response[-1]
         # debug(result)
         return RunningFundingRate(
             timestamp=result['time'],
@@ -99,17 +136,86 @@ class BinanceBaseExchange(BaseExchange):
             funding_rate=result['lastFundingRate']
         )
 
+    @staticmethod
+    def _parse_mark_price(response: dict[str, Any]) -> MarkPrice:
+        result = response if not isinstance(response, list) else response[-1]
+        return MarkPrice(timestamp=result['time'], mark_price=result['markPrice'], index_price=result['indexPrice'])
+
+    @classmethod
+    async def _fetch_open_interest(cls, symbol: Symbol):
+        # no open interest in premiumIndex, it has an endpoint per symbol
+        # https://binance-docs.github.io/apidocs/delivery/en/#open-interest
+        # https://binance-docs.github.io/apidocs/futures/en/#open-interest
+        endpoint = {
+            SymbolTypeEnum.PERP_BTC: '/dapi/v1/openInterest',
+            SymbolTypeEnum.PERP_USD: '/fapi/v1/openInterest',
+        }
+        return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params={'symbol': symbol.native_id})
+
+    @staticmethod
+    def _parse_open_interest(response: dict[str, Any]) -> OpenInterest:
+        return OpenInterest(timestamp=response['time'], open_interest=response['openInterest'])
+
+
+    #################
+    # Order book
+    #################
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://binance-docs.github.io/apidocs/spot/en/#order-book
+        # https://binance-docs.github.io/apidocs/delivery/en/#order-book
+        # https://binance-docs.github.io/apidocs/futures/en/#order-book
+        endpoint = {
+            SymbolTypeEnum.SPOT: '/api/v3/depth',
+            SymbolTypeEnum.PERP_BTC: '/dapi/v1/depth',
+            SymbolTypeEnum.PERP_USD: '/fapi/v1/depth',
+        }
+        limits = (5, 10, 20, 50, 100, 500, 1000)
+        params = {
+            'symbol': symbol.native_id,
+            'limit': next((limit for limit in limits if limit >= depth), limits[-1]),
+        }
+        return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params=params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        return OrderBook.from_levels(response['bids'], response['asks'], sequence=response['lastUpdateId'])
+
+    #################
+    # Trades
+    #################
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://binance-docs.github.io/apidocs/spot/en/#recent-trades-list
+        # https://binance-docs.github.io/apidocs/delivery/en/#recent-trades-list
+        # https://binance-docs.github.io/apidocs/futures/en/#recent-trades-list
+        endpoint = {
+            SymbolTypeEnum.SPOT: '/api/v3/trades',
+            SymbolTypeEnum.PERP_BTC: '/dapi/v1/trades',
+            SymbolTypeEnum.PERP_USD: '/fapi/v1/trades',
+        }
+        params = {'symbol': symbol.native_id, 'limit': 1000}
+        return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params=params)
+
+    @staticmethod
+    def _parse_trades(response: list[dict[str, Any]]) -> list[Trade]:
+        return [Trade(timestamp=pendulum.from_timestamp(r['time'] / 1000), price=r['price'], size=r['qty'],
+                      side='sell' if r['isBuyerMaker'] else 'buy', id=r['id']) for r in response]
+
 
 class BinanceSpotExchange(BinanceBaseExchange):
     API_BASE_PATH = 'https://api.binance.com'
+    SERVER_TIME_ENDPOINT = '/api/v3/time'
 
 
 class BinanceDeliveryExchange(BinanceBaseExchange):
     API_BASE_PATH = 'https://dapi.binance.com'
+    SERVER_TIME_ENDPOINT = '/dapi/v1/time'
 
 
 class BinanceFutureExchange(BinanceBaseExchange):
     API_BASE_PATH = 'https://fapi.binance.com'
+    SERVER_TIME_ENDPOINT = '/fapi/v1/time'
 
 
 class Exchange(AbstractBaseExchange):
@@ -118,6 +224,8 @@ class Exchange(AbstractBaseExchange):
     PERP_BTC: ClassVar[BinanceDeliveryExchange] = BinanceDeliveryExchange()
     PERP_USD: ClassVar[BinanceFutureExchange] = BinanceFutureExchange()
 
+    SYMBOLS: ClassVar[SymbolSet] = BinanceBaseExchange.SYMBOLS
+
     @classmethod
     async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum, **kwargs) -> list[OHLC]:
         match symbol_type:
@@ -128,6 +236,26 @@ class Exchange(AbstractBaseExchange):
             case SymbolTypeEnum.PERP_USD:
                 return await cls.PERP_USD.get_ohlc(symbol_type, timeframe, **kwargs)
 
+    @classmethod
+    async def get_orderbook(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OrderBook:
+        match symbol_type:
+            case SymbolTypeEnum.SPOT:
+                return await cls.SPOT.get_orderbook(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP_BTC.get_orderbook(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_USD:
+                return await cls.PERP_USD.get_orderbook(symbol_type, **kwargs)
+
+    @classmethod
+    async def get_trades(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[Trade]:
+        match symbol_type:
+            case SymbolTypeEnum.SPOT:
+                return await cls.SPOT.get_trades(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP_BTC.get_trades(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_USD:
+                return await cls.PERP_USD.get_trades(symbol_type, **kwargs)
+
     @classmethod
     async def get_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[FundingRate]:
         match symbol_type:
@@ -139,11 +267,42 @@ class Exchange(AbstractBaseExchange):
                 raise NotImplementedError
 
     @classmethod
-    async def get_running_funding(cls, symbol_type: SymbolTypeEnum) -> RunningFundingRate:
+    async def get_running_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> RunningFundingRate:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP_BTC.get_running_funding(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_USD:
+                return await cls.PERP_USD.get_running_funding(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_running_fundings(cls, symbol_type: SymbolTypeEnum,
+                                   bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP_BTC.get_running_fundings(symbol_type, bases)
+            case SymbolTypeEnum.PERP_USD:
+                return await cls.PERP_USD.get_running_fundings(symbol_type, bases)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_mark_price(cls, symbol_type: SymbolTypeEnum, **kwargs) -> MarkPrice:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP_BTC.get_mark_price(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_USD:
+                return await cls.PERP_USD.get_mark_price(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_open_interest(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OpenInterest:
         match symbol_type:
             case SymbolTypeEnum.PERP_BTC:
-                return await cls.PERP_BTC.get_running_funding(symbol_type)
+                return await cls.PERP_BTC.get_open_interest(symbol_type, **kwargs)
             case SymbolTypeEnum.PERP_USD:
-                return await cls.PERP_USD.get_running_funding(symbol_type)
+                return await cls.PERP_USD.get_open_interest(symbol_type, **kwargs)
             case _:
                 raise NotImplementedError
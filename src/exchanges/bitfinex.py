@@ -1,8 +1,8 @@
 from typing import Any
 
 from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, SymbolSet, Symbol, OrderBook
 
 TIMEFRAME = {
     TimeFrameEnum.MINUTE: '1m',
@@ -16,6 +16,8 @@ class Exchange(BaseExchange):
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.BITFINEX, symbol_type=SymbolTypeEnum.SPOT, native_id='BTCUSD'),
         Symbol(exchange_id=ExchangeEnum.BITFINEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='BTCF0:USTF0'),
+        Symbol(exchange_id=ExchangeEnum.BITFINEX, symbol_type=SymbolTypeEnum.SPOT, native_id='ETHUSD', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BITFINEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='ETHF0:USTF0', base=AssetEnum.ETH),
     ])
 
     @classmethod
@@ -31,3 +33,18 @@ class Exchange(BaseExchange):
     def _parse_ohlc(response: dict[str, Any]) -> list[OHLC]:
         labels = ('period', 'open', 'close', 'high', 'low')
         return [OHLC.from_list(r[:5], labels) for r in response]
+
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://docs.bitfinex.com/reference#rest-public-book
+        endpoint = f'/book/t{symbol.native_id}/P0'
+        params = {'len': 25 if depth <= 25 else 100}
+        return await cls._fetch_endpoint(endpoint, params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        # [price, count, amount], positive amount for bids, negative for asks
+        return OrderBook.from_levels(
+            bids=[(price, amount) for price, _, amount in response if amount > 0],
+            asks=[(price, -amount) for price, _, amount in response if amount < 0],
+        )
@@ -1,12 +1,13 @@
 import datetime as dt
 from typing import Any
 
+import pendulum
 from devtools import debug
 from pydantic import Field, parse_obj_as
 
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
 from src.exchanges.base import BaseExchange
-from src.models import OHLC, FundingRate, SymbolSet, Symbol
+from src.models import OHLC, FundingRate, SymbolSet, Symbol, Trade, MarkPrice, OpenInterest
 from src.models.funding_rate import RunningFundingRate
 
 TIMEFRAME = {
@@ -30,6 +31,7 @@ class Exchange(BaseExchange):
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.BITMEX, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='XBT'),
         Symbol(exchange_id=ExchangeEnum.BITMEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='XBTUSDT'),
+        Symbol(exchange_id=ExchangeEnum.BITMEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='ETHUSDT', base=AssetEnum.ETH),
     ])
 
     ############
@@ -83,11 +85,13 @@ class Exchange(BaseExchange):
     async def _fetch_running_funding(cls, symbol: Symbol):
         # https://www.bitmex.com/api/explorer/#!/Instrument/Instrument_get
         params = {'symbol': symbol.native_id}
-        return await cls._fetch_endpoint('/instrument', params=params)
+        # shared within the tick by running funding, mark price and open interest
+        return await cls._fetch_shared(f'/instrument/{symbol.native_id}',
+                                       lambda: cls._fetch_endpoint('/instrument', params=params))
 
     @staticmethod
     def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
-        result = response.pop()
+        result = response[-1]
         # debug(result)
         return RunningFundingRate(
             timestamp = result['timestamp'],
@@ -95,3 +99,32 @@ class Exchange(BaseExchange):
             funding_rate = result['fundingRate'],
             predicted_funding_rate = result['indicativeFundingRate']
         )
+
+    @staticmethod
+    def _parse_mark_price(response: dict[str, Any]) -> MarkPrice:
+        result = response[-1]
+        return MarkPrice(timestamp=result['timestamp'], mark_price=result['markPrice'],
+                         index_price=result['indicativeSettlePrice'])
+
+    @staticmethod
+    def _parse_open_interest(response: dict[str, Any]) -> OpenInterest:
+        result = response[-1]
+        return OpenInterest(timestamp=result['timestamp'], open_interest=result['openInterest'])
+
+    #############
+    # Trades
+    #############
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://www.bitmex.com/api/explorer/#!/Trade/Trade_get
+        params = {
+            'symbol': 'XBTUSD' if symbol.native_id == 'XBT' else symbol.native_id,  # root symbol would mix futures in
+            'count': 1000,
+            'reverse': True,
+        }
+        return await cls._fetch_endpoint('/trade', params=params)
+
+    @staticmethod
+    def _parse_trades(response: list[dict[str, Any]]) -> list[Trade]:
+        return [Trade(timestamp=pendulum.parse(r['timestamp']), price=r['price'], size=r['size'],
+                      side=r['side'].lower(), id=r['trdMatchID']) for r in response]
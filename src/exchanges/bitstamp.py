@@ -1,11 +1,12 @@
 import datetime as dt
 from typing import Any
 
+import pendulum
 from pydantic import Field, parse_obj_as, NonNegativeFloat
 
 from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, SymbolSet, Symbol, OrderBook
 
 
 class BitstampOhlc(OHLC):
@@ -16,6 +17,8 @@ class Exchange(BaseExchange):
     EXCHANGE_ID = ExchangeEnum.BITSTAMP
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.BITSTAMP, symbol_type=SymbolTypeEnum.SPOT, native_id='btcusd'),
+        Symbol(exchange_id=ExchangeEnum.BITSTAMP, symbol_type=SymbolTypeEnum.SPOT, native_id='ethusd', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BITSTAMP, symbol_type=SymbolTypeEnum.SPOT, native_id='xrpusd', base=AssetEnum.XRP),
     ])
 
     @classmethod
@@ -31,3 +34,15 @@ class Exchange(BaseExchange):
     @staticmethod
     def _parse_ohlc(response: dict[str, Any]) -> list[BitstampOhlc]:
         return parse_obj_as(list[BitstampOhlc], response['data']['ohlc'])
+
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://www.bitstamp.net/api/#order-book
+        return await cls._fetch_endpoint(f'/order_book/{symbol.native_id}/')
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        return OrderBook.from_levels(
+            response['bids'], response['asks'],
+            timestamp=pendulum.from_timestamp(int(response['microtimestamp']) / 1_000_000),
+        )
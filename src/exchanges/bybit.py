@@ -3,22 +3,40 @@ from typing import ClassVar
 from src.exchanges.base import AbstractBaseExchange
 from .bybit_perp import Exchange as BybitPerp
 from .bybit_spot import Exchange as BybitSpot
-from ..enums import SymbolTypeEnum, TimeFrameEnum, ExchangeEnum
-from ..models import OHLC, FundingRate
+from ..enums import SymbolTypeEnum, TimeFrameEnum, ExchangeEnum, AssetEnum
+from ..models import OHLC, FundingRate, SymbolSet, OrderBook, Trade, MarkPrice, OpenInterest
+from ..models.funding_rate import RunningFundingRate
 
 
 class Exchange(AbstractBaseExchange):
     EXCHANGE_ID: ExchangeEnum = ExchangeEnum.BYBIT
     PERP: ClassVar[BybitPerp] = BybitPerp()
     SPOT: ClassVar[BybitSpot] = BybitSpot()
+    SYMBOLS: ClassVar[SymbolSet] = BybitPerp.SYMBOLS + BybitSpot.SYMBOLS
 
     @classmethod
-    async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum) -> list[OHLC]:
+    async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum, **kwargs) -> list[OHLC]:
         match symbol_type:
             case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
-                return await cls.PERP.get_ohlc(symbol_type, timeframe)
+                return await cls.PERP.get_ohlc(symbol_type, timeframe, **kwargs)
             case SymbolTypeEnum.SPOT:
-                return await cls.SPOT.get_ohlc(symbol_type, timeframe)
+                return await cls.SPOT.get_ohlc(symbol_type, timeframe, **kwargs)
+
+    @classmethod
+    async def get_orderbook(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OrderBook:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_orderbook(symbol_type, **kwargs)
+            case SymbolTypeEnum.SPOT:
+                return await cls.SPOT.get_orderbook(symbol_type, **kwargs)
+
+    @classmethod
+    async def get_trades(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[Trade]:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_trades(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
 
     @classmethod
     async def get_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[FundingRate]:
@@ -29,9 +47,34 @@ class Exchange(AbstractBaseExchange):
                 raise NotImplementedError
 
     @classmethod
-    async def get_running_funding(cls, symbol_type: SymbolTypeEnum) -> FundingRate:
+    async def get_running_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> RunningFundingRate:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_running_funding(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_running_fundings(cls, symbol_type: SymbolTypeEnum,
+                                   bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_running_fundings(symbol_type, bases)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_mark_price(cls, symbol_type: SymbolTypeEnum, **kwargs) -> MarkPrice:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_mark_price(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_open_interest(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OpenInterest:
         match symbol_type:
             case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
-                return await cls.PERP.get_running_funding(symbol_type)
+                return await cls.PERP.get_open_interest(symbol_type, **kwargs)
             case _:
                 raise NotImplementedError
\ No newline at end of file
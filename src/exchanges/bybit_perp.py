@@ -7,7 +7,8 @@ from pydantic import Field, parse_obj_as, NonNegativeFloat
 
 from src.exchanges.base import BaseExchange
 from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
-from src.models import OHLC, SymbolSet, Symbol, FundingRate
+from src.models import OHLC, SymbolSet, Symbol, FundingRate, SymbolNativeId, OrderBook, Trade, MarkPrice, \
+    OpenInterest
 from src.models.funding_rate import RunningFundingRate
 
 
@@ -25,7 +26,19 @@ class Exchange(BaseExchange):
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_USD, native_id='BTCUSDT'),
         Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='BTCUSD'),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_USD, native_id='ETHUSDT', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='ETHUSD', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_USD, native_id='SOLUSDT', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='SOLUSD', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_USD, native_id='XRPUSDT', base=AssetEnum.XRP),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='XRPUSD', base=AssetEnum.XRP),
     ])
+    SERVER_TIME_ENDPOINT = '/v2/public/time'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://bybit-exchange.github.io/docs/inverse/#t-servertime
+        return pendulum.from_timestamp(float(response['time_now']))
 
     ############
     # OHLC
@@ -41,7 +54,7 @@ class Exchange(BaseExchange):
         params = {
             'symbol': symbol.native_id,
             'interval': timeframe.value if timeframe.value < timeframe.DAY.value else 'D', # anything above 1D need hack
-            'from': int(pendulum.now('UTC').subtract(minutes=limit*timeframe.value).timestamp()),
+            'from': int(cls.now().subtract(minutes=limit*timeframe.value).timestamp()),
             'limit': limit,  # MAX 200
         }
         return cls._fetch_endpoint(endpoint, params)
@@ -73,18 +86,74 @@ class Exchange(BaseExchange):
     ############
     @classmethod
     async def _fetch_running_funding(cls, symbol: Symbol):
+        return (await cls._fetch_running_funding_batch([symbol])).get(symbol.native_id)
+
+    @classmethod
+    async def _fetch_running_funding_batch(cls, symbols: list[Symbol]) -> dict[SymbolNativeId, Any]:
+        tickers = await cls._fetch_tickers()
+        return {symbol.native_id: tickers[symbol.native_id] for symbol in symbols if symbol.native_id in tickers}
+
+    @classmethod
+    async def _fetch_tickers(cls) -> dict[SymbolNativeId, Any]:
         # https://bybit-exchange.github.io/docs/inverse/?console#t-latestsymbolinfo
-        response = await cls._fetch_endpoint('/v2/public/tickers')
-        #debug(response)
-        for record in response['result']:
-            if record['symbol'] == symbol.native_id:
-                return record
+        # one download per tick shared by both perp symbol types, indexed by symbol
+        endpoint = '/v2/public/tickers'
 
-    @staticmethod
-    def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
+        async def fetch_and_index():
+            response = await cls._fetch_endpoint(endpoint)
+            return {record['symbol']: record for record in response['result']} if response else None
+
+        return await cls._fetch_shared(endpoint, fetch_and_index)
+
+    @classmethod
+    def _parse_running_funding(cls, response: dict[str, Any]) -> RunningFundingRate:
         return RunningFundingRate(
-            timestamp=pendulum.now('UTC'),
+            timestamp=cls.now(),
+            funding_timestamp=response['next_funding_time'],
             funding_rate=response['funding_rate'],
             predicted_funding_rate=response['predicted_funding_rate']
         )
 
+    @classmethod
+    def _parse_mark_price(cls, response: dict[str, Any]) -> MarkPrice:
+        return MarkPrice(timestamp=cls.now(), mark_price=response['mark_price'], index_price=response['index_price'])
+
+    @classmethod
+    def _parse_open_interest(cls, response: dict[str, Any]) -> OpenInterest:
+        return OpenInterest(timestamp=cls.now(), open_interest=response['open_interest'])
+
+    ############
+    # Order book
+    ############
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://bybit-exchange.github.io/docs/inverse/#t-orderbook
+        # https://bybit-exchange.github.io/docs/linear/#t-orderbook
+        params = {'symbol': symbol.native_id}  # 25 levels per side
+        return await cls._fetch_endpoint('/v2/public/orderBook/L2', params=params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        levels = response['result']
+        return OrderBook.from_levels(
+            bids=[(r['price'], r['size']) for r in levels if r['side'] == 'Buy'],
+            asks=[(r['price'], r['size']) for r in levels if r['side'] == 'Sell'],
+        )
+
+    ############
+    # Trades
+    ############
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://bybit-exchange.github.io/docs/inverse/#t-publictradingrecords
+        # https://bybit-exchange.github.io/docs/linear/#t-publictradingrecords
+        inverse_endpoint = '/v2/public/trading-records'
+        linear_endpoint = '/public/linear/recent-trading-records'
+        endpoint = linear_endpoint if symbol.margin == AssetEnum.USD else inverse_endpoint
+        params = {'symbol': symbol.native_id, 'limit': 1000}
+        return await cls._fetch_endpoint(endpoint, params=params)
+
+    @staticmethod
+    def _parse_trades(response: dict[str, Any]) -> list[Trade]:
+        return [Trade(timestamp=pendulum.from_timestamp(r['trade_time_ms'] / 1000), price=r['price'], size=r['qty'],
+                      side=r['side'].lower(), id=r['id']) for r in response['result']]
@@ -1,8 +1,8 @@
 from typing import Any
 
 from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, Symbol, SymbolSet
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, Symbol, SymbolSet, OrderBook
 
 TIMEFRAME = {
     TimeFrameEnum.MINUTE: '1m',
@@ -12,8 +12,12 @@ TIMEFRAME = {
 
 class Exchange(BaseExchange):
     API_BASE_PATH = 'https://api.bybit.com/'
+    EXCHANGE_ID = ExchangeEnum.BYBIT
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.SPOT, native_id='BTCUSDT'),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.SPOT, native_id='ETHUSDT', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.SPOT, native_id='SOLUSDT', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.BYBIT, symbol_type=SymbolTypeEnum.SPOT, native_id='XRPUSDT', base=AssetEnum.XRP),
     ])
 
     @classmethod
@@ -31,5 +35,12 @@ class Exchange(BaseExchange):
     def _parse_ohlc(response: dict[str, Any]) -> list[OHLC]:
         return [OHLC.from_list(r[:5]) for r in response['result']]
 
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://bybit-exchange.github.io/docs/spot/#t-orderbook
+        params = {'symbol': symbol.native_id, 'limit': min(depth, 200)}
+        return await cls._fetch_endpoint('/spot/quote/v1/depth', params=params)
 
-
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        return OrderBook.from_levels(response['result']['bids'], response['result']['asks'])
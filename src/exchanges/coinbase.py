@@ -1,8 +1,11 @@
+import datetime as dt
 from typing import Any
 
+import pendulum
+
 from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, SymbolSet, Symbol, OrderBook, Trade
 
 
 class Exchange(BaseExchange):
@@ -10,7 +13,15 @@ class Exchange(BaseExchange):
     EXCHANGE_ID = ExchangeEnum.COINBASE
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.COINBASE, symbol_type=SymbolTypeEnum.SPOT, native_id='BTC-USD'),
+        Symbol(exchange_id=ExchangeEnum.COINBASE, symbol_type=SymbolTypeEnum.SPOT, native_id='ETH-USD', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.COINBASE, symbol_type=SymbolTypeEnum.SPOT, native_id='SOL-USD', base=AssetEnum.SOL),
     ])
+    SERVER_TIME_ENDPOINT = '/time'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://docs.cloud.coinbase.com/exchange/reference/exchangerestapi_gettime
+        return pendulum.from_timestamp(response['epoch'])
 
     @classmethod
     def _fetch_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum):
@@ -24,3 +35,31 @@ class Exchange(BaseExchange):
     @staticmethod
     def _parse_ohlc(response: dict[str, Any]) -> list[OHLC]:
         return [OHLC.from_list(r[:5]) for r in response]
+
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://docs.cloud.coinbase.com/exchange/reference/exchangerestapi_getproductbook
+        endpoint = f'/products/{symbol.native_id}/book'
+        params = {'level': 2}  # aggregated top 50 levels
+        return await cls._fetch_endpoint(endpoint, params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        return OrderBook.from_levels(
+            bids=[level[:2] for level in response['bids']],
+            asks=[level[:2] for level in response['asks']],
+            sequence=response['sequence'],
+        )
+
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://docs.cloud.coinbase.com/exchange/reference/exchangerestapi_getproducttrades
+        endpoint = f'/products/{symbol.native_id}/trades'
+        params = {'limit': 1000}
+        return await cls._fetch_endpoint(endpoint, params)
+
+    @staticmethod
+    def _parse_trades(response: list[dict[str, Any]]) -> list[Trade]:
+        # side is the maker order side, taker is the opposite one
+        return [Trade(timestamp=pendulum.parse(r['time']), price=r['price'], size=r['size'],
+                      side='sell' if r['side'] == 'buy' else 'buy', id=r['trade_id']) for r in response]
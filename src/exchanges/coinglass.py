@@ -1,3 +1,4 @@
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -7,7 +8,8 @@ from devtools import debug
 from loguru import logger
 
 from config import SETUP
-from src.enums import SymbolTypeEnum
+from src.clock import CLOCKS
+from src.enums import SymbolTypeEnum, AssetEnum
 
 API_BASE_URL = 'https://open-api.coinglass.com/api/pro/v1/'
 HEADER = {'coinglassSecret': SETUP.coinglass_api_key.get_secret_value()}
@@ -22,17 +24,19 @@ async def _get_client() -> AsyncGenerator:
         await client.aclose()
 
 
-async def _fetch_funding_rate(symbol_type: SymbolTypeEnum):
+async def _fetch_funding_rate(symbol_type: SymbolTypeEnum, base: AssetEnum = AssetEnum.BTC):
     # returns the predicted funding rates
     # https://coinglass.github.io/API-Reference/#funding-rates-chart
     async with _get_client() as client:
-        url = 'futures/funding_rates_chart?symbol=BTC&type='
+        url = f'futures/funding_rates_chart?symbol={base.value}&type='
         match symbol_type:
             case SymbolTypeEnum.PERP_BTC:
                 url += 'C'
             case SymbolTypeEnum.PERP_USD:
                 url += 'U'
+        sent = time.time()
         response = await client.get(url)
+        CLOCKS['coinglass'].add_date_header(response.headers.get('date'), sent, time.time())
         if response.status_code == httpx.codes.OK:
             return response.json()
         else:
@@ -43,13 +47,13 @@ async def _fetch_funding_rate(symbol_type: SymbolTypeEnum):
 def _parse_funding_rate(response):
     #debug(response)
     data_time = pendulum.from_timestamp(response['data']['dateList'][-1]/1000)
-    now = pendulum.now('UTC')
-    if abs((data_time - now).seconds) > 10:
+    now = CLOCKS['coinglass'].now()
+    if abs((data_time - now).total_seconds()) > 10:
         raise ValueError(f'Data time {data_time} to different form now {now}')
     debug(response['data']['dataMap'])
     return {exchange: rates[-1] for exchange, rates in response['data']['dataMap'].items()}
 
 
-async def get_estimated_funding_rate(symbol_type: SymbolTypeEnum):
-    fetched_response = await _fetch_funding_rate(symbol_type)
+async def get_estimated_funding_rate(symbol_type: SymbolTypeEnum, base: AssetEnum = AssetEnum.BTC):
+    fetched_response = await _fetch_funding_rate(symbol_type, base)
     return _parse_funding_rate(fetched_response)
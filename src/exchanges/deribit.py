@@ -5,9 +5,10 @@ import pendulum
 from devtools import debug
 from pydantic import NonNegativeFloat, Field, parse_obj_as
 
-from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, FundingRate, SymbolSet, Symbol
+from src.exchanges.base import BaseExchange, next_funding_timestamp
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, FundingRate, SymbolSet, Symbol, OrderBook, Trade, MarkPrice, OpenInterest
+from src.models.funding_rate import RunningFundingRate
 
 
 class DeribitFundingRate(FundingRate):
@@ -23,12 +24,19 @@ class Exchange(BaseExchange):
     EXCHANGE_ID = ExchangeEnum.DERIBIT
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.DERIBIT, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='BTC-PERPETUAL'),
+        Symbol(exchange_id=ExchangeEnum.DERIBIT, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='ETH-PERPETUAL', base=AssetEnum.ETH),
     ])
+    SERVER_TIME_ENDPOINT = '/public/get_time'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://docs.deribit.com/#public-get_time
+        return pendulum.from_timestamp(response['result'] / 1000)
 
     @classmethod
     def _fetch_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum):
         # https://docs.deribit.com/#public-get_tradingview_chart_data
-        now = pendulum.now('UTC')
+        now = cls.now()
         endpoint = f'/public/get_tradingview_chart_data'
         params = {
             'instrument_name': symbol.native_id,
@@ -54,7 +62,7 @@ class Exchange(BaseExchange):
     async def _fetch_funding(cls, symbol: Symbol) -> list[FundingRate]:
         # https://docs.deribit.com/#public-get_funding_rate_history
         endpoint = '/public/get_funding_rate_history'
-        now = pendulum.now('UTC')
+        now = cls.now()
         params = {
             'instrument_name': symbol.native_id,
             'start_timestamp': int(1000 * now.subtract(days=28).timestamp()),
@@ -64,4 +72,63 @@ class Exchange(BaseExchange):
 
     @staticmethod
     def _parse_funding(response: dict[str, Any]) -> list[DeribitFundingRate]:
-        return parse_obj_as(list[DeribitFundingRate], response['result'])
\ No newline at end of file
+        return parse_obj_as(list[DeribitFundingRate], response['result'])
+
+    @classmethod
+    async def _fetch_running_funding(cls, symbol: Symbol):
+        # https://docs.deribit.com/#public-ticker
+        # no predicted funding, see src.predicted_funding for computing it from the mark and index sampled here
+        endpoint = '/public/ticker'
+        params = {'instrument_name': symbol.native_id}
+        return await cls._fetch_shared(f'{endpoint}/{symbol.native_id}',
+                                       lambda: cls._fetch_endpoint(endpoint, params=params))
+
+    @staticmethod
+    def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
+        # funding accrues continuously, funding_8h is the rate of the last 8h, no predicted rate is published
+        result = response['result']
+        timestamp = pendulum.from_timestamp(result['timestamp'] / 1000)
+        return RunningFundingRate(
+            timestamp=timestamp,
+            funding_timestamp=next_funding_timestamp(timestamp, dt.timedelta(hours=8)),
+            funding_rate=result['funding_8h'],
+            predicted_funding_rate=None,
+        )
+
+    @staticmethod
+    def _parse_mark_price(response: dict[str, Any]) -> MarkPrice:
+        result = response['result']
+        return MarkPrice(timestamp=pendulum.from_timestamp(result['timestamp'] / 1000),
+                         mark_price=result['mark_price'], index_price=result['index_price'])
+
+    @staticmethod
+    def _parse_open_interest(response: dict[str, Any]) -> OpenInterest:
+        result = response['result']
+        return OpenInterest(timestamp=pendulum.from_timestamp(result['timestamp'] / 1000),
+                            open_interest=result['open_interest'])
+
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://docs.deribit.com/#public-get_order_book
+        params = {'instrument_name': symbol.native_id, 'depth': min(depth, 10_000)}
+        return await cls._fetch_endpoint('/public/get_order_book', params=params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        result = response['result']
+        return OrderBook.from_levels(
+            result['bids'], result['asks'],
+            timestamp=pendulum.from_timestamp(result['timestamp'] / 1000),
+            sequence=result['change_id'],
+        )
+
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://docs.deribit.com/#public-get_last_trades_by_instrument
+        params = {'instrument_name': symbol.native_id, 'count': 1000}
+        return await cls._fetch_endpoint('/public/get_last_trades_by_instrument', params=params)
+
+    @staticmethod
+    def _parse_trades(response: dict[str, Any]) -> list[Trade]:
+        return [Trade(timestamp=pendulum.from_timestamp(r['timestamp'] / 1000), price=r['price'], size=r['amount'],
+                      side=r['direction'], id=r['trade_id']) for r in response['result']['trades']]
@@ -1,12 +1,13 @@
 import datetime as dt
 from typing import Any
 
+import pendulum
 from devtools import debug
 from pydantic import Field, parse_obj_as, NonNegativeFloat
 
 from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol, FundingRate
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, SymbolSet, Symbol, FundingRate, OrderBook
 
 
 class FtxOhlc(OHLC):
@@ -22,7 +23,16 @@ class Exchange(BaseExchange):
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.FTX, symbol_type=SymbolTypeEnum.SPOT, native_id='BTC/USD'),
         Symbol(exchange_id=ExchangeEnum.FTX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='BTC-PERP'),
+        Symbol(exchange_id=ExchangeEnum.FTX, symbol_type=SymbolTypeEnum.SPOT, native_id='ETH/USD', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.FTX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='ETH-PERP', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.FTX, symbol_type=SymbolTypeEnum.SPOT, native_id='SOL/USD', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.FTX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='SOL-PERP', base=AssetEnum.SOL),
     ])
+    SERVER_TIME_ENDPOINT = '/time'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        return pendulum.parse(response['result'])
 
     @classmethod
     def _fetch_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum):
@@ -51,3 +61,14 @@ class Exchange(BaseExchange):
     def _parse_funding(response: dict[str, Any]) -> list[FtxFundingRate]:
 
         return parse_obj_as(list[FtxFundingRate], response['result'])
+
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://docs.ftx.com/#get-orderbook
+        endpoint = f'/markets/{symbol.native_id}/orderbook'
+        params = {'depth': min(depth, 100)}
+        return await cls._fetch_endpoint(endpoint, params=params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        return OrderBook.from_levels(response['result']['bids'], response['result']['asks'])
@@ -6,9 +6,9 @@ from devtools import debug
 from loguru import logger
 from pydantic import Field, parse_obj_as
 
-from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum
+from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum, AssetEnum
 from src.exchanges.base import BaseExchange, AbstractBaseExchange
-from src.models import FundingRate, OHLC, SymbolSet, Symbol
+from src.models import FundingRate, OHLC, SymbolSet, Symbol, OrderBook
 from src.models.funding_rate import RunningFundingRate
 
 TIMEFRAME = {
@@ -34,6 +34,9 @@ class HuobiBaseExchange(BaseExchange):
         Symbol(exchange_id=ExchangeEnum.HUOBI, symbol_type=SymbolTypeEnum.SPOT, native_id='btcusdt'),
         Symbol(exchange_id=ExchangeEnum.HUOBI, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='btc-usd'),
         Symbol(exchange_id=ExchangeEnum.HUOBI, symbol_type=SymbolTypeEnum.PERP_USD, native_id='btc-usdt'),
+        Symbol(exchange_id=ExchangeEnum.HUOBI, symbol_type=SymbolTypeEnum.SPOT, native_id='ethusdt', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.HUOBI, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='eth-usd', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.HUOBI, symbol_type=SymbolTypeEnum.PERP_USD, native_id='eth-usdt', base=AssetEnum.ETH),
     ])
 
     #############
@@ -102,38 +105,85 @@ class HuobiBaseExchange(BaseExchange):
         }
         return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params=params)
 
-    @staticmethod
-    def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
+    @classmethod
+    def _parse_running_funding(cls, response: dict[str, Any]) -> RunningFundingRate:
         result = response['data']
         # debug(result)
         return RunningFundingRate(
-            timestamp=pendulum.now('UTC'),
+            timestamp=cls.now(),
             funding_timestamp=result['funding_time'],
             funding_rate=result['funding_rate'],
             predicted_funding_rate=result['estimated_rate']
         )
 
 
+    ##############
+    # Order book
+    ##############
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://huobiapi.github.io/docs/spot/v1/en/#get-market-depth
+        # https://huobiapi.github.io/docs/coin_margined_swap/v1/en/#get-market-depth
+        # https://huobiapi.github.io/docs/usdt_swap/v1/en/#general-get-market-depth
+        endpoint = {
+            SymbolTypeEnum.SPOT: '/market/depth',
+            SymbolTypeEnum.PERP_BTC: '/swap-ex/market/depth',
+            SymbolTypeEnum.PERP_USD: '/linear-swap-ex/market/depth',
+        }
+        params = {
+            'symbol': symbol.native_id,
+            'contract_code': symbol.native_id,
+            'type': 'step0',  # no aggregation, 150 levels
+        }
+        return await cls._fetch_endpoint(endpoint[symbol.symbol_type], params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        tick = response['tick']
+        return OrderBook.from_levels(tick['bids'], tick['asks'], timestamp=pendulum.from_timestamp(tick['ts'] / 1000))
+
+
 class HuobiSpotExchange(HuobiBaseExchange):
     API_BASE_PATH = 'https://api.huobi.pro'
+    SERVER_TIME_ENDPOINT = '/v1/common/timestamp'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://huobiapi.github.io/docs/spot/v1/en/#get-current-timestamp
+        return pendulum.from_timestamp(response['data'] / 1000)
 
 
 class HuobiPerpExchange(HuobiBaseExchange):
     API_BASE_PATH = 'https://api.hbdm.com'
+    SERVER_TIME_ENDPOINT = '/api/v1/timestamp'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://huobiapi.github.io/docs/coin_margined_swap/v1/en/#get-current-system-timestamp
+        return pendulum.from_timestamp(response['ts'] / 1000)
 
 
 class Exchange(AbstractBaseExchange):
     EXCHANGE_ID: ExchangeEnum = ExchangeEnum.HUOBI
     SPOT: ClassVar[HuobiSpotExchange] = HuobiSpotExchange()
     PERP: ClassVar[HuobiPerpExchange] = HuobiPerpExchange()
+    SYMBOLS: ClassVar[SymbolSet] = HuobiBaseExchange.SYMBOLS
 
     @classmethod
-    async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum) -> list[OHLC]:
+    async def get_ohlc(cls, symbol_type: SymbolTypeEnum, timeframe: TimeFrameEnum, **kwargs) -> list[OHLC]:
         match symbol_type:
             case SymbolTypeEnum.SPOT:
-                return await cls.SPOT.get_ohlc(symbol_type, timeframe)
+                return await cls.SPOT.get_ohlc(symbol_type, timeframe, **kwargs)
             case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
-                return await cls.PERP.get_ohlc(symbol_type, timeframe)
+                return await cls.PERP.get_ohlc(symbol_type, timeframe, **kwargs)
+
+    @classmethod
+    async def get_orderbook(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OrderBook:
+        match symbol_type:
+            case SymbolTypeEnum.SPOT:
+                return await cls.SPOT.get_orderbook(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_orderbook(symbol_type, **kwargs)
 
     @classmethod
     async def get_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[FundingRate]:
@@ -144,9 +194,18 @@ class Exchange(AbstractBaseExchange):
                 raise NotImplementedError
 
     @classmethod
-    async def get_running_funding(cls, symbol_type: SymbolTypeEnum) -> RunningFundingRate:
+    async def get_running_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> RunningFundingRate:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
+                return await cls.PERP.get_running_funding(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_running_fundings(cls, symbol_type: SymbolTypeEnum,
+                                   bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
         match symbol_type:
             case SymbolTypeEnum.PERP_BTC | SymbolTypeEnum.PERP_USD:
-                return await cls.PERP.get_running_funding(symbol_type)
+                return await cls.PERP.get_running_fundings(symbol_type, bases)
             case _:
                 raise NotImplementedError
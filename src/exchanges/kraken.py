@@ -3,8 +3,8 @@ from typing import ClassVar
 from src.exchanges.base import AbstractBaseExchange
 from .kraken_perp import Exchange as KrakenPerp
 from .kraken_spot import Exchange as KrakenSpot
-from ..enums import SymbolTypeEnum, ExchangeEnum
-from ..models import OHLC, FundingRate
+from ..enums import SymbolTypeEnum, ExchangeEnum, AssetEnum
+from ..models import OHLC, FundingRate, SymbolSet, OrderBook, Trade, MarkPrice, OpenInterest
 from ..models.funding_rate import RunningFundingRate
 
 
@@ -12,6 +12,7 @@ class Exchange(AbstractBaseExchange):
     EXCHANGE_ID: ExchangeEnum = ExchangeEnum.KRAKEN
     SPOT: ClassVar[KrakenSpot] = KrakenSpot()
     PERP: ClassVar[KrakenPerp] = KrakenPerp()
+    SYMBOLS: ClassVar[SymbolSet] = KrakenSpot.SYMBOLS + KrakenPerp.SYMBOLS
 
     @classmethod
     async def get_ohlc(cls, symbol_type: SymbolTypeEnum, *args, **kwargs) -> list[OHLC]:
@@ -21,6 +22,22 @@ class Exchange(AbstractBaseExchange):
             case SymbolTypeEnum.PERP_BTC:
                 return await cls.PERP.get_ohlc(symbol_type, *args, **kwargs)
 
+    @classmethod
+    async def get_orderbook(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OrderBook:
+        match symbol_type:
+            case SymbolTypeEnum.SPOT:
+                return await cls.SPOT.get_orderbook(symbol_type, **kwargs)
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP.get_orderbook(symbol_type, **kwargs)
+
+    @classmethod
+    async def get_trades(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[Trade]:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP.get_trades(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
     @classmethod
     async def get_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> list[FundingRate]:
         match symbol_type:
@@ -30,9 +47,34 @@ class Exchange(AbstractBaseExchange):
                 raise NotImplementedError
 
     @classmethod
-    async def get_running_funding(cls, symbol_type: SymbolTypeEnum) -> RunningFundingRate:
+    async def get_running_funding(cls, symbol_type: SymbolTypeEnum, **kwargs) -> RunningFundingRate:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP.get_running_funding(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_running_fundings(cls, symbol_type: SymbolTypeEnum,
+                                   bases: list[AssetEnum]) -> dict[AssetEnum, RunningFundingRate]:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP.get_running_fundings(symbol_type, bases)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_mark_price(cls, symbol_type: SymbolTypeEnum, **kwargs) -> MarkPrice:
+        match symbol_type:
+            case SymbolTypeEnum.PERP_BTC:
+                return await cls.PERP.get_mark_price(symbol_type, **kwargs)
+            case _:
+                raise NotImplementedError
+
+    @classmethod
+    async def get_open_interest(cls, symbol_type: SymbolTypeEnum, **kwargs) -> OpenInterest:
         match symbol_type:
             case SymbolTypeEnum.PERP_BTC:
-                return await cls.PERP.get_running_funding(symbol_type)
+                return await cls.PERP.get_open_interest(symbol_type, **kwargs)
             case _:
                 raise NotImplementedError
\ No newline at end of file
@@ -5,9 +5,10 @@ import pendulum
 from devtools import debug
 from pydantic import Field, parse_obj_as
 
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.exchanges.base import BaseExchange
-from src.models import OHLC, SymbolSet, Symbol, FundingRate
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.exchanges.base import BaseExchange, next_funding_timestamp
+from src.models import OHLC, SymbolSet, Symbol, FundingRate, SymbolNativeId, OrderBook, Trade, MarkPrice, \
+    OpenInterest
 from src.models.funding_rate import RunningFundingRate
 
 TIMEFRAME = {
@@ -29,6 +30,8 @@ class Exchange(BaseExchange):
     EXCHANGE_ID = ExchangeEnum.KRAKEN
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.KRAKEN, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='PI_XBTUSD'),
+        Symbol(exchange_id=ExchangeEnum.KRAKEN, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='PI_ETHUSD', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.KRAKEN, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='PI_XRPUSD', base=AssetEnum.XRP),
     ])
 
     #############
@@ -39,7 +42,7 @@ class Exchange(BaseExchange):
         # https://support.kraken.com/hc/en-us/articles/4403284627220-OHLC
         endpoint = f'api/charts/v1/trade/{symbol.native_id}/{TIMEFRAME[timeframe]}'
         params = {
-            'from': pendulum.now('UTC').subtract(minutes=1000 * timeframe.value).int_timestamp
+            'from': cls.now().subtract(minutes=1000 * timeframe.value).int_timestamp
         }
         return await cls._fetch_endpoint(endpoint, params)
 
@@ -69,20 +72,67 @@ class Exchange(BaseExchange):
     ###############
     @classmethod
     async def _fetch_running_funding(cls, symbol: Symbol):
+        return (await cls._fetch_running_funding_batch([symbol])).get(symbol.native_id)
+
+    @classmethod
+    async def _fetch_running_funding_batch(cls, symbols: list[Symbol]) -> dict[SymbolNativeId, Any]:
+        tickers = await cls._fetch_tickers()
+        return {symbol.native_id: tickers[symbol.native_id] for symbol in symbols if symbol.native_id in tickers}
+
+    @classmethod
+    async def _fetch_tickers(cls) -> dict[SymbolNativeId, Any]:
         # https://support.kraken.com/hc/en-us/articles/360022839531-Tickers
         endpoint = 'derivatives/api/v3/tickers'
-        response = await cls._fetch_endpoint(endpoint)
-        for record in response['tickers']:
-            if record['symbol'].upper() == symbol.native_id:
-                return record
 
-    @staticmethod
-    def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
+        async def fetch_and_index():
+            response = await cls._fetch_endpoint(endpoint)
+            return {record['symbol'].upper(): record for record in response['tickers']} if response else None
+
+        return await cls._fetch_shared(endpoint, fetch_and_index)
+
+    @classmethod
+    def _parse_running_funding(cls, response: dict[str, Any]) -> RunningFundingRate:
         # debug(response)
         scale_factor = 1_000_000
         return RunningFundingRate(
-            timestamp=pendulum.now('UTC'),
+            timestamp=cls.now(),
             funding_rate=response['fundingRate'] * scale_factor,
             predicted_funding_rate=response['fundingRatePrediction'] * scale_factor,
-            funding_timestamp = pendulum.now('UTC') #TODO: get correct time
-        )
\ No newline at end of file
+            funding_timestamp=next_funding_timestamp(cls.now(), dt.timedelta(hours=1)),  # settles every hour
+        )
+
+    @classmethod
+    def _parse_mark_price(cls, response: dict[str, Any]) -> MarkPrice:
+        return MarkPrice(timestamp=cls.now(), mark_price=response['markPrice'], index_price=response.get('indexPrice'))
+
+    @classmethod
+    def _parse_open_interest(cls, response: dict[str, Any]) -> OpenInterest:
+        return OpenInterest(timestamp=cls.now(), open_interest=response['openInterest'])
+
+    ###############
+    # Order book
+    ###############
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://support.kraken.com/hc/en-us/articles/360022839551-Order-Book
+        params = {'symbol': symbol.native_id}
+        return await cls._fetch_endpoint('derivatives/api/v3/orderbook', params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        return OrderBook.from_levels(response['orderBook']['bids'], response['orderBook']['asks'],
+                                     timestamp=pendulum.parse(response['serverTime']))
+
+    ###############
+    # Trades
+    ###############
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://support.kraken.com/hc/en-us/articles/360022839531-Trade-History
+        params = {'symbol': symbol.native_id}
+        return await cls._fetch_endpoint('derivatives/api/v3/history', params)
+
+    @staticmethod
+    def _parse_trades(response: dict[str, Any]) -> list[Trade]:
+        return [Trade(timestamp=pendulum.parse(r['time']), price=r['price'], size=r['size'], side=r['side'],
+                      id=r['uid']) for r in response['history']]
@@ -1,10 +1,12 @@
+import datetime as dt
 from typing import Any
 
+import pendulum
 from devtools import debug
 
 from src.exchanges.base import BaseExchange
-from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol
+from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum, AssetEnum
+from src.models import OHLC, SymbolSet, Symbol, OrderBook
 
 
 class Exchange(BaseExchange):
@@ -12,7 +14,16 @@ class Exchange(BaseExchange):
     EXCHANGE_ID = ExchangeEnum.KRAKEN
     SYMBOLS = SymbolSet([
         Symbol(exchange_id=ExchangeEnum.KRAKEN, symbol_type=SymbolTypeEnum.SPOT, native_id='XXBTZUSD'),
+        Symbol(exchange_id=ExchangeEnum.KRAKEN, symbol_type=SymbolTypeEnum.SPOT, native_id='XETHZUSD', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.KRAKEN, symbol_type=SymbolTypeEnum.SPOT, native_id='XXRPZUSD', base=AssetEnum.XRP),
     ])
+    SERVER_TIME_ENDPOINT = '/public/Time'
+    SERVER_TIME_RESOLUTION = 1.
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://docs.kraken.com/rest/#operation/getServerTime
+        return pendulum.from_timestamp(response['result']['unixtime'])
 
     @classmethod
     def _fetch_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum):
@@ -27,4 +38,19 @@ class Exchange(BaseExchange):
     @staticmethod
     def _parse_ohlc(response: dict[str, Any]) -> list[OHLC]:
         #return [OHLC.from_list(r, labels) for r in response['result']['XXBTZUSD']]
-        return [OHLC.from_list(r[:5]) for r in list(response['result'].values())[0]]
\ No newline at end of file
+        return [OHLC.from_list(r[:5]) for r in list(response['result'].values())[0]]
+
+
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://docs.kraken.com/rest/#operation/getOrderBook
+        params = {'pair': symbol.native_id, 'count': min(depth, 500)}
+        return await cls._fetch_endpoint('/public/Depth', params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        book = list(response['result'].values())[0]
+        return OrderBook.from_levels(
+            bids=[level[:2] for level in book['bids']],
+            asks=[level[:2] for level in book['asks']],
+        )
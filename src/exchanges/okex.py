@@ -5,9 +5,9 @@ import pendulum
 from devtools import debug
 from pydantic import Field, parse_obj_as
 
-from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum
+from src.enums import ExchangeEnum, SymbolTypeEnum, TimeFrameEnum, AssetEnum
 from src.exchanges.base import BaseExchange
-from src.models import OHLC, FundingRate, SymbolSet, Symbol
+from src.models import OHLC, FundingRate, SymbolSet, Symbol, OrderBook, Trade
 from src.models.funding_rate import RunningFundingRate
 
 TIMEFRAME = {
@@ -30,7 +30,19 @@ class Exchange(BaseExchange):
         Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.SPOT, native_id='BTC-USDT'),
         Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='BTC-USD-SWAP'),
         Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='BTC-USDT-SWAP'),
+        Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.SPOT, native_id='ETH-USDT', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='ETH-USD-SWAP', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='ETH-USDT-SWAP', base=AssetEnum.ETH),
+        Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.SPOT, native_id='SOL-USDT', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.PERP_BTC, native_id='SOL-USD-SWAP', base=AssetEnum.SOL),
+        Symbol(exchange_id=ExchangeEnum.OKEX, symbol_type=SymbolTypeEnum.PERP_USD, native_id='SOL-USDT-SWAP', base=AssetEnum.SOL),
     ])
+    SERVER_TIME_ENDPOINT = '/api/v5/public/time'
+
+    @staticmethod
+    def _parse_server_time(response: dict[str, Any]) -> dt.datetime:
+        # https://www.okx.com/docs-v5/en/#rest-api-public-data-get-system-time
+        return pendulum.from_timestamp(int(response['data'][0]['ts']) / 1000)
 
     #############
     # OHLC
@@ -73,17 +85,51 @@ class Exchange(BaseExchange):
     @classmethod
     async def _fetch_running_funding(cls, symbol: Symbol):
         # https://www.okx.com/docs-v5/en/#rest-api-public-data-get-funding-rate
+        # funding rate endpoint requires instId and market tickers carry no funding,
+        # so batch falls back to the concurrent per symbol requests
         endpoint = '/api/v5/public/funding-rate'
         params = {'instId': symbol.native_id}
         return await cls._fetch_endpoint(endpoint, params=params)
 
-    @staticmethod
-    def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
-        result = response['data'].pop()
+    @classmethod
+    def _parse_running_funding(cls, response: dict[str, Any]) -> RunningFundingRate:
+        result = response['data'][-1]
         #debug(result)
         return RunningFundingRate(
-            timestamp=pendulum.now('UTC'),
+            timestamp=cls.now(),
             funding_rate=result['fundingRate'],
             funding_timestamp=result['fundingTime'],
             predicted_funding_rate=result['nextFundingRate']
         )
+
+    ##############
+    # Order book
+    ##############
+    @classmethod
+    async def _fetch_orderbook(cls, symbol: Symbol, depth: int):
+        # https://www.okx.com/docs-v5/en/#rest-api-market-data-get-order-book
+        params = {'instId': symbol.native_id, 'sz': min(depth, 400)}
+        return await cls._fetch_endpoint('/api/v5/market/books', params=params)
+
+    @staticmethod
+    def _parse_orderbook(response: dict[str, Any]) -> OrderBook:
+        result = response['data'][0]
+        return OrderBook.from_levels(
+            bids=[level[:2] for level in result['bids']],
+            asks=[level[:2] for level in result['asks']],
+            timestamp=pendulum.from_timestamp(int(result['ts']) / 1000),
+        )
+
+    ##############
+    # Trades
+    ##############
+    @classmethod
+    async def _fetch_trades(cls, symbol: Symbol):
+        # https://www.okx.com/docs-v5/en/#rest-api-market-data-get-trades
+        params = {'instId': symbol.native_id, 'limit': 500}
+        return await cls._fetch_endpoint('/api/v5/market/trades', params=params)
+
+    @staticmethod
+    def _parse_trades(response: dict[str, Any]) -> list[Trade]:
+        return [Trade(timestamp=pendulum.from_timestamp(int(r['ts']) / 1000), price=r['px'], size=r['sz'],
+                      side=r['side'], id=r['tradeId']) for r in response['data']]
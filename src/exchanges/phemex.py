@@ -6,9 +6,9 @@ from devtools import debug
 from loguru import logger
 from pydantic import validator, Field, parse_obj_as
 
-from src.exchanges.base import BaseExchange
+from src.exchanges.base import BaseExchange, next_funding_timestamp
 from src.enums import TimeFrameEnum, ExchangeEnum, SymbolTypeEnum
-from src.models import OHLC, SymbolSet, Symbol, FundingRate
+from src.models import OHLC, SymbolSet, Symbol, FundingRate, MarkPrice, OpenInterest
 from src.models.funding_rate import RunningFundingRate
 
 SCALE_FACTOR = 10_000
@@ -39,7 +39,7 @@ class Exchange(BaseExchange):
     def _fetch_ohlc(cls, symbol: Symbol, timeframe: TimeFrameEnum):
         # https://github.com/phemex/phemex-api-docs/blob/master/Public-Contract-API-en.md#querykline
         endpoint = '/exchange/public/md/kline'
-        now = pendulum.now('UTC')
+        now = cls.now()
         limit = 1000
         params = {
             'symbol': symbol.native_id,
@@ -95,15 +95,29 @@ class Exchange(BaseExchange):
         # https://github.com/phemex/phemex-api-docs/blob/master/Public-Contract-API-en.md#query24hrsticker
         endpoint = '/md/ticker/24hr'
         params = {'symbol': symbol.native_id}
-        return await cls._fetch_endpoint(endpoint, params=params)
+        # shared within the tick by running funding, mark price and open interest
+        return await cls._fetch_shared(f'{endpoint}/{symbol.native_id}',
+                                       lambda: cls._fetch_endpoint(endpoint, params=params))
 
-    @staticmethod
-    def _parse_running_funding(response: dict[str, Any]) -> RunningFundingRate:
+    @classmethod
+    def _parse_running_funding(cls, response: dict[str, Any]) -> RunningFundingRate:
         result = response['result']
         #debug(result)
         return RunningFundingRate(
-            timestamp=pendulum.now('UTC'),
+            timestamp=cls.now(),
             funding_rate=result['fundingRate'] / SCALE_FACTOR ** 2,
-            funding_timestamp=pendulum.now('UTC'),  # TODO: fix
+            funding_timestamp=next_funding_timestamp(cls.now(), dt.timedelta(hours=8)),  # 00:00, 08:00, 16:00 UTC
             predicted_funding_rate=result['predFundingRate'] / SCALE_FACTOR ** 2
         )
+
+    @staticmethod
+    def _parse_mark_price(response: dict[str, Any]) -> MarkPrice:
+        result = response['result']
+        return MarkPrice(timestamp=pendulum.from_timestamp(result['timestamp'] / 1e9),
+                         mark_price=result['markEp'] / SCALE_FACTOR, index_price=result['indexEp'] / SCALE_FACTOR)
+
+    @staticmethod
+    def _parse_open_interest(response: dict[str, Any]) -> OpenInterest:
+        result = response['result']
+        return OpenInterest(timestamp=pendulum.from_timestamp(result['timestamp'] / 1e9),
+                            open_interest=result['openInterest'])
@@ -0,0 +1,203 @@
+"""
+Streaming OHLC export.
+
+Candles flow as page sized chunks ordered by period from sources (async generators) to sinks,
+so memory use is bounded by the page size and number of merged venues, not by the exported range.
+"""
+from __future__ import annotations
+
+import abc
+import csv
+import datetime as dt
+import heapq
+import json
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, TextIO
+
+from src.enums import ExchangeEnum
+from src.models import OHLC
+
+OhlcPage = list[OHLC]
+VenueOhlc = tuple[ExchangeEnum | None, OHLC]
+FIELDS = ('period', 'venue', 'open', 'high', 'low', 'close')
+
+
+#################
+# Sources
+#################
+async def paginate(ohlc: Iterable[OHLC] | AsyncIterable[OHLC], page_size: int = 1000) -> AsyncIterator[OhlcPage]:
+    """Chunks (already period ordered) OHLC stream into pages."""
+    page = []
+    if isinstance(ohlc, AsyncIterable):
+        async for o in ohlc:
+            page.append(o)
+            if len(page) >= page_size:
+                yield page
+                page = []
+    else:
+        for o in ohlc:
+            page.append(o)
+            if len(page) >= page_size:
+                yield page
+                page = []
+    if page:
+        yield page
+
+
+async def window_pages(fetch_window: Callable[[dt.datetime, dt.datetime], Awaitable[list[OHLC]]],
+                       since: dt.datetime, until: dt.datetime, window: dt.timedelta) -> AsyncIterator[OhlcPage]:
+    """
+    Walks <since, until) in windows, yielding every fetched window sorted by period.
+    Candles outside of the window or already yielded are dropped, so overlapping venue responses are fine.
+    """
+    last_period = None
+    start = since
+    while start < until:
+        end = min(start + window, until)
+        page = sorted((o for o in await fetch_window(start, end)
+                       if start <= o.period < end and (last_period is None or o.period > last_period)),
+                      key=lambda o: o.period)
+        if page:
+            last_period = page[-1].period
+            yield page
+        start = end
+
+
+async def merge_by_period(sources: dict[ExchangeEnum, AsyncIterable[OhlcPage]],
+                          page_size: int = 1000) -> AsyncIterator[list[VenueOhlc]]:
+    """
+    K-way merge of period ordered page streams of multiple venues into one period ordered page stream.
+    Only one page per venue is held in memory.
+    """
+    iterators = {venue: aiter(pages) for venue, pages in sources.items()}
+    buffers: dict[ExchangeEnum, tuple[OhlcPage, int]] = {}
+    heap = []
+
+    async def advance(venue: ExchangeEnum) -> None:
+        page, i = buffers.get(venue, ([], 0))
+        i += 1
+        while i >= len(page):
+            try:
+                page, i = await anext(iterators[venue]), 0
+            except StopAsyncIteration:
+                buffers.pop(venue, None)
+                return
+        buffers[venue] = (page, i)
+        heapq.heappush(heap, (page[i].period, venue))
+
+    for venue in iterators:
+        buffers[venue] = ([], -1)
+        await advance(venue)
+
+    merged = []
+    while heap:
+        _, venue = heapq.heappop(heap)
+        page, i = buffers[venue]
+        merged.append((venue, page[i]))
+        await advance(venue)
+        # never split one period across pages, so consumers can aggregate per page
+        if len(merged) >= page_size and (not heap or heap[0][0] != merged[-1][1].period):
+            yield merged
+            merged = []
+    if merged:
+        yield merged
+
+
+#################
+# Sinks
+#################
+class OhlcSink(abc.ABC):
+
+    def __enter__(self) -> OhlcSink:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @abc.abstractmethod
+    def write(self, rows: list[VenueOhlc]) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _row(venue: ExchangeEnum | None, o: OHLC) -> tuple:
+        return o.period.isoformat(), venue.value if venue else None, o.open, o.high, o.low, o.close
+
+
+class CsvSink(OhlcSink):
+
+    def __init__(self, path: str | Path) -> None:
+        self._file: TextIO = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FIELDS)
+
+    def write(self, rows: list[VenueOhlc]) -> None:
+        self._writer.writerows(self._row(venue, o) for venue, o in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NdjsonSink(OhlcSink):
+
+    def __init__(self, path: str | Path) -> None:
+        self._file: TextIO = open(path, 'w')
+
+    def write(self, rows: list[VenueOhlc]) -> None:
+        self._file.writelines(json.dumps(dict(zip(FIELDS, self._row(venue, o)))) + '\n' for venue, o in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(OhlcSink):
+    """Writes one parquet row group per page. Requires optional pyarrow."""
+
+    def __init__(self, path: str | Path) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError('ParquetSink requires pyarrow, install it with `pip install pyarrow`') from e
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([
+            ('period', pyarrow.timestamp('ms', tz='UTC')),
+            ('venue', pyarrow.string()),
+            ('open', pyarrow.float64()),
+            ('high', pyarrow.float64()),
+            ('low', pyarrow.float64()),
+            ('close', pyarrow.float64()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(str(path), self._schema)
+
+    def write(self, rows: list[VenueOhlc]) -> None:
+        columns = {
+            'period': [o.period for _, o in rows],
+            'venue': [venue.value if venue else None for venue, _ in rows],
+            'open': [o.open for _, o in rows],
+            'high': [o.high for _, o in rows],
+            'low': [o.low for _, o in rows],
+            'close': [o.close for _, o in rows],
+        }
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+#################
+# Export
+#################
+async def export(pages: AsyncIterable[OhlcPage | list[VenueOhlc]], sink: OhlcSink,
+                 venue: ExchangeEnum | None = None) -> int:
+    """Drains page stream into sink, returns number of written rows."""
+    n = 0
+    with sink:
+        async for page in pages:
+            rows = [(venue, o) if isinstance(o, OHLC) else o for o in page]
+            sink.write(rows)
+            n += len(rows)
+    return n
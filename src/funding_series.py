@@ -0,0 +1,139 @@
+"""
+Indexed funding rate series.
+
+Funding rates of a venue are kept as sorted int64 ms timestamps + float64 rates with prefix sums, so as-of
+lookups are O(log n) (O(n + m) for sorted batches), cumulative funding over any window is O(log n) and
+venues with different cadence (Deribit hourly, most perps 8h) can be resampled to a common one.
+
+Columns are the src.codec ones, decoded payloads are joined without building models:
+
+    series = FundingSeries.from_columns(FundingColumns.decode(funding_payload))
+    rates = series.join_columns(OhlcColumns.decode(ohlc_payload))  # float64 column aligned to candles, NaN if none
+"""
+from __future__ import annotations
+
+import datetime as dt
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from statistics import median
+from typing import Literal, Sequence
+
+import pendulum
+
+from src.codec import FundingColumns, OhlcColumns, to_ms
+from src.models import FundingRate, OHLC
+
+Direction = Literal['backward', 'forward']
+Timestamp = dt.datetime | int
+
+
+def _ms(timestamp: Timestamp) -> int:
+    return timestamp if isinstance(timestamp, int) else to_ms(timestamp)
+
+
+class FundingSeries:
+
+    def __init__(self, timestamps: Sequence[int], rates: Sequence[float], interval: dt.timedelta | None = None) -> None:
+        """
+        :param timestamps: sorted unique settlement times in ms
+        :param rates: funding rate settled at timestamp (for the interval ending at timestamp)
+        :param interval: funding cadence, inferred from timestamps when not given
+        """
+        # typed columns (arrays, decoded memoryviews) are used as they are
+        self.timestamps = timestamps if isinstance(timestamps, (array, memoryview)) else array('q', timestamps)
+        self.rates = rates if isinstance(rates, (array, memoryview)) else array('d', rates)
+        self._prefix = array('d', accumulate(self.rates, initial=0.))
+        if interval is None and len(self.timestamps) > 1:
+            interval = dt.timedelta(milliseconds=median(b - a for a, b in zip(self.timestamps, self.timestamps[1:])))
+        self.interval = interval
+
+    @classmethod
+    def from_rates(cls, funding: list[FundingRate], interval: dt.timedelta | None = None) -> FundingSeries:
+        by_timestamp = {_ms(f.timestamp): f.funding_rate for f in funding}  # last one wins for duplicates
+        timestamps = sorted(by_timestamp)
+        return cls(timestamps, [by_timestamp[t] for t in timestamps], interval)
+
+    @classmethod
+    def from_columns(cls, columns: FundingColumns, interval: dt.timedelta | None = None) -> FundingSeries:
+        return cls(columns.timestamp, columns.funding_rate, interval)
+
+    def to_rates(self) -> list[FundingRate]:
+        return [FundingRate(timestamp=pendulum.from_timestamp(t / 1000), funding_rate=r)
+                for t, r in zip(self.timestamps, self.rates)]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    ###############
+    # As-of
+    ###############
+    def _index(self, timestamp: int, direction: Direction) -> int | None:
+        if direction == 'backward':
+            i = bisect_right(self.timestamps, timestamp) - 1
+            return i if i >= 0 else None
+        i = bisect_left(self.timestamps, timestamp)
+        return i if i < len(self.timestamps) else None
+
+    def asof(self, timestamps: Sequence[Timestamp], direction: Direction = 'backward') -> list[float | None]:
+        """
+        Funding rate settled at or before (backward) / at or after (forward) every timestamp.
+        Sorted input is joined in one merge pass, unsorted falls back to binary search per timestamp.
+        """
+        query = timestamps if isinstance(timestamps, (array, memoryview)) else [_ms(t) for t in timestamps]
+        if any(a > b for a, b in zip(query, query[1:])):
+            indexes = (self._index(t, direction) for t in query)
+            return [None if i is None else self.rates[i] for i in indexes]
+        result = []
+        n = len(self.timestamps)
+        i = 0
+        for t in query:
+            if direction == 'backward':
+                while i < n and self.timestamps[i] <= t:
+                    i += 1
+                result.append(self.rates[i - 1] if i else None)
+            else:
+                while i < n and self.timestamps[i] < t:
+                    i += 1
+                result.append(self.rates[i] if i < n else None)
+        return result
+
+    def join_ohlc(self, ohlc: list[OHLC], direction: Direction = 'backward') -> list[tuple[OHLC, float | None]]:
+        """As-of join of funding rates to candle periods."""
+        ohlc = sorted(ohlc, key=lambda o: o.period)
+        return list(zip(ohlc, self.asof([o.period for o in ohlc], direction)))
+
+    def join_columns(self, ohlc: OhlcColumns, direction: Direction = 'backward') -> array:
+        """As-of join to candle columns, float64 column aligned to their rows with NaN where there is no rate."""
+        return array('d', (float('nan') if r is None else r for r in self.asof(ohlc.timestamp, direction)))
+
+    ###############
+    # Aggregation
+    ###############
+    def cumulative(self, start: Timestamp, end: Timestamp) -> float:
+        """Sum of funding settled in window (start, end>."""
+        i = bisect_right(self.timestamps, _ms(start))
+        j = bisect_right(self.timestamps, _ms(end))
+        return self._prefix[j] - self._prefix[i] if j > i else 0.
+
+    def resample(self, interval: dt.timedelta) -> FundingSeries:
+        """
+        Resamples to common cadence, buckets are labeled by their end (settlement time).
+        Coarser cadence sums settled rates, finer cadence spreads every rate evenly over its interval.
+        """
+        step = int(interval.total_seconds() * 1000)
+        source = int(self.interval.total_seconds() * 1000) if self.interval else step
+        buckets: dict[int, float] = {}
+        if step >= source:
+            for t, r in zip(self.timestamps, self.rates):
+                bucket = -(-t // step) * step
+                buckets[bucket] = buckets.get(bucket, 0.) + r
+        else:
+            parts = max(1, round(source / step))
+            for t, r in zip(self.timestamps, self.rates):
+                end = -(-t // step) * step
+                for k in range(parts):
+                    bucket = end - k * step
+                    buckets[bucket] = buckets.get(bucket, 0.) + r / parts
+        timestamps = sorted(buckets)
+        return FundingSeries(timestamps, [buckets[t] for t in timestamps], interval)
@@ -0,0 +1,234 @@
+"""
+Incremental indicators over OHLC series.
+
+Every indicator keeps O(1) state per update, so a new candle costs the same regardless of history length. Batch mode
+runs the very same step over OhlcColumns (no models on the way), so streaming and batch results are identical to the
+last bit. State is checkpointable:
+
+    engine = IndicatorEngine({'ema_20': Ema(20), 'atr_14': Atr(14), 'vol_60': RealizedVol(60)})
+    engine.batch(OhlcColumns.from_models(history))     # backfill, dict of name -> array('d'), NaN while warming up
+    engine.update(ohlc)                                 # live, dict of name -> float | None
+    checkpoint = engine.checkpoint()                    # JSON serializable
+    engine = IndicatorEngine.from_checkpoint(checkpoint)
+"""
+from __future__ import annotations
+
+import abc
+import math
+from array import array
+from bisect import bisect_right
+from collections import deque
+from typing import Any, ClassVar
+
+from src.codec import OhlcColumns, to_ms
+from src.models import OHLC
+
+NAN = float('nan')
+
+
+class Indicator(abc.ABC):
+    KINDS: ClassVar[dict[str, type[Indicator]]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        Indicator.KINDS[cls.__name__] = cls
+
+    @abc.abstractmethod
+    def step(self, open: float, high: float, low: float, close: float) -> float | None:
+        """Consumes next candle, returns indicator value (None while warming up)."""
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def params(self) -> dict[str, Any]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_state(self) -> dict[str, Any]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set_state(self, state: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def update(self, ohlc: OHLC) -> float | None:
+        return self.step(ohlc.open, ohlc.high, ohlc.low, ohlc.close)
+
+    def batch(self, columns: OhlcColumns) -> array:
+        """Steps through all the columns (continuing from the current state), None is stored as NaN."""
+        step = self.step
+        return array('d', (NAN if (value := step(o, h, l, c)) is None else value
+                           for o, h, l, c in zip(columns.open, columns.high, columns.low, columns.close)))
+
+
+class Ema(Indicator):
+    """Exponential moving average of close, seeded with the first close."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value: float | None = None
+
+    def step(self, open: float, high: float, low: float, close: float) -> float | None:
+        self.value = close if self.value is None else self.value + self.alpha * (close - self.value)
+        return self.value
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {'period': self.period}
+
+    def get_state(self) -> dict[str, Any]:
+        return {'value': self.value}
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        self.value = state['value']
+
+
+class Atr(Indicator):
+    """Average true range, Wilder smoothing seeded with the mean of the first period true ranges."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.previous_close: float | None = None
+        self.count = 0
+        self.seed = 0.
+        self.value: float | None = None
+
+    def step(self, open: float, high: float, low: float, close: float) -> float | None:
+        if self.previous_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = close
+        if self.value is not None:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+        else:
+            self.count += 1
+            self.seed += true_range
+            if self.count == self.period:
+                self.value = self.seed / self.period
+        return self.value
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {'period': self.period}
+
+    def get_state(self) -> dict[str, Any]:
+        return {'previous_close': self.previous_close, 'count': self.count, 'seed': self.seed, 'value': self.value}
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        self.previous_close, self.count, self.seed, self.value = (
+            state['previous_close'], state['count'], state['seed'], state['value'])
+
+
+class LogReturn(Indicator):
+    """Log return of close to the previous close."""
+
+    def __init__(self) -> None:
+        self.previous_close: float | None = None
+
+    def step(self, open: float, high: float, low: float, close: float) -> float | None:
+        value = None if self.previous_close is None else math.log(close / self.previous_close)
+        self.previous_close = close
+        return value
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {}
+
+    def get_state(self) -> dict[str, Any]:
+        return {'previous_close': self.previous_close}
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        self.previous_close = state['previous_close']
+
+
+class RealizedVol(Indicator):
+    """
+    Sample standard deviation of log returns over rolling window, times sqrt(annualization) (e.g. 525_600 for
+    minute candles). Running sums, O(1) per update.
+    """
+
+    def __init__(self, window: int, annualization: float = 1.) -> None:
+        self.window = window
+        self.annualization = annualization
+        self.previous_close: float | None = None
+        self.returns: deque[float] = deque()
+        self.sum = 0.
+        self.sum_squares = 0.
+
+    def step(self, open: float, high: float, low: float, close: float) -> float | None:
+        if self.previous_close is None:
+            self.previous_close = close
+            return None
+        value = math.log(close / self.previous_close)
+        self.previous_close = close
+        self.returns.append(value)
+        self.sum += value
+        self.sum_squares += value * value
+        if len(self.returns) > self.window:
+            dropped = self.returns.popleft()
+            self.sum -= dropped
+            self.sum_squares -= dropped * dropped
+        if len(self.returns) < self.window:
+            return None
+        n = self.window
+        variance = max(0., (self.sum_squares - self.sum * self.sum / n) / (n - 1))
+        return math.sqrt(variance * self.annualization)
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {'window': self.window, 'annualization': self.annualization}
+
+    def get_state(self) -> dict[str, Any]:
+        return {'previous_close': self.previous_close, 'returns': list(self.returns), 'sum': self.sum,
+                'sum_squares': self.sum_squares}
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        self.previous_close, self.sum, self.sum_squares = state['previous_close'], state['sum'], state['sum_squares']
+        self.returns = deque(state['returns'])
+
+
+class IndicatorEngine:
+    """Named indicators fed by the same OHLC series. Candles not newer than the last consumed one are ignored."""
+
+    def __init__(self, indicators: dict[str, Indicator]) -> None:
+        self.indicators = indicators
+        self.last_period: int | None = None  # ms
+
+    def update(self, ohlc: OHLC) -> dict[str, float | None]:
+        period = to_ms(ohlc.period)
+        if self.last_period is not None and period <= self.last_period:
+            return {}
+        self.last_period = period
+        return {name: indicator.update(ohlc) for name, indicator in self.indicators.items()}
+
+    def batch(self, columns: OhlcColumns | list[OHLC]) -> dict[str, array]:
+        if not isinstance(columns, OhlcColumns):
+            columns = OhlcColumns.from_models(sorted(columns, key=lambda o: o.period))
+        if self.last_period is not None:  # continue after the checkpoint
+            start = bisect_right(columns.timestamp, self.last_period)
+            columns = OhlcColumns(timestamp=columns.timestamp[start:], open=columns.open[start:],
+                                  high=columns.high[start:], low=columns.low[start:], close=columns.close[start:],
+                                  symbol_id=columns.symbol_id, timeframe=columns.timeframe)
+        if len(columns):
+            self.last_period = columns.timestamp[-1]
+        return {name: indicator.batch(columns) for name, indicator in self.indicators.items()}
+
+    def checkpoint(self) -> dict[str, Any]:
+        return {
+            'last_period': self.last_period,
+            'indicators': {name: {'kind': type(indicator).__name__, 'params': indicator.params,
+                                  'state': indicator.get_state()}
+                           for name, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict[str, Any]) -> IndicatorEngine:
+        indicators = {}
+        for name, saved in checkpoint['indicators'].items():
+            indicator = indicators[name] = Indicator.KINDS[saved['kind']](**saved['params'])
+            indicator.set_state(saved['state'])
+        engine = cls(indicators)
+        engine.last_period = checkpoint['last_period']
+        return engine
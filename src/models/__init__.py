@@ -1,3 +1,7 @@
 from .ohlc import OHLC
 from .symbol import Symbol, SymbolId, SymbolNativeId, SymbolSet, SymbolError
 from .funding_rate import FundingRate
+from .orderbook import OrderBook
+from .trade import Trade
+from .mark_price import MarkPrice
+from .open_interest import OpenInterest
@@ -25,8 +25,8 @@ class AbstractRepository(abc.ABC):
         self._items.add(item)
 
     def find(self, **kwargs) -> AbstractRepository:
-        filtered_items = [item for attr, value in kwargs.items() for item in self._items if
-                             hasattr(item, attr) and getattr(item, attr) == value]
+        filtered_items = [item for item in self._items if
+                          all(hasattr(item, attr) and getattr(item, attr) == value for attr, value in kwargs.items())]
         return self.__class__(filtered_items)
 
     def get_all(self) -> list[Any]:
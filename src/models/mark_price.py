@@ -0,0 +1,12 @@
+import datetime as dt
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .primitives import PriceQuote
+
+
+class MarkPrice(BaseModel):
+    timestamp: dt.datetime
+    mark_price: PriceQuote
+    index_price: Optional[PriceQuote]
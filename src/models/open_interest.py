@@ -0,0 +1,8 @@
+import datetime as dt
+
+from pydantic import BaseModel, NonNegativeFloat
+
+
+class OpenInterest(BaseModel):
+    timestamp: dt.datetime
+    open_interest: NonNegativeFloat  # in venue contracts
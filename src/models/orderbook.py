@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import datetime as dt
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Iterable, Literal
+
+from .symbol import SymbolId
+
+Level = tuple[float | str, float | str]
+Side = Literal['bid', 'ask']
+
+
+class OrderBook:
+    """
+    Compact order book snapshot, price and size columns sorted from the best level (bids descending, asks ascending).
+    Sizes are in venue units (contracts or base asset).
+    """
+    __slots__ = ('bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes', 'timestamp', 'symbol_id', 'sequence')
+
+    def __init__(self, bid_prices: array, bid_sizes: array, ask_prices: array, ask_sizes: array,
+                 timestamp: dt.datetime | None = None, symbol_id: SymbolId | None = None,
+                 sequence: int | None = None) -> None:
+        self.bid_prices = bid_prices
+        self.bid_sizes = bid_sizes
+        self.ask_prices = ask_prices
+        self.ask_sizes = ask_sizes
+        self.timestamp = timestamp
+        self.symbol_id = symbol_id
+        self.sequence = sequence
+
+    @classmethod
+    def from_levels(cls, bids: Iterable[Level], asks: Iterable[Level], **kwargs) -> OrderBook:
+        """Builds book from (price, size) levels in any order, empty levels are dropped."""
+        bids = sorted(((float(p), float(s)) for p, s in bids if float(s) > 0), reverse=True)
+        asks = sorted(((float(p), float(s)) for p, s in asks if float(s) > 0))
+        return cls(
+            array('d', (p for p, _ in bids)), array('d', (s for _, s in bids)),
+            array('d', (p for p, _ in asks)), array('d', (s for _, s in asks)),
+            **kwargs,
+        )
+
+    def __repr__(self) -> str:
+        return (f'OrderBook({self.symbol_id}, bid {self.best_bid}, ask {self.best_ask}, '
+                f'{len(self.bid_prices)}x{len(self.ask_prices)} levels)')
+
+    @property
+    def best_bid(self) -> float | None:
+        return self.bid_prices[0] if self.bid_prices else None
+
+    @property
+    def best_ask(self) -> float | None:
+        return self.ask_prices[0] if self.ask_prices else None
+
+    @property
+    def mid(self) -> float | None:
+        if not self.bid_prices or not self.ask_prices:
+            return None
+        return (self.bid_prices[0] + self.ask_prices[0]) / 2
+
+    @property
+    def spread_bps(self) -> float | None:
+        if (mid := self.mid) is None:
+            return None
+        return (self.ask_prices[0] - self.bid_prices[0]) / mid * 10_000
+
+    def depth_at_bps(self, bps: float, side: Side) -> float:
+        """Cumulative size of side within bps from mid."""
+        if (mid := self.mid) is None:
+            return 0.
+        if side == 'bid':
+            # bids are descending, search in negated prices
+            limit = mid * (1 - bps / 10_000)
+            n = bisect_right(self.bid_prices, -limit, key=lambda p: -p)
+            return sum(self.bid_sizes[:n])
+        limit = mid * (1 + bps / 10_000)
+        n = bisect_right(self.ask_prices, limit)
+        return sum(self.ask_sizes[:n])
+
+    @classmethod
+    def merge(cls, books: Iterable[OrderBook]) -> OrderBook:
+        """Consolidated book, sizes of equal price levels summed across books."""
+        bids, asks = defaultdict(float), defaultdict(float)
+        timestamps = []
+        for book in books:
+            for p, s in zip(book.bid_prices, book.bid_sizes):
+                bids[p] += s
+            for p, s in zip(book.ask_prices, book.ask_sizes):
+                asks[p] += s
+            if book.timestamp:
+                timestamps.append(book.timestamp)
+        return cls.from_levels(bids.items(), asks.items(), timestamp=min(timestamps, default=None))
@@ -56,6 +56,7 @@ class SymbolId(str):
 
 class Symbol(BaseModel, abc.ABC, frozen=True):
     id: SymbolId
+    base: AssetEnum = AssetEnum.BTC
     ccxt_id: Optional[str] = 'BTC/USD'
     cryptofeed_id: Optional[str]
     lot_size: int = 1  # contract size (in USD) for inverse and minimum order for linear and spot (in SATs)
@@ -81,7 +82,8 @@ class Symbol(BaseModel, abc.ABC, frozen=True):
 
     @property
     def margin(self) -> AssetEnum:
-        return self.id.margin
+        # coin margined contracts (PERP:BTC) are margined in its base asset
+        return self.base if self.id.margin == AssetEnum.BTC else self.id.margin
 
     def round_amount(self, amount: int) -> int:
         return round(amount / self.lot_size) * self.lot_size
@@ -0,0 +1,14 @@
+import datetime as dt
+from typing import Optional
+
+from pydantic import BaseModel, NonNegativeFloat
+
+from .primitives import PriceQuote
+
+
+class Trade(BaseModel):
+    timestamp: dt.datetime
+    price: PriceQuote
+    size: NonNegativeFloat
+    side: Optional[str]  # taker side, buy or sell
+    id: Optional[str]
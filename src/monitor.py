@@ -0,0 +1,133 @@
+"""
+Runtime telemetry of the fetch layer.
+
+Tells apart slow venues (long I/O, many requests in flight) from saturated event loop (high loop lag,
+long parsing). Exchanges report requests, open clients and parsing here; limiters register their queues.
+
+    task = MONITOR.start(log_interval=60)   # samples loop lag, logs snapshot every minute
+    MONITOR.snapshot()
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterator
+
+from loguru import logger
+
+
+class RuntimeMonitor:
+
+    def __init__(self, lag_interval: float = 0.25, lag_window: int = 240) -> None:
+        self.lag_interval = lag_interval
+        self._lags: deque[float] = deque(maxlen=lag_window)
+        self._in_flight: dict[Hashable, int] = defaultdict(int)
+        self._requests: dict[Hashable, int] = defaultdict(int)
+        self._open_clients: dict[Hashable, int] = defaultdict(int)
+        self._io_time: dict[Hashable, float] = defaultdict(float)
+        self._parse_time: dict[Hashable, float] = defaultdict(float)
+        self._unchanged: dict[Hashable, int] = defaultdict(int)
+        self._queues: dict[str, Callable[[], int]] = {}
+        self._task: asyncio.Task | None = None
+
+    ##############
+    # Reporting
+    ##############
+    @contextmanager
+    def request(self, venue: Hashable) -> Iterator[None]:
+        self._in_flight[venue] += 1
+        self._requests[venue] += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._io_time[venue] += time.perf_counter() - start
+            self._in_flight[venue] -= 1
+
+    @contextmanager
+    def parsing(self, venue: Hashable) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._parse_time[venue] += time.perf_counter() - start
+
+    def unchanged(self, venue: Hashable) -> None:
+        """Response identical to the previous one, neither decoded nor parsed again."""
+        self._unchanged[venue] += 1
+
+    def client_opened(self, venue: Hashable) -> None:
+        self._open_clients[venue] += 1
+
+    def client_closed(self, venue: Hashable) -> None:
+        self._open_clients[venue] -= 1
+
+    def register_queue(self, name: str, depth: Callable[[], int]) -> None:
+        """Registers callable returning current depth of a queue (e.g. rate limiter waiters)."""
+        self._queues[name] = depth
+
+    ##############
+    # Sampling
+    ##############
+    async def _sample_loop_lag(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self._lags.append(max(0., time.perf_counter() - start - self.lag_interval))
+
+    async def _run(self, log_interval: float | None) -> None:
+        sampler = asyncio.create_task(self._sample_loop_lag())
+        try:
+            while True:
+                await asyncio.sleep(log_interval or 3600)
+                if log_interval:
+                    self.log()
+        finally:
+            sampler.cancel()
+
+    def start(self, log_interval: float | None = 60.) -> asyncio.Task:
+        """Starts loop lag sampling (and periodic log line) in running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(log_interval))
+        return self._task
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> dict:
+        lags = sorted(self._lags)
+        venues = set(self._requests) | set(self._open_clients)
+        return {
+            'loop_lag_ms': {
+                'last': self._lags[-1] * 1000 if self._lags else None,
+                'p50': lags[len(lags) // 2] * 1000 if lags else None,
+                'max': lags[-1] * 1000 if lags else None,
+            },
+            'venues': {
+                str(venue): {
+                    'in_flight': self._in_flight[venue],
+                    'requests': self._requests[venue],
+                    'unchanged': self._unchanged[venue],
+                    'open_clients': self._open_clients[venue],
+                    'io_s': self._io_time[venue],
+                    'parse_s': self._parse_time[venue],
+                } for venue in sorted(venues, key=str)
+            },
+            'queues': {name: depth() for name, depth in self._queues.items()},
+        }
+
+    def log(self) -> None:
+        snapshot = self.snapshot()
+        lag = snapshot['loop_lag_ms']
+        io = sum(v['io_s'] for v in snapshot['venues'].values())
+        parse = sum(v['parse_s'] for v in snapshot['venues'].values())
+        in_flight = {venue: v['in_flight'] for venue, v in snapshot['venues'].items() if v['in_flight']}
+        logger.info(f"loop lag p50 {lag['p50'] or 0:.1f}ms max {lag['max'] or 0:.1f}ms | "
+                    f"io {io:.1f}s parse {parse:.1f}s | in flight {in_flight} | queues {snapshot['queues']}")
+
+
+MONITOR = RuntimeMonitor()
@@ -0,0 +1,141 @@
+"""
+Running and predicted funding computed locally from mark / index price samples.
+
+For venues without a published predicted funding rate (or with a stale one), so no aggregate endpoint has to be
+polled. Every sample gives the premium (mark - index) / index; each venue's formula turns the time weighted average
+premium since the start of the current funding interval into the running funding rate, and the latest premium into
+the predicted one (rate the interval would settle at if the premium stayed where it is):
+
+    engine = PredictedFunding()
+    running_funding = engine.update(symbol, await client.get_mark_price(symbol.exchange_id, symbol.symbol_type))
+
+    async for symbol, running_funding in stream_predicted(symbols, interval=5.):
+        ...
+
+Mark vs index is the closest to the venues' impact price premium index the shared ticker fetches carry, rates are
+relative (per funding interval) for all the venues.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import pendulum
+from loguru import logger
+
+from src import client
+from src.codec import to_ms
+from src.enums import ExchangeEnum
+from src.exchanges.base import next_funding_timestamp
+from src.models import MarkPrice, Symbol, SymbolId
+from src.models.funding_rate import RunningFundingRate
+
+
+@dataclass(frozen=True)
+class FundingFormula:
+    """funding = premium + clamp(interest - premium, -damper, damper), limited to +-cap, all per interval."""
+    interval: dt.timedelta
+    interest: float = 0.
+    damper: float = 0.
+    cap: float | None = None
+    scale: float = 1.  # premium index to premium per interval
+    averaged: bool = True  # premium averaged over the interval, otherwise the latest one (continuous funding)
+
+    def rate(self, premium: float) -> float:
+        premium *= self.scale
+        rate = premium + max(-self.damper, min(self.damper, self.interest - premium))
+        return rate if self.cap is None else max(-self.cap, min(self.cap, rate))
+
+
+FORMULAS: dict[ExchangeEnum, FundingFormula] = {
+    # interest 0.01% per 8h, premium clamp 0.05%, caps of the BTC contracts
+    ExchangeEnum.BINANCE: FundingFormula(dt.timedelta(hours=8), interest=0.0001, damper=0.0005, cap=0.003),
+    ExchangeEnum.BYBIT: FundingFormula(dt.timedelta(hours=8), interest=0.0001, damper=0.0005, cap=0.00375),
+    ExchangeEnum.BITMEX: FundingFormula(dt.timedelta(hours=8), interest=0.0001, damper=0.0005, cap=0.00375),
+    ExchangeEnum.PHEMEX: FundingFormula(dt.timedelta(hours=8), interest=0.0001, damper=0.0005, cap=0.00375),
+    # premium beyond the 0.05% dead band, accrued continuously, quoted per 8h
+    ExchangeEnum.DERIBIT: FundingFormula(dt.timedelta(hours=8), damper=0.0005, averaged=False),
+    # hourly settlement of a daily premium
+    ExchangeEnum.KRAKEN: FundingFormula(dt.timedelta(hours=1), scale=1 / 24),
+}
+
+
+class _Interval:
+    __slots__ = ('settlement', 'weighted', 'elapsed', 'timestamp', 'premium')
+
+    def __init__(self, settlement: int, timestamp: int, premium: float) -> None:
+        self.settlement = settlement  # ms
+        self.weighted = 0.  # premium x ms
+        self.elapsed = 0  # ms
+        self.timestamp = timestamp  # of the latest sample, ms
+        self.premium = premium  # latest
+
+    @property
+    def average(self) -> float:
+        return self.weighted / self.elapsed if self.elapsed else self.premium
+
+
+class PredictedFunding:
+
+    def __init__(self, formulas: dict[ExchangeEnum, FundingFormula] | None = None) -> None:
+        self.formulas = formulas if formulas is not None else FORMULAS
+        self._intervals: dict[SymbolId, _Interval] = {}
+
+    def update(self, symbol: Symbol, mark_price: MarkPrice | None) -> RunningFundingRate | None:
+        """Adds sample, returns the running funding (None without index price, formula or for an older sample)."""
+        formula = self.formulas.get(symbol.exchange_id)
+        if formula is None or mark_price is None or not mark_price.index_price:
+            return None
+        premium = (mark_price.mark_price - mark_price.index_price) / mark_price.index_price
+        timestamp = to_ms(mark_price.timestamp)
+        settlement = to_ms(next_funding_timestamp(mark_price.timestamp, formula.interval))
+        if (interval := self._intervals.get(symbol.id)) is None:
+            interval = self._intervals[symbol.id] = _Interval(settlement, timestamp, premium)
+        elif timestamp < interval.timestamp:
+            return None
+        else:
+            if settlement != interval.settlement:  # settled, previous premium holds from the interval start
+                interval.settlement = settlement
+                start = settlement - int(formula.interval.total_seconds() * 1000)
+                interval.weighted, interval.elapsed = 0., 0
+                interval.timestamp = max(interval.timestamp, start)
+            elapsed = timestamp - interval.timestamp
+            interval.weighted += interval.premium * elapsed
+            interval.elapsed += elapsed
+            interval.timestamp = timestamp
+            interval.premium = premium
+        return RunningFundingRate(
+            timestamp=mark_price.timestamp,
+            funding_timestamp=pendulum.from_timestamp(settlement / 1000),
+            funding_rate=formula.rate(interval.average if formula.averaged else premium),
+            predicted_funding_rate=formula.rate(premium),
+        )
+
+    def reset(self, symbol_id: SymbolId | None = None) -> None:
+        if symbol_id is None:
+            self._intervals.clear()
+        else:
+            self._intervals.pop(symbol_id, None)
+
+
+async def stream_predicted(symbols: list[Symbol], interval: float = 5., engine: PredictedFunding | None = None,
+                           ) -> AsyncIterator[tuple[Symbol, RunningFundingRate]]:
+    """
+    Samples mark prices of symbols every interval seconds and yields their running funding. Mark prices come from
+    the running funding fetch, shared within the tick with every other consumer of it.
+    """
+    engine = engine if engine is not None else PredictedFunding()
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        samples = await asyncio.gather(*(client.get_mark_price(symbol.exchange_id, symbol.symbol_type,
+                                                               base=symbol.base) for symbol in symbols),
+                                       return_exceptions=True)
+        for symbol, mark_price in zip(symbols, samples):
+            if isinstance(mark_price, Exception):
+                logger.warning(f'Predicted funding {symbol.id}: {mark_price!r}')
+            elif (running_funding := engine.update(symbol, mark_price)) is not None:
+                yield symbol, running_funding
+        await asyncio.sleep(max(0., interval - (loop.time() - started)))
@@ -0,0 +1,145 @@
+"""
+Venue quality layer for the cross-exchange OHLC aggregation.
+
+Every period the venues are compared with the cross-venue median. Venues deviating by more than a MAD
+threshold (or missing the latest period) are flagged and their rolling quality score drops. The score is
+used to down-weight venues in the median, to exclude them and to skip fetching from chronically bad ones.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+from statistics import median
+
+from loguru import logger
+
+from src.enums import ExchangeEnum
+from src.models import OHLC
+
+MAD_SCALE = 1.4826  # MAD to standard deviation for normally distributed values
+FIELDS = ('open', 'high', 'low', 'close')
+
+
+def weighted_median(values: list[float], weights: list[float]) -> float:
+    pairs = sorted(zip(values, weights))
+    half = sum(weights) / 2
+    cumulative = 0.
+    for i, (value, weight) in enumerate(pairs):
+        cumulative += weight
+        if cumulative > half:
+            return value
+        if cumulative == half:
+            return (value + pairs[i + 1][0]) / 2 if i + 1 < len(pairs) else value
+    return pairs[-1][0]
+
+
+class VenueQuality:
+
+    def __init__(self, threshold: float = 5., min_deviation: float = 0.002, decay: float = 0.05,
+                 exclude_below: float = 0.5, skip_below: float = 0.2, probe_every: int = 10) -> None:
+        """
+        :param threshold: number of (scaled) MADs from median to flag a candle
+        :param min_deviation: relative deviation from median which is never flagged, protects against tiny MAD
+        :param decay: weight of the latest period in the rolling score
+        :param exclude_below: venues with lower score are excluded from median
+        :param skip_below: venues with lower score are not fetched, except every probe_every-th time
+        """
+        self.threshold = threshold
+        self.min_deviation = min_deviation
+        self.decay = decay
+        self.exclude_below = exclude_below
+        self.skip_below = skip_below
+        self.probe_every = probe_every
+        self._scores: dict[ExchangeEnum, float] = defaultdict(lambda: 1.)
+        self._skipped: dict[ExchangeEnum, int] = defaultdict(int)
+        self._last_scored: dict[ExchangeEnum, dt.datetime] = {}
+
+    @property
+    def scores(self) -> dict[ExchangeEnum, float]:
+        return dict(self._scores)
+
+    def score(self, venue: ExchangeEnum) -> float:
+        return self._scores[venue]
+
+    def is_excluded(self, venue: ExchangeEnum) -> bool:
+        return self._scores[venue] < self.exclude_below
+
+    def should_skip(self, venue: ExchangeEnum) -> bool:
+        """True for chronically bad venue. Every probe_every-th call returns False so venue can recover."""
+        if self._scores[venue] >= self.skip_below:
+            self._skipped[venue] = 0
+            return False
+        self._skipped[venue] += 1
+        return self._skipped[venue] % self.probe_every != 0
+
+    def flag(self, ohlc_by_venue: dict[ExchangeEnum, list[OHLC]]) -> dict[ExchangeEnum, set[dt.datetime]]:
+        """Returns periods flagged as outliers per venue."""
+        periods: dict[dt.datetime, dict[ExchangeEnum, OHLC]] = defaultdict(dict)
+        for venue, ohlc in ohlc_by_venue.items():
+            for o in ohlc:
+                periods[o.period][venue] = o
+        flagged = defaultdict(set)
+        for period, candles in periods.items():
+            if len(candles) < 3:  # not enough venues to tell which one is wrong
+                continue
+            deviations = {venue: 0. for venue in candles}
+            for field in FIELDS:
+                values = {venue: getattr(o, field) for venue, o in candles.items()}
+                center = median(values.values())
+                if center <= 0:
+                    continue
+                relative = {venue: abs(value - center) / center for venue, value in values.items()}
+                mad = MAD_SCALE * median(relative.values())
+                limit = max(self.threshold * mad, self.min_deviation)
+                for venue, deviation in relative.items():
+                    deviations[venue] = max(deviations[venue], deviation / limit)
+            for venue, deviation in deviations.items():
+                if deviation > 1:
+                    flagged[venue].add(period)
+        return flagged
+
+    def update(self, ohlc_by_venue: dict[ExchangeEnum, list[OHLC]]) -> dict[ExchangeEnum, set[dt.datetime]]:
+        """Flags outliers and updates rolling scores. Venue missing the latest period is scored as stale."""
+        flagged = self.flag(ohlc_by_venue)
+        latest = max((o.period for ohlc in ohlc_by_venue.values() for o in ohlc), default=None)
+        if latest is None:
+            return flagged
+        for venue, ohlc in ohlc_by_venue.items():
+            # every period is scored once, even though venues return overlapping history on every fetch
+            last_scored = self._last_scored.get(venue)
+            new = [o.period for o in ohlc if last_scored is None or o.period > last_scored]
+            stale = latest not in new and (last_scored is None or latest > last_scored)
+            observed = len(new) + stale
+            if not observed:
+                continue
+            bad = len(flagged.get(venue, set()).intersection(new)) + stale
+            self._last_scored[venue] = latest
+            score = self._scores[venue]
+            # rolling score over observed periods, bad periods pull it to 0
+            score *= (1 - self.decay) ** observed
+            score += (1 - (1 - self.decay) ** observed) * (1 - bad / observed)
+            self._scores[venue] = score
+            if bad:
+                logger.debug(f'{venue} {bad} bad of {observed} periods, score {score:.3f}')
+        return flagged
+
+    def filter(self, ohlc_by_venue: dict[ExchangeEnum, list[OHLC]]) -> dict[ExchangeEnum, list[OHLC]]:
+        """Updates scores and returns OHLC without flagged candles and excluded venues."""
+        flagged = self.update(ohlc_by_venue)
+        return {venue: [o for o in ohlc if o.period not in flagged.get(venue, ())]
+                for venue, ohlc in ohlc_by_venue.items() if not self.is_excluded(venue)}
+
+    def median_ohlc(self, ohlc_by_venue: dict[ExchangeEnum, list[OHLC]]) -> list[OHLC]:
+        """Returns OHLC list sorted by period, score weighted median of filtered venues for every period."""
+        periods: dict[dt.datetime, list[tuple[ExchangeEnum, OHLC]]] = defaultdict(list)
+        for venue, ohlc in self.filter(ohlc_by_venue).items():
+            for o in ohlc:
+                periods[o.period].append((venue, o))
+        composite = []
+        for period in sorted(periods):
+            weights = [self._scores[venue] for venue, _ in periods[period]]
+            composite.append(OHLC(period=period, **{
+                field: weighted_median([getattr(o, field) for _, o in periods[period]], weights)
+                for field in FIELDS
+            }))
+        return composite
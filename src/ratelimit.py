@@ -0,0 +1,126 @@
+"""
+Per venue request budgets of this process.
+
+Limiter is empty (no waiting) unless configured, e.g. the sharded runner gives every worker its share:
+
+    RATE_LIMITER.configure(REQUESTS_PER_SECOND, share=1 / workers)
+    await RATE_LIMITER.acquire(ExchangeEnum.BINANCE)   # called by BaseExchange._fetch_endpoint
+
+Budget shared by all the processes of the host is handed out by src.coordinator, see RateLimiter.use_coordinator.
+Requests of backfills etc. should give way to live polling:
+
+    with priority(PriorityEnum.BACKFILL):
+        await client.get_funding(...)
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Hashable, Iterator, Protocol
+
+from src.enums import ExchangeEnum, PriorityEnum
+from src.monitor import MONITOR
+
+# public (unauthenticated) REST limits, rounded down
+REQUESTS_PER_SECOND: dict[ExchangeEnum, float] = {
+    ExchangeEnum.DERIBIT: 20.,
+    ExchangeEnum.BITMEX: 0.5,
+    ExchangeEnum.BYBIT: 50.,
+    ExchangeEnum.PHEMEX: 5.,
+    ExchangeEnum.BINANCE: 20.,
+    ExchangeEnum.FTX: 30.,
+    ExchangeEnum.KRAKEN: 1.,
+    ExchangeEnum.OKEX: 10.,
+    ExchangeEnum.HUOBI: 10.,
+    ExchangeEnum.BITSTAMP: 13.,
+    ExchangeEnum.BITFINEX: 1.5,
+    ExchangeEnum.COINBASE: 10.,
+}
+
+
+PRIORITY: contextvars.ContextVar[PriorityEnum] = contextvars.ContextVar('priority', default=PriorityEnum.DEFAULT)
+
+
+@contextmanager
+def priority(value: PriorityEnum) -> Iterator[None]:
+    """Priority of the requests made within the context (and tasks created in it)."""
+    token = PRIORITY.set(value)
+    try:
+        yield
+    finally:
+        PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to capacity, acquire waits (FIFO) for a token."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1., rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: asyncio.Lock | None = None
+        self.waiting = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.) -> bool:
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+    def wait_time(self, tokens: float = 1.) -> float:
+        """Seconds until tokens are available."""
+        self._refill()
+        return max(0., (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1.) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        self.waiting += 1
+        try:
+            async with self._lock:  # waiters served in order
+                while not self.try_acquire(tokens):
+                    await asyncio.sleep(self.wait_time(tokens))
+        finally:
+            self.waiting -= 1
+
+
+class Coordinator(Protocol):
+    async def acquire(self, venue: Hashable, tokens: float, priority: PriorityEnum) -> None:
+        ...
+
+
+class RateLimiter:
+    """Token bucket per venue, venues without a bucket are not limited. Coordinator (if any) is asked afterwards."""
+
+    def __init__(self) -> None:
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self.coordinator: Coordinator | None = None
+
+    def use_coordinator(self, coordinator: Coordinator | None) -> None:
+        self.coordinator = coordinator
+
+    def configure(self, rates: dict[Hashable, float], share: float = 1.) -> None:
+        for venue, rate in rates.items():
+            bucket = self._buckets[venue] = TokenBucket(rate * share)
+            MONITOR.register_queue(f'ratelimit:{venue}', lambda bucket=bucket: bucket.waiting)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    async def acquire(self, venue: Hashable, tokens: float = 1.) -> None:
+        if (bucket := self._buckets.get(venue)) is not None:
+            await bucket.acquire(tokens)
+        if self.coordinator is not None:
+            await self.coordinator.acquire(venue, tokens, PRIORITY.get())
+
+
+RATE_LIMITER = RateLimiter()
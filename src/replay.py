@@ -0,0 +1,161 @@
+"""
+Record / replay of raw exchange HTTP responses.
+
+    with recording('recordings/2022-05-01'):
+        await client.get_ohlc(...)            # hits network, responses saved per venue host and endpoint
+
+    with replaying('recordings/2022-05-01', speed=10.):
+        await client.get_ohlc(...)            # served from disk, 10x faster than recorded latency
+
+Records are newline delimited JSON, one file per host and endpoint path.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+from src.exchanges.base import BaseExchange
+
+# headers describing the original encoding, body is stored decoded
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+# query params of time windows, they differ between recording and replay
+VOLATILE_PARAMS = {'start', 'end', 'from', 'to', 'since', 'after', 'before', 'starttime', 'endtime',
+                   'start_timestamp', 'end_timestamp', 'timestamp'}
+
+
+def _stable_params(params: list[list[str]]) -> list[list[str]]:
+    return [[key, value] for key, value in params if key.lower() not in VOLATILE_PARAMS]
+
+
+def _record_path(root: Path, url: httpx.URL) -> Path:
+    endpoint = re.sub(r'[^A-Za-z0-9.-]+', '_', url.path.strip('/')) or 'root'
+    return root / url.host / f'{endpoint}.jsonl'
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards requests to network and appends responses with timing to record files."""
+
+    def __init__(self, root: str | Path, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._root = Path(root)
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._started = time.time()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        sent = time.time()
+        response = await self._transport.handle_async_request(request)
+        response = httpx.Response(response.status_code, headers=response.headers, stream=response.stream,
+                                  request=request)
+        body = await response.aread()
+        elapsed = time.time() - sent
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in DROPPED_HEADERS}
+        path = _record_path(self._root, request.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps({
+                'method': request.method,
+                'url': str(request.url),
+                'params': sorted(request.url.params.multi_items()),
+                'status': response.status_code,
+                'headers': headers,
+                'body': body.decode(response.encoding or 'utf-8', errors='replace'),
+                'offset': sent - self._started,
+                'elapsed': elapsed,
+            }) + '\n')
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        # shared by all the exchange clients, each of them closes its transport on exit
+        pass
+
+    async def close(self) -> None:
+        await self._transport.aclose()
+
+
+class Replayer:
+    """
+    Serves recorded responses. Requests are matched by host, path and query params; recordings with equal params
+    are preferred, then ones differing only in time window params (VOLATILE_PARAMS). Several matching recordings are
+    served round robin, requests matching none are misses.
+    """
+
+    def __init__(self, root: str | Path, speed: float = 1.) -> None:
+        """
+        :param speed: latency divider, 1 replays recorded latency, float('inf') replays without waiting
+        """
+        self.speed = speed
+        self._records: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        for path in Path(root).glob('*/*.jsonl'):
+            with open(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    url = httpx.URL(record['url'])
+                    self._records[(url.host, url.path)].append(record)
+        self._cursors: dict[tuple, Iterator[dict]] = {}
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def _match(self, request: httpx.Request) -> dict | None:
+        key = (request.url.host, request.url.path)
+        if key not in self._records:
+            return None
+        params = [list(item) for item in sorted(request.url.params.multi_items())]
+        if not (matching := [record for record in self._records[key] if record['params'] == params]):
+            stable = _stable_params(params)
+            params = ['stable', stable]
+            matching = [record for record in self._records[key] if _stable_params(record['params']) == stable]
+        if len(matching) <= 1:
+            return matching[0] if matching else None
+        # avoid serving the same record all the time when there are many
+        cursor = (key, json.dumps(params))
+        if cursor not in self._cursors:
+            self._cursors[cursor] = itertools.cycle(matching)
+        return next(self._cursors[cursor])
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        record = self._match(request)
+        if record is None:
+            self.misses += 1
+            return httpx.Response(404, json={'error': f'{request.url} not recorded'}, request=request)
+        if self.speed != float('inf'):
+            await asyncio.sleep(record['elapsed'] / self.speed)
+        # recorded Date would be taken for venue clock skew
+        headers = {key: value for key, value in record['headers'].items() if key.lower() != 'date'}
+        return httpx.Response(record['status'], headers=headers, content=record['body'].encode(), request=request)
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+
+@contextmanager
+def _exchange_transport(transport: httpx.AsyncBaseTransport) -> Iterator[httpx.AsyncBaseTransport]:
+    previous = BaseExchange.TRANSPORT
+    BaseExchange.TRANSPORT = transport
+    try:
+        yield transport
+    finally:
+        BaseExchange.TRANSPORT = previous
+
+
+@contextmanager
+def recording(root: str | Path) -> Iterator[RecordingTransport]:
+    with _exchange_transport(RecordingTransport(root)) as transport:
+        yield transport
+
+
+@contextmanager
+def replaying(root: str | Path, speed: float = 1.) -> Iterator[Replayer]:
+    replayer = Replayer(root, speed)
+    with _exchange_transport(replayer.transport):
+        yield replayer
@@ -0,0 +1,173 @@
+"""
+Adaptive polling of OHLC and running funding.
+
+Instead of a fixed cadence every (symbol, product) job picks its next poll from what it just saw: running funding
+tightens towards min_interval as funding_timestamp approaches, and both products poll faster while short term
+realized volatility is above its typical level and back off while it is below. A poll budget per venue bounds the
+total, jobs over budget are deferred until a token is available.
+
+    scheduler = PollScheduler(symbols, budget={ExchangeEnum.BITMEX: 0.2})
+    async for symbol, product, result in scheduler.results():
+        await bus.publish(product, symbol.id, result)
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Hashable
+
+from loguru import logger
+
+from src import client
+from src.enums import ProductEnum, SymbolTypeEnum, TimeFrameEnum
+from src.indicators import Ema, RealizedVol
+from src.models import OHLC, Symbol, SymbolId
+from src.models.funding_rate import RunningFundingRate
+from src.ratelimit import REQUESTS_PER_SECOND, TokenBucket
+
+PRODUCTS = (ProductEnum.OHLC, ProductEnum.RUNNING_FUNDING)
+
+
+@dataclass(frozen=True)
+class Cadence:
+    """Seconds between polls of a job, intervals are for typical volatility."""
+    min_interval: float = 1.
+    max_interval: float = 120.
+    ohlc_interval: float = 15.
+    funding_interval: float = 60.  # far from settlement
+    funding_window: float = 900.  # within it the interval shrinks linearly to min_interval at settlement
+    vol_window: int = 30  # minute log returns of the short term realized volatility
+    vol_baseline: int = 1440  # EMA period of the short term volatility taken as typical
+
+
+class _Volatility:
+    """Short term realized volatility of symbol relative to its own typical level."""
+
+    def __init__(self, cadence: Cadence) -> None:
+        self.realized = RealizedVol(cadence.vol_window)
+        self.baseline = Ema(cadence.vol_baseline)
+        self.last_period: dt.datetime | None = None
+        self.ratio = 1.
+
+    def update(self, ohlc: list[OHLC]) -> None:
+        for o in ohlc:
+            if self.last_period is not None and o.period <= self.last_period:
+                continue
+            self.last_period = o.period
+            if (vol := self.realized.update(o)) is not None:
+                baseline = self.baseline.step(vol, vol, vol, vol)
+                self.ratio = vol / baseline if baseline else 1.
+
+
+class _Job:
+    __slots__ = ('symbol', 'product', 'interval')
+
+    def __init__(self, symbol: Symbol, product: ProductEnum, interval: float) -> None:
+        self.symbol = symbol
+        self.product = product
+        self.interval = interval
+
+
+class PollScheduler:
+
+    def __init__(self, symbols: list[Symbol], products: tuple[ProductEnum, ...] = PRODUCTS,
+                 cadence: Cadence = Cadence(), budget: dict[Hashable, float] | None = None,
+                 budget_share: float = 0.5) -> None:
+        """
+        :param budget: polls per second per venue, by default budget_share of the venue REST limit
+        """
+        if unsupported := set(products) - set(PRODUCTS):
+            raise ValueError(f'Adaptive polling of {unsupported} is not supported.')
+        self.cadence = cadence
+        self.jobs = [_Job(symbol, product, self._initial(product)) for symbol in symbols for product in products
+                     if product != ProductEnum.RUNNING_FUNDING or symbol.symbol_type != SymbolTypeEnum.SPOT]
+        rates = budget if budget is not None else {venue: rate * budget_share
+                                                   for venue, rate in REQUESTS_PER_SECOND.items()}
+        self._buckets = {venue: TokenBucket(rate) for venue, rate in rates.items()}
+        self._volatility: dict[SymbolId, _Volatility] = {}
+        self.polls: dict[Hashable, int] = {}
+
+    def _initial(self, product: ProductEnum) -> float:
+        return self.cadence.ohlc_interval if product == ProductEnum.OHLC else self.cadence.funding_interval
+
+    def volatility_ratio(self, symbol_id: SymbolId) -> float:
+        return volatility.ratio if (volatility := self._volatility.get(symbol_id)) is not None else 1.
+
+    ##################
+    # Cadence
+    ##################
+    def _clamp(self, interval: float) -> float:
+        return min(self.cadence.max_interval, max(self.cadence.min_interval, interval))
+
+    def ohlc_interval(self, symbol_id: SymbolId) -> float:
+        return self._clamp(self.cadence.ohlc_interval / max(self.volatility_ratio(symbol_id), 1e-9))
+
+    def funding_interval(self, symbol: Symbol, running_funding: RunningFundingRate | None) -> float:
+        cadence = self.cadence
+        interval = cadence.funding_interval
+        if running_funding is not None:
+            now = client.CLIENTS[symbol.exchange_id].now(symbol.symbol_type)  # settlement is on the venue clock
+            remaining = (running_funding.funding_timestamp - now).total_seconds()
+            if remaining < cadence.funding_window:  # past settlement too, until the venue rolls the timestamp
+                interval = min(interval, cadence.min_interval + (cadence.funding_interval - cadence.min_interval)
+                               * max(0., remaining) / cadence.funding_window)
+        return self._clamp(interval / max(self.volatility_ratio(symbol.id), 1e-9))
+
+    ##################
+    # Polling
+    ##################
+    async def _poll(self, job: _Job) -> Any:
+        symbol = job.symbol
+        venue = symbol.exchange_id
+        self.polls[venue] = self.polls.get(venue, 0) + 1
+        if job.product == ProductEnum.OHLC:
+            ohlc = await client.get_ohlc(venue, symbol.symbol_type, TimeFrameEnum.MINUTE, base=symbol.base) or []
+            self._volatility.setdefault(symbol.id, _Volatility(self.cadence)).update(ohlc)
+            job.interval = self.ohlc_interval(symbol.id)
+            return ohlc
+        running_funding = await client.get_running_funding(venue, symbol.symbol_type, base=symbol.base)
+        job.interval = self.funding_interval(symbol, running_funding)
+        return running_funding
+
+    async def results(self) -> AsyncIterator[tuple[Symbol, ProductEnum, Any]]:
+        """Polls until the consumer stops iterating, yields every non empty result."""
+        loop = asyncio.get_running_loop()
+        counter = itertools.count()
+        due = [(loop.time(), next(counter), job) for job in self.jobs]
+        heapq.heapify(due)
+        done: asyncio.Queue[tuple[_Job, Any]] = asyncio.Queue()
+        tasks: set[asyncio.Task] = set()
+
+        async def run(job: _Job) -> None:
+            try:
+                result = await self._poll(job)
+            except Exception as e:
+                if not isinstance(e, NotImplementedError):
+                    logger.warning(f'Poll {job.symbol.id} {job.product.value}: {e!r}')
+                result = None
+            await done.put((job, result))
+
+        try:
+            while True:
+                now = loop.time()
+                while due and due[0][0] <= now:
+                    _, _, job = heapq.heappop(due)
+                    if (bucket := self._buckets.get(job.symbol.exchange_id)) is not None and not bucket.try_acquire():
+                        heapq.heappush(due, (now + bucket.wait_time(), next(counter), job))  # over budget
+                        continue
+                    task = asyncio.create_task(run(job))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                try:
+                    job, result = await asyncio.wait_for(done.get(), due[0][0] - now if due else None)
+                except asyncio.TimeoutError:
+                    continue
+                heapq.heappush(due, (loop.time() + job.interval, next(counter), job))
+                if result:
+                    yield job.symbol, job.product, result
+        finally:
+            for task in tasks:
+                task.cancel()
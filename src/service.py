@@ -0,0 +1,244 @@
+"""
+Local data service, one upstream fetch per tick no matter how many consumers ask.
+
+Serves the latest OHLC, funding and running funding per SymbolId over HTTP (TCP or unix socket) from the tick cache:
+
+    python -m src.service 8765              # or a unix socket path, e.g. /tmp/hb-data.sock
+
+    GET /symbols
+    GET /ohlc/<symbol_id>?timeframe=1
+    GET /ohlc/<symbol_id>/next?timeframe=1&after=<iso datetime>&timeout=30   # long-poll for newer closed candles
+    GET /ohlc/<symbol_id>/stream?timeframe=1                                 # newline delimited JSON, one per candle
+    GET /funding/<symbol_id>
+    GET /running_funding/<symbol_id>
+
+    service = ServiceClient(uds='/tmp/hb-data.sock')
+    ohlc = await service.get_ohlc(symbol_id, TimeFrameEnum.MINUTE)
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import sys
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import pendulum
+from loguru import logger
+from pydantic import BaseModel, parse_obj_as
+
+from src import client
+from src.enums import TimeFrameEnum
+from src.models import OHLC, FundingRate, Symbol, SymbolId
+from src.models.funding_rate import RunningFundingRate
+from src.tick_cache import TICK_CACHE, TickCache
+
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def _to_json(value: Any) -> bytes:
+    def default(o: Any) -> Any:
+        if isinstance(o, BaseModel):
+            return o.dict()
+        if isinstance(o, dt.datetime):
+            return o.isoformat()
+        raise TypeError(f'{type(o)} is not JSON serializable')
+
+    return json.dumps(value, default=default).encode()
+
+
+class HttpError(Exception):
+
+    def __init__(self, status: int, message: str = '') -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class DataService:
+
+    def __init__(self, cache: TickCache = TICK_CACHE, long_poll_timeout: float = 30.) -> None:
+        self.cache = cache
+        self.long_poll_timeout = long_poll_timeout
+
+    ##################
+    # Data
+    ##################
+    async def _shared(self, key: tuple, fetch: Callable[[], Any]) -> Any:
+        return await self.cache.get(('service',) + key, fetch)
+
+    async def ohlc(self, symbol: Symbol, timeframe: TimeFrameEnum) -> list[OHLC]:
+        return await self._shared(('ohlc', symbol.id, timeframe), lambda: client.get_ohlc(
+            symbol.exchange_id, symbol.symbol_type, timeframe, base=symbol.base)) or []
+
+    async def funding(self, symbol: Symbol) -> list[FundingRate]:
+        return await self._shared(('funding', symbol.id), lambda: client.get_funding(
+            symbol.exchange_id, symbol.symbol_type, base=symbol.base)) or []
+
+    async def running_funding(self, symbol: Symbol) -> RunningFundingRate | None:
+        return await self._shared(('running_funding', symbol.id), lambda: client.get_running_funding(
+            symbol.exchange_id, symbol.symbol_type, base=symbol.base))
+
+    async def next_ohlc(self, symbol: Symbol, timeframe: TimeFrameEnum, after: dt.datetime,
+                        timeout: float) -> list[OHLC]:
+        """Closed candles newer than after, waits (tick by tick) up to timeout for them."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            if newer := [ohlc for ohlc in await self.ohlc(symbol, timeframe) if ohlc.period > after]:
+                return newer
+            if (remaining := deadline - loop.time()) <= 0:
+                return []
+            await asyncio.sleep(min(remaining, self.cache.seconds_to_next_tick()))
+
+    async def last_closed(self, symbol: Symbol, timeframe: TimeFrameEnum) -> dt.datetime:
+        """Period of the latest closed candle, so the one open now is delivered by next_ohlc once it closes."""
+        if candles := await self.ohlc(symbol, timeframe):
+            return max(ohlc.period for ohlc in candles)
+        seconds = timeframe.value * 60
+        now = client.CLIENTS[symbol.exchange_id].now(symbol.symbol_type)
+        return pendulum.from_timestamp(now.int_timestamp // seconds * seconds - seconds)
+
+    ##################
+    # HTTP
+    ##################
+    @staticmethod
+    def _symbol(symbol_id: str) -> Symbol:
+        if not (symbols := client.SYMBOLS.find(id=symbol_id)):
+            raise HttpError(404, f'Unknown symbol {symbol_id}')
+        return symbols.get_one()
+
+    @staticmethod
+    def _timeframe(query: dict[str, str]) -> TimeFrameEnum:
+        try:
+            return TimeFrameEnum(int(query.get('timeframe', TimeFrameEnum.MINUTE.value)))
+        except ValueError:
+            raise HttpError(400, f'Unknown timeframe {query["timeframe"]}')
+
+    @staticmethod
+    def _after(query: dict[str, str]) -> dt.datetime:
+        try:
+            return pendulum.parse(query['after'])
+        except ValueError:
+            raise HttpError(400, f'Invalid after {query["after"]}')
+
+    def _timeout(self, query: dict[str, str]) -> float:
+        try:
+            return min(float(query.get('timeout', self.long_poll_timeout)), self.long_poll_timeout)
+        except ValueError:
+            raise HttpError(400, f'Invalid timeout {query["timeout"]}')
+
+    async def _route(self, path: str, query: dict[str, str], writer: asyncio.StreamWriter) -> Any:
+        match path.strip('/').split('/'):
+            case ['symbols']:
+                return sorted(client.SYMBOLS.get_all(), key=lambda symbol: symbol.id)
+            case ['ohlc', symbol_id]:
+                return await self.ohlc(self._symbol(symbol_id), self._timeframe(query))
+            case ['ohlc', symbol_id, 'next']:
+                symbol, timeframe = self._symbol(symbol_id), self._timeframe(query)
+                after = self._after(query) if 'after' in query else await self.last_closed(symbol, timeframe)
+                return await self.next_ohlc(symbol, timeframe, after, self._timeout(query))
+            case ['ohlc', symbol_id, 'stream']:
+                await self._stream_ohlc(self._symbol(symbol_id), self._timeframe(query), writer)
+                return None
+            case ['funding', symbol_id]:
+                return await self.funding(self._symbol(symbol_id))
+            case ['running_funding', symbol_id]:
+                return await self.running_funding(self._symbol(symbol_id))
+            case _:
+                raise HttpError(404, f'Unknown path {path}')
+
+    async def _stream_ohlc(self, symbol: Symbol, timeframe: TimeFrameEnum, writer: asyncio.StreamWriter) -> None:
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n')
+        try:
+            after = await self.last_closed(symbol, timeframe)
+            while not writer.is_closing():
+                for ohlc in (candles := await self.next_ohlc(symbol, timeframe, after, self.long_poll_timeout)):
+                    writer.write(_to_json(ohlc) + b'\n')
+                after = candles[-1].period if candles else after
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception as e:  # status line is already sent, the stream is just closed
+            logger.exception(e)
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, body: bytes) -> None:
+        writer.write(f'HTTP/1.1 {status} {STATUS[status]}\r\nContent-Type: application/json\r\n'
+                     f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode()
+            while (await reader.readline()).strip():  # headers are not needed
+                pass
+            try:
+                try:
+                    method, target, _ = request_line.split(' ', 2)
+                except ValueError:
+                    raise HttpError(400, f'Malformed request line {request_line.strip()}')
+                if method != 'GET':
+                    raise HttpError(405, method)
+                url = urlsplit(target)
+                result = await self._route(url.path, dict(parse_qsl(url.query)), writer)
+                if result is not None or not url.path.endswith('/stream'):
+                    self._respond(writer, 200, _to_json(result))
+            except HttpError as e:
+                self._respond(writer, e.status, _to_json({'error': str(e)}))
+            except Exception as e:
+                logger.exception(e)
+                self._respond(writer, 500, _to_json({'error': str(e)}))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, port: int | None = None, host: str = '127.0.0.1', path: str | None = None) -> None:
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        logger.info(f'Data service listening on {path or f"{host}:{port}"}')
+        async with server:
+            await server.serve_forever()
+
+
+class ServiceClient:
+    """Consumer side of DataService, returns the same models as src.client."""
+
+    def __init__(self, base_url: str = 'http://127.0.0.1:8765', uds: str | None = None) -> None:
+        self.base_url = 'http://data-service' if uds else base_url
+        self.transport = httpx.AsyncHTTPTransport(uds=uds) if uds else None
+
+    async def _get(self, path: str, params: dict[str, Any] = None, timeout: float = 10.) -> Any:
+        async with httpx.AsyncClient(base_url=self.base_url, transport=self.transport, timeout=timeout) as http:
+            response = await http.get(path, params=params)
+            response.raise_for_status()
+            return response.json()
+
+    async def get_ohlc(self, symbol_id: SymbolId, timeframe: TimeFrameEnum) -> list[OHLC]:
+        return parse_obj_as(list[OHLC], await self._get(f'/ohlc/{symbol_id}', {'timeframe': timeframe.value}))
+
+    async def wait_ohlc(self, symbol_id: SymbolId, timeframe: TimeFrameEnum, after: dt.datetime,
+                        timeout: float = 30.) -> list[OHLC]:
+        params = {'timeframe': timeframe.value, 'after': after.isoformat(), 'timeout': timeout}
+        response = await self._get(f'/ohlc/{symbol_id}/next', params, timeout=timeout + 10.)
+        return parse_obj_as(list[OHLC], response)
+
+    async def get_funding(self, symbol_id: SymbolId) -> list[FundingRate]:
+        return parse_obj_as(list[FundingRate], await self._get(f'/funding/{symbol_id}'))
+
+    async def get_running_funding(self, symbol_id: SymbolId) -> RunningFundingRate | None:
+        response = await self._get(f'/running_funding/{symbol_id}')
+        return RunningFundingRate.parse_obj(response) if response else None
+
+
+if __name__ == '__main__':
+    address = sys.argv[1] if len(sys.argv) > 1 else '8765'
+    service = DataService()
+    if address.isdigit():
+        asyncio.run(service.serve(port=int(address)))
+    else:
+        asyncio.run(service.serve(path=address))
@@ -0,0 +1,270 @@
+"""
+Polling of (venue, symbol) pairs sharded across worker processes on one host.
+
+Pairs are assigned to workers by consistent hashing, so a worker failure moves only its own pairs. Every worker has
+its own event loop, pooled clients and share of the venue rate limits; results come back over pipes.
+
+    with ShardedRunner(workers=4, products=(ProductEnum.RUNNING_FUNDING, ProductEnum.ORDERBOOK)) as runner:
+        async for result in runner.results():
+            ...
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from bisect import bisect, insort
+from multiprocessing.connection import Connection, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable, NamedTuple
+
+from loguru import logger
+
+from src.client import CLIENTS, SYMBOLS
+from src.enums import ExchangeEnum, ProductEnum, SymbolTypeEnum, TimeFrameEnum
+from src.exchanges.base import BaseExchange
+from src.models import Symbol, SymbolId
+from src.ratelimit import RATE_LIMITER, REQUESTS_PER_SECOND
+
+ShardKey = tuple[ExchangeEnum, SymbolId]
+
+PRODUCTS: dict[ProductEnum, Callable[[Any, Symbol], Awaitable[Any]]] = {
+    ProductEnum.OHLC: lambda venue, symbol: venue.get_ohlc(symbol.symbol_type, TimeFrameEnum.MINUTE, base=symbol.base),
+    ProductEnum.FUNDING: lambda venue, symbol: venue.get_funding(symbol.symbol_type, base=symbol.base),
+    ProductEnum.RUNNING_FUNDING: lambda venue, symbol: venue.get_running_funding(symbol.symbol_type, base=symbol.base),
+    ProductEnum.ORDERBOOK: lambda venue, symbol: venue.get_orderbook(symbol.symbol_type, base=symbol.base),
+    ProductEnum.TRADES: lambda venue, symbol: venue.get_trades(symbol.symbol_type, base=symbol.base),
+    ProductEnum.MARK_PRICE: lambda venue, symbol: venue.get_mark_price(symbol.symbol_type, base=symbol.base),
+    ProductEnum.OPEN_INTEREST: lambda venue, symbol: venue.get_open_interest(symbol.symbol_type, base=symbol.base),
+}
+PERP_ONLY = {ProductEnum.FUNDING, ProductEnum.RUNNING_FUNDING, ProductEnum.MARK_PRICE, ProductEnum.OPEN_INTEREST}
+# venue hooks BaseExchange leaves raising NotImplementedError, swallowed by logger.catch of its get_* methods
+HOOKS: dict[ProductEnum, tuple[str, str]] = {
+    ProductEnum.FUNDING: ('get_funding', '_parse_funding'),
+    ProductEnum.RUNNING_FUNDING: ('get_running_funding', '_parse_running_funding'),
+    ProductEnum.ORDERBOOK: ('get_orderbook', '_parse_orderbook'),
+    ProductEnum.TRADES: ('get_trades', '_parse_trades'),
+    ProductEnum.MARK_PRICE: ('get_mark_price', '_parse_mark_price'),
+    ProductEnum.OPEN_INTEREST: ('get_open_interest', '_parse_open_interest'),
+}
+
+
+def _overrides(venue: type[BaseExchange], name: str) -> bool:
+    return next(klass for klass in venue.__mro__ if name in vars(klass)) is not BaseExchange
+
+
+def supports(symbol: Symbol, product: ProductEnum) -> bool:
+    """False if the venue class of symbol leaves product to BaseExchange, whose get_* then only logs and returns."""
+    if product not in HOOKS:
+        return True
+    client = CLIENTS[symbol.exchange_id]
+    venues = [type(client)] if isinstance(client, BaseExchange) else [
+        type(venue) for venue in vars(type(client)).values()
+        if isinstance(venue, BaseExchange) and venue.SYMBOLS.find(id=symbol.id)]
+    return not venues or any(_overrides(venue, hook) for venue in venues for hook in HOOKS[product])
+
+
+class HashRing:
+    """Consistent hash ring, every node owns replicas points. Deterministic across processes and runs."""
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 64) -> None:
+        self.replicas = replicas
+        self._points: list[int] = []
+        self._owners: dict[int, Hashable] = {}
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+    @property
+    def nodes(self) -> set[Hashable]:
+        return set(self._owners.values())
+
+    def add(self, node: Hashable) -> None:
+        for replica in range(self.replicas):
+            point = self._hash(f'{node}#{replica}')
+            if point not in self._owners:
+                insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node: Hashable) -> None:
+        points = [point for point, owner in self._owners.items() if owner == node]
+        for point in points:
+            del self._owners[point]
+        self._points = [point for point in self._points if point in self._owners]
+
+    def node_for(self, key: str) -> Hashable:
+        if not self._points:
+            raise LookupError('Hash ring has no nodes.')
+        return self._owners[self._points[bisect(self._points, self._hash(key)) % len(self._points)]]
+
+    def assign(self, keys: Iterable[ShardKey]) -> dict[Hashable, list[ShardKey]]:
+        assignment = {node: [] for node in self.nodes}
+        for key in keys:
+            exchange_id, symbol_id = key
+            assignment[self.node_for(f'{exchange_id.value}:{symbol_id}')].append(key)
+        return assignment
+
+
+class ShardResult(NamedTuple):
+    worker: int
+    exchange_id: ExchangeEnum
+    symbol_id: SymbolId
+    product: ProductEnum
+    data: Any
+
+
+####################
+# Worker process
+####################
+def _worker(index: int, connection: Connection, products: tuple[ProductEnum, ...], interval: float,
+            share: float) -> None:
+    try:
+        asyncio.run(_work(index, connection, products, interval, share))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _work(index: int, connection: Connection, products: tuple[ProductEnum, ...], interval: float,
+                share: float) -> None:
+    RATE_LIMITER.configure(REQUESTS_PER_SECOND, share)
+    symbols: list[Symbol] = []
+    unsupported: set[tuple[SymbolId, ProductEnum]] = set()
+
+    async def poll(symbol: Symbol, product: ProductEnum) -> None:
+        try:
+            data = await PRODUCTS[product](CLIENTS[symbol.exchange_id], symbol)
+        except NotImplementedError:
+            unsupported.add((symbol.id, product))
+            return
+        if data:
+            connection.send(ShardResult(index, symbol.exchange_id, symbol.id, product, data))
+
+    async with BaseExchange.client_pool():
+        deadline = time.monotonic()
+        while True:
+            # control messages are handled while waiting for the next round
+            while await asyncio.to_thread(connection.poll, max(0., deadline - time.monotonic())):
+                match connection.recv():
+                    case ('assign', keys):
+                        symbols = [SYMBOLS.by_id(symbol_id) for _, symbol_id in keys]
+                        unsupported.update((symbol.id, product) for symbol in symbols for product in products
+                                           if not supports(symbol, product))
+                        logger.info(f'Shard {index} polls {len(symbols)} symbols')
+                    case ('budget', share):
+                        RATE_LIMITER.configure(REQUESTS_PER_SECOND, share)
+                    case ('stop',):
+                        return
+            deadline = time.monotonic() + interval
+            await asyncio.gather(*(poll(symbol, product) for symbol in symbols for product in products
+                                   if (symbol.id, product) not in unsupported
+                                   and not (product in PERP_ONLY and symbol.symbol_type == SymbolTypeEnum.SPOT)))
+
+
+####################
+# Parent process
+####################
+class ShardedRunner:
+
+    def __init__(self, keys: list[ShardKey] | None = None, workers: int | None = None,
+                 products: tuple[ProductEnum, ...] = (ProductEnum.RUNNING_FUNDING,), interval: float = 5.,
+                 respawn: bool = True) -> None:
+        self.keys = keys if keys is not None else sorted((symbol.exchange_id, symbol.id) for symbol in SYMBOLS)
+        self.workers = workers or os.cpu_count() or 1
+        self.products = products
+        self.interval = interval
+        self.respawn = respawn
+        self._ring = HashRing()
+        self._processes: dict[int, multiprocessing.Process] = {}
+        self._connections: dict[int, Connection] = {}
+        self._assigned: dict[int, list[ShardKey]] = {}
+        self._context = multiprocessing.get_context('spawn')
+
+    def __enter__(self) -> ShardedRunner:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def assignment(self) -> dict[int, list[ShardKey]]:
+        return dict(self._assigned)
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            self._spawn(index)
+        self._rebalance()
+
+    def stop(self, timeout: float = 5.) -> None:
+        for connection in self._connections.values():
+            try:
+                connection.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections.values():
+            connection.close()
+        self._processes.clear()
+        self._connections.clear()
+        self._assigned.clear()
+
+    def _spawn(self, index: int) -> None:
+        connection, child_connection = self._context.Pipe()
+        process = self._context.Process(target=_worker, name=f'shard-{index}', daemon=True,
+                                        args=(index, child_connection, self.products, self.interval,
+                                              1 / self.workers))
+        process.start()
+        child_connection.close()
+        self._processes[index] = process
+        self._connections[index] = connection
+        self._ring.add(index)
+
+    def _rebalance(self) -> None:
+        for index, keys in self._ring.assign(self.keys).items():
+            if keys != self._assigned.get(index):
+                self._connections[index].send(('assign', keys))
+                self._assigned[index] = keys
+
+    def _fail(self, index: int) -> None:
+        process = self._processes.pop(index)
+        self._connections.pop(index).close()
+        self._assigned.pop(index, None)
+        self._ring.remove(index)
+        process.join(0)
+        if process.is_alive():
+            process.terminate()
+        logger.warning(f'Shard {index} failed (exit code {process.exitcode}), rebalancing')
+        if self.respawn:
+            self._spawn(index)  # same ring points, its pairs return to it
+        elif self._connections:
+            for connection in self._connections.values():
+                connection.send(('budget', 1 / len(self._connections)))
+        if self._connections:
+            self._rebalance()
+
+    def receive(self, timeout: float | None = None) -> list[ShardResult]:
+        """Waits up to timeout for results, handles failed workers."""
+        results = []
+        indexes = {connection: index for index, connection in self._connections.items()}
+        for connection in wait(list(indexes), timeout):
+            try:
+                while connection.poll():
+                    results.append(connection.recv())
+            except (EOFError, OSError):
+                self._fail(indexes[connection])
+        for index, process in list(self._processes.items()):
+            if self._processes.get(index) is process and not process.is_alive():
+                self._fail(index)
+        return results
+
+    async def results(self, poll_timeout: float = 1.) -> AsyncIterator[ShardResult]:
+        while self._connections:
+            for result in await asyncio.to_thread(self.receive, poll_timeout):
+                yield result
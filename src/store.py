@@ -0,0 +1,353 @@
+"""
+On-disk OHLC and funding history with retention compaction.
+
+Every symbol has a directory per series (`ohlc_1`, `ohlc_60`, `ohlc_1440` by TimeFrameEnum, and `funding`), split
+into fixed time buckets. Appends land as small uncompressed codec segments (`<bucket>.<seq>.log`). Compaction rolls
+minute candles older than the retention up to hours and hours up to days, then rewrites every touched bucket as one
+sorted, deduplicated, zlib compressed segment (`<bucket>.z`) swapped in with os.replace:
+
+    store = CandleStore('data/history', Retention(minute=dt.timedelta(days=7), hour=dt.timedelta(days=365)))
+    store.append_ohlc(symbol_id, ohlc)
+    store.get_ohlc(symbol_id, start, end)                       # finest resolution still kept for each part of range
+    store.get_ohlc(symbol_id, start, end, TimeFrameEnum.HOUR)   # hourly, finer candles rolled up on the fly
+    asyncio.create_task(run_compaction(store))                  # worker thread, readers are never blocked
+
+Readers take no locks: new segments appear atomically and a reader that loses a race with compaction (a segment
+was merged and removed after listing) just lists the bucket again.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import itertools
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+import pendulum
+from loguru import logger
+
+from src.codec import FundingColumns, OhlcColumns, to_ms
+from src.enums import TimeFrameEnum
+from src.models import OHLC, FundingRate, SymbolId
+
+MINUTE_MS = 60_000
+DAY_MS = 1440 * MINUTE_MS
+SEGMENT_SPAN = {  # bucket length per series, multiples of a day so days never straddle buckets
+    TimeFrameEnum.MINUTE: DAY_MS,
+    TimeFrameEnum.HOUR: 32 * DAY_MS,
+    TimeFrameEnum.DAY: 366 * DAY_MS,
+}
+FUNDING_SPAN = 32 * DAY_MS
+LOG_SUFFIX = '.log'
+SEGMENT_SUFFIX = '.z'
+COMPRESSION_LEVEL = 6
+
+Columns = OhlcColumns | FundingColumns
+
+
+def rollup(columns: OhlcColumns, timeframe: TimeFrameEnum) -> OhlcColumns:
+    """Aggregates period sorted candles to (coarser) timeframe, buckets are aligned to the epoch."""
+    size = timeframe.value * MINUTE_MS
+    timestamps, opens, highs, lows, closes = [], [], [], [], []
+    for t, o, h, l, c in zip(columns.timestamp, columns.open, columns.high, columns.low, columns.close):
+        period = t - t % size
+        if timestamps and timestamps[-1] == period:
+            highs[-1] = max(highs[-1], h)
+            lows[-1] = min(lows[-1], l)
+            closes[-1] = c
+        else:
+            timestamps.append(period)
+            opens.append(o)
+            highs.append(h)
+            lows.append(l)
+            closes.append(c)
+    return OhlcColumns(timestamp=timestamps, open=opens, high=highs, low=lows, close=closes,
+                       symbol_id=columns.symbol_id, timeframe=timeframe)
+
+
+def _widen(stored: OhlcColumns, late: OhlcColumns) -> OhlcColumns:
+    """
+    Late rolled up candles merged into the stored ones of the same periods. Finer candles of a stored candle are gone,
+    so it is taken as spanning its whole period: it keeps its open and close, late candles only widen high and low.
+    """
+    held = {t: (o, h, l, c) for t, o, h, l, c in zip(stored.timestamp, stored.open, stored.high, stored.low,
+                                                    stored.close)}
+    rows = []
+    for t, o, h, l, c in zip(late.timestamp, late.open, late.high, late.low, late.close):
+        if (candle := held.get(t)) is not None:
+            o, h, l, c = candle[0], max(candle[1], h), min(candle[2], l), candle[3]
+        rows.append((t, o, h, l, c))
+    timestamps, opens, highs, lows, closes = (list(column) for column in zip(*rows)) if rows else ([],) * 5
+    return OhlcColumns(timestamp=timestamps, open=opens, high=highs, low=lows, close=closes,
+                       symbol_id=late.symbol_id, timeframe=late.timeframe)
+
+
+def _merge(parts: list[Columns], cls: type[Columns], start: int | None = None, end: int | None = None,
+           symbol_id: SymbolId | None = None, timeframe: TimeFrameEnum | None = None) -> Columns:
+    """Sorted union of parts within [start, end), later parts win for the same timestamp."""
+    rows = {}
+    for part in parts:
+        rows.update(zip(part.timestamp, zip(*(getattr(part, name) for name in cls.VALUES))))
+    timestamps = sorted(t for t in rows if (start is None or t >= start) and (end is None or t < end))
+    values = list(zip(*(rows[t] for t in timestamps))) or [()] * len(cls.VALUES)
+    return cls(timestamp=timestamps, symbol_id=symbol_id, timeframe=timeframe,
+               **{name: list(column) for name, column in zip(cls.VALUES, values)})
+
+
+@dataclass(frozen=True)
+class Retention:
+    minute: dt.timedelta | None = dt.timedelta(days=7)  # older minute candles are rolled up to hours
+    hour: dt.timedelta | None = dt.timedelta(days=365)  # older hour candles are rolled up to days
+
+
+class _Series:
+    """Bucketed segment directory of one symbol and series."""
+
+    _sequence = itertools.count()
+
+    def __init__(self, path: str, cls: type[Columns], span: int, symbol_id: SymbolId,
+                 timeframe: TimeFrameEnum | None = None) -> None:
+        self.path = path
+        self.cls = cls
+        self.span = span
+        self.symbol_id = symbol_id
+        self.timeframe = timeframe
+
+    def bucket(self, timestamp: int) -> int:
+        return timestamp - timestamp % self.span
+
+    def _files(self) -> dict[int, list[str]]:
+        """Segment names per bucket, compacted segment first, then logs in write order."""
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return {}
+        files = {}
+        for name in sorted(names, key=lambda name: (name.endswith(LOG_SUFFIX), name)):
+            if name.endswith((LOG_SUFFIX, SEGMENT_SUFFIX)):
+                files.setdefault(int(name.split('.', 1)[0]), []).append(name)
+        return files
+
+    def buckets(self) -> list[int]:
+        return sorted(self._files())
+
+    def _load(self, name: str) -> Columns | None:
+        try:
+            with open(os.path.join(self.path, name), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return self.cls.decode(zlib.decompress(data) if name.endswith(SEGMENT_SUFFIX) else data)
+
+    def _read_bucket(self, names: list[str]) -> list[Columns] | None:
+        """None when a segment vanished under compaction."""
+        parts = []
+        for name in names:
+            if (part := self._load(name)) is None:
+                return None
+            parts.append(part)
+        return parts
+
+    def read(self, start: int | None = None, end: int | None = None) -> Columns:
+        first = None if start is None else self.bucket(start)
+        while True:
+            parts = []
+            for bucket, names in sorted(self._files().items()):
+                if (first is not None and bucket < first) or (end is not None and bucket >= end):
+                    continue
+                if (bucket_parts := self._read_bucket(names)) is None:
+                    break
+                parts.extend(bucket_parts)
+            else:
+                return _merge(parts, self.cls, start, end, self.symbol_id, self.timeframe)
+
+    def _write(self, name: str, data: bytes) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, name)
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(f'{path}.tmp', path)
+
+    def append(self, columns: Columns) -> None:
+        """Writes one log segment per touched bucket."""
+        by_bucket: dict[int, list[int]] = {}
+        for i, t in enumerate(columns.timestamp):
+            by_bucket.setdefault(self.bucket(t), []).append(i)
+        for bucket, rows in by_bucket.items():
+            part = self.cls(timestamp=[columns.timestamp[i] for i in rows], symbol_id=self.symbol_id,
+                            timeframe=self.timeframe,
+                            **{name: [getattr(columns, name)[i] for i in rows] for name in self.cls.VALUES})
+            self._write(f'{bucket:013d}.{time.time_ns()}-{os.getpid()}-{next(self._sequence)}{LOG_SUFFIX}',
+                        part.encode())
+
+    def compact_bucket(self, bucket: int) -> int:
+        """Rewrites bucket as a single compressed segment, returns number of merged segments."""
+        names = self._files().get(bucket, [])
+        if len(names) < 2 and all(name.endswith(SEGMENT_SUFFIX) for name in names):
+            return 0
+        self.rewrite(bucket, self.take(bucket)[0], names)
+        return len(names)
+
+    def take(self, bucket: int) -> tuple[Columns, list[str]]:
+        """Merged content of bucket and its segment names (for removal once moved elsewhere)."""
+        names = self._files().get(bucket, [])
+        return _merge(self._read_bucket(names) or [], self.cls, symbol_id=self.symbol_id,
+                      timeframe=self.timeframe), names
+
+    def rewrite(self, bucket: int, columns: Columns, names: list[str]) -> None:
+        """Replaces segments names of bucket with columns as compacted segment."""
+        self._write(f'{bucket:013d}{SEGMENT_SUFFIX}', zlib.compress(columns.encode(), COMPRESSION_LEVEL))
+        self.remove(bucket, [name for name in names if name.endswith(LOG_SUFFIX)])
+
+    def remove(self, bucket: int, names: list[str] | None = None) -> None:
+        for name in self._files().get(bucket, []) if names is None else names:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+
+
+class CandleStore:
+
+    def __init__(self, path: str, retention: Retention = Retention()) -> None:
+        self.path = path
+        self.retention = retention
+        self._compacting = threading.Lock()
+
+    def _ohlc(self, symbol_id: SymbolId, timeframe: TimeFrameEnum) -> _Series:
+        return _Series(os.path.join(self.path, symbol_id, f'ohlc_{timeframe.value}'), OhlcColumns,
+                       SEGMENT_SPAN[timeframe], symbol_id, timeframe)
+
+    def _funding(self, symbol_id: SymbolId) -> _Series:
+        return _Series(os.path.join(self.path, symbol_id, 'funding'), FundingColumns, FUNDING_SPAN, symbol_id)
+
+    def symbol_ids(self) -> list[SymbolId]:
+        try:
+            return sorted(SymbolId(name) for name in os.listdir(self.path))
+        except FileNotFoundError:
+            return []
+
+    ##################
+    # Writing
+    ##################
+    def append_ohlc(self, symbol_id: SymbolId, ohlc: list[OHLC] | OhlcColumns,
+                    timeframe: TimeFrameEnum = TimeFrameEnum.MINUTE) -> None:
+        if not isinstance(ohlc, OhlcColumns):
+            ohlc = OhlcColumns.from_models(ohlc, symbol_id, timeframe)
+        if len(ohlc):
+            self._ohlc(symbol_id, timeframe).append(ohlc)
+
+    def append_funding(self, symbol_id: SymbolId, funding: list[FundingRate] | FundingColumns) -> None:
+        if not isinstance(funding, FundingColumns):
+            funding = FundingColumns.from_models(funding, symbol_id)
+        if len(funding):
+            self._funding(symbol_id).append(funding)
+
+    ##################
+    # Reading
+    ##################
+    def get_ohlc_columns(self, symbol_id: SymbolId, start: dt.datetime | None = None, end: dt.datetime | None = None,
+                         timeframe: TimeFrameEnum | None = None) -> OhlcColumns:
+        """
+        Candles with start <= period < end.
+
+        Without timeframe every part of the range comes at the finest resolution still kept (minutes for the recent
+        past, then hours, then days). With timeframe the stored candles of it are completed by finer ones rolled up
+        on the fly, coarser ones are not split.
+        """
+        start_ms = None if start is None else to_ms(start)
+        end_ms = None if end is None else to_ms(end)
+        if timeframe is not None:
+            size = timeframe.value * MINUTE_MS
+            aligned = None if start_ms is None else start_ms - start_ms % size
+            parts = [rollup(self._ohlc(symbol_id, finer).read(aligned, end_ms), timeframe)
+                     for finer in TimeFrameEnum if finer.value < timeframe.value]
+            parts.append(self._ohlc(symbol_id, timeframe).read(aligned, end_ms))  # stored candles win
+            return _merge(parts, OhlcColumns, start_ms, end_ms, symbol_id, timeframe)
+        parts = []
+        boundary = end_ms
+        for resolution in sorted(TimeFrameEnum, key=lambda tf: tf.value):
+            columns = self._ohlc(symbol_id, resolution).read(start_ms, boundary)
+            if len(columns):
+                parts.append(columns)
+                boundary = columns.timestamp[0]  # coarser data only before the finer one starts
+        return _merge(parts, OhlcColumns, start_ms, end_ms, symbol_id)
+
+    def get_ohlc(self, symbol_id: SymbolId, start: dt.datetime | None = None, end: dt.datetime | None = None,
+                 timeframe: TimeFrameEnum | None = None) -> list[OHLC]:
+        return self.get_ohlc_columns(symbol_id, start, end, timeframe).to_models()
+
+    def get_funding(self, symbol_id: SymbolId, start: dt.datetime | None = None,
+                    end: dt.datetime | None = None) -> list[FundingRate]:
+        return self._funding(symbol_id).read(None if start is None else to_ms(start),
+                                             None if end is None else to_ms(end)).to_models()
+
+    ##################
+    # Compaction
+    ##################
+    @staticmethod
+    def _cutoff(now: int, age: dt.timedelta | None) -> int | None:
+        if age is None:
+            return None
+        cutoff = now - int(age.total_seconds() * 1000)
+        return cutoff - cutoff % DAY_MS  # whole days only, so rolled up buckets are complete
+
+    def _roll(self, source: _Series, target: _Series, cutoff: int | None) -> int:
+        """Moves source candles older than cutoff to target (rolled up), returns number of moved candles."""
+        if cutoff is None:
+            return 0
+        moved = 0
+        for bucket in source.buckets():
+            if bucket >= cutoff:
+                break
+            columns, names = source.take(bucket)
+            older = _merge([columns], OhlcColumns, None, cutoff, source.symbol_id, source.timeframe)
+            if len(older):
+                rolled = rollup(older, target.timeframe)
+                stored = target.read(rolled.timestamp[0], rolled.timestamp[-1] + 1)  # late candles of rolled periods
+                target.append(_widen(stored, rolled))  # target first, readers may see both for a bit
+                moved += len(older)
+            if len(older) == len(columns):
+                source.remove(bucket, names)
+            else:
+                source.rewrite(bucket, _merge([columns], OhlcColumns, cutoff, None, source.symbol_id,
+                                              source.timeframe), names)
+        return moved
+
+    def compact_symbol(self, symbol_id: SymbolId, now: dt.datetime | None = None) -> dict[str, int]:
+        now = to_ms(now or pendulum.now('UTC'))
+        minute, hour, day = (self._ohlc(symbol_id, timeframe) for timeframe in
+                             (TimeFrameEnum.MINUTE, TimeFrameEnum.HOUR, TimeFrameEnum.DAY))
+        stats = {
+            'rolled_minutes': self._roll(minute, hour, self._cutoff(now, self.retention.minute)),
+            'rolled_hours': self._roll(hour, day, self._cutoff(now, self.retention.hour)),
+            'merged_segments': 0,
+        }
+        for series in (minute, hour, day, self._funding(symbol_id)):
+            for bucket in series.buckets():
+                stats['merged_segments'] += series.compact_bucket(bucket)
+        return stats
+
+    def compact(self, now: dt.datetime | None = None) -> dict[str, int]:
+        """Applies retention and merges segments of all the symbols, one compaction at a time."""
+        with self._compacting:
+            totals: dict[str, int] = {}
+            for symbol_id in self.symbol_ids():
+                for key, value in self.compact_symbol(symbol_id, now).items():
+                    totals[key] = totals.get(key, 0) + value
+            return totals
+
+
+async def run_compaction(store: CandleStore, interval: float = 3600.) -> None:
+    """Compacts store every interval seconds in a worker thread until cancelled."""
+    while True:
+        started = time.monotonic()
+        try:
+            stats = await asyncio.to_thread(store.compact)
+            logger.info(f'Compacted {store.path}: {stats}')
+        except Exception as e:
+            logger.exception(e)
+        await asyncio.sleep(max(0., interval - (time.monotonic() - started)))
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class TickCache:
+    """
+    Memoizes results of coroutines per key within one tick (wall clock aligned time slot).
+    Concurrent callers of the same key share single in-flight request.
+    """
+
+    def __init__(self, tick: dt.timedelta = dt.timedelta(seconds=5)) -> None:
+        self._tick = tick.total_seconds()
+        self._entries: dict[Hashable, tuple[int, asyncio.Future]] = {}
+
+    def _current_tick(self) -> int:
+        return int(time.time() // self._tick)
+
+    def seconds_to_next_tick(self) -> float:
+        return self._tick - time.time() % self._tick
+
+    async def get(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        tick = self._current_tick()
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != tick or entry[1].get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(factory())
+            future.add_done_callback(lambda f: self._evict_failed(key, f))
+            entry = self._entries[key] = (tick, future)
+        return await asyncio.shield(entry[1])
+
+    def _evict_failed(self, key: Hashable, future: asyncio.Future) -> None:
+        # failed or empty responses are not shared, next caller retries
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            if (entry := self._entries.get(key)) is not None and entry[1] is future:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+TICK_CACHE = TickCache()
@@ -0,0 +1,210 @@
+"""
+Tracing of (async) functions and code blocks.
+
+When disabled, traced calls cost one attribute lookup. When enabled, every span records wall clock time,
+event loop lag (delay of a callback scheduled at span start) and payload size (len of result),
+aggregates them per span name and logs them at the tracer level.
+
+    @classmethod
+    @trace
+    async def _fetch_something(cls, ...): ...
+
+    with span(cls, '_parse_something') as s:
+        ...
+        s.payload = len(raw)   # optional, overrides len of result
+
+Enable with `TRACER.enable('DEBUG')` or the HB_TRACE environment variable (level name).
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import time
+from collections.abc import Sized
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from loguru import logger
+
+
+class SpanStats:
+    __slots__ = ('count', 'total', 'max', 'lag_total', 'lag_max', 'payload_total', 'errors')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        self.lag_total = 0.
+        self.lag_max = 0.
+        self.payload_total = 0
+        self.errors = 0
+
+    def add(self, duration: float, lag: float | None, payload: int, error: bool) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if lag is not None:
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+        self.payload_total += payload
+        self.errors += error
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0.,
+            'max_ms': self.max * 1000,
+            'lag_max_ms': self.lag_max * 1000,
+            'payload': self.payload_total,
+            'errors': self.errors,
+        }
+
+
+def _span_name(owner: Any, name: str) -> str:
+    if owner is None:
+        return name
+    return f'{owner.__name__ if isinstance(owner, type) else type(owner).__name__}.{name}'
+
+
+def _payload_size(result: Any) -> int:
+    return len(result) if isinstance(result, Sized) else 0
+
+
+class _Span:
+    __slots__ = ('payload',)
+
+    def __init__(self) -> None:
+        self.payload = 0
+
+
+_DISABLED_SPAN = _Span()
+
+
+class _LagProbe:
+    """Measures how long callback scheduled now waits in the event loop queue."""
+    __slots__ = ('_scheduled', 'lag')
+
+    def __init__(self) -> None:
+        self.lag = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._scheduled = time.perf_counter()
+        loop.call_soon(self._fire)
+
+    def _fire(self) -> None:
+        self.lag = time.perf_counter() - self._scheduled
+
+
+class Tracer:
+
+    def __init__(self, level: str | None = None) -> None:
+        self.level = level
+        self.enabled = level is not None
+        self.stats: dict[str, SpanStats] = {}
+
+    def enable(self, level: str = 'DEBUG') -> None:
+        self.level = level
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def reset(self) -> None:
+        self.stats.clear()
+
+    def record(self, name: str, duration: float, lag: float | None, payload: int = 0, error: bool = False,
+               arguments: str | None = None) -> None:
+        if (stats := self.stats.get(name)) is None:
+            stats = self.stats[name] = SpanStats()
+        stats.add(duration, lag, payload, error)
+        logger.log(self.level, '{} {:.2f}ms lag {}ms payload {}{}{}', name, duration * 1000,
+                   '-' if lag is None else f'{lag * 1000:.2f}', payload, ' ERROR' if error else '',
+                   f' ({arguments})' if arguments else '')
+
+    @contextmanager
+    def span(self, owner: Any, name: str | None = None) -> Iterator[_Span]:
+        """Traces code block. Name is formatted from owner (class or instance) and name only when enabled."""
+        if not self.enabled:
+            yield _DISABLED_SPAN
+            return
+        name = _span_name(owner, name) if name else str(owner)
+        current = _Span()
+        probe = _LagProbe()
+        start = time.perf_counter()
+        error = False
+        try:
+            yield current
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, probe.lag, current.payload, error=error)
+
+    def trace(self, function: Callable | None = None, *, log_arguments: bool = False) -> Callable:
+        """Decorator for sync and async functions, use under @classmethod / @staticmethod."""
+        if function is None:
+            return functools.partial(self.trace, log_arguments=log_arguments)
+
+        signature = inspect.signature(function)
+        name = function.__name__
+
+        def describe(args: tuple, kwargs: dict) -> tuple[str, str | None]:
+            owner = args[0] if args and inspect.isclass(args[0]) else None
+            arguments = None
+            if log_arguments:
+                bound = signature.bind(*args, **kwargs).arguments
+                arguments = ', '.join(f'{key}={value!r}' for key, value in bound.items() if value is not owner)
+            return _span_name(owner, name), arguments
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await function(*args, **kwargs)
+                probe = _LagProbe()
+                start = time.perf_counter()
+                result, error = None, False
+                try:
+                    result = await function(*args, **kwargs)
+                    return result
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    self.record(*self._finish(describe(args, kwargs), start, probe.lag, result, error))
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            result, error = None, False
+            try:
+                result = function(*args, **kwargs)
+                return result
+            except BaseException:
+                error = True
+                raise
+            finally:
+                self.record(*self._finish(describe(args, kwargs), start, None, result, error))
+        return wrapper
+
+    @staticmethod
+    def _finish(description: tuple[str, str | None], start: float, lag: float | None, result: Any,
+                error: bool) -> tuple:
+        name, arguments = description
+        return name, time.perf_counter() - start, lag, _payload_size(result), error, arguments
+
+
+TRACER = Tracer(os.environ.get('HB_TRACE') or None)
+trace = TRACER.trace
+span = TRACER.span
@@ -0,0 +1,174 @@
+"""
+Public trades ingestion and candle building.
+
+Trades are kept compactly in columns (TradeTape). CandleBuilder turns trades into OHLC of any interval
+(including sub-minute ones); candle is closed right at the interval boundary, without waiting for venue klines.
+
+    async for candle in stream_candles(client.CLIENTS[ExchangeEnum.BINANCE], SymbolTypeEnum.PERP_USD,
+                                       dt.timedelta(seconds=15)):
+        ...
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import functools
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, AsyncIterator
+
+import pendulum
+
+from src.codec import to_ms
+from src.enums import SymbolTypeEnum, AssetEnum
+from src.models import OHLC
+from src.models.trade import Trade
+
+SIDES = {'buy': 1, 'sell': -1, None: 0}
+
+
+class TradeTape:
+    """Append only trade columns, timestamps in ms, side as +1 buy / -1 sell / 0 unknown."""
+
+    def __init__(self) -> None:
+        self.timestamps = array('q')
+        self.prices = array('d')
+        self.sizes = array('d')
+        self.sides = array('b')
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, trade: Trade) -> None:
+        self.timestamps.append(to_ms(trade.timestamp))
+        self.prices.append(trade.price)
+        self.sizes.append(trade.size)
+        self.sides.append(SIDES.get(trade.side, 0))
+
+    def extend(self, trades: list[Trade]) -> None:
+        for trade in trades:
+            self.append(trade)
+
+    def trim(self, before: dt.datetime) -> None:
+        """Drops trades older than before."""
+        i = bisect_left(self.timestamps, to_ms(before))
+        for column in (self.timestamps, self.prices, self.sizes, self.sides):
+            del column[:i]
+
+
+class CandleBuilder:
+    """Builds OHLC of given interval from time ordered trades."""
+
+    def __init__(self, interval: dt.timedelta) -> None:
+        self.interval_ms = int(interval.total_seconds() * 1000)
+        self._start: int | None = None
+        self._last_closed: int | None = None  # start of the latest emitted candle
+        self.late = 0  # trades of already closed candles, dropped
+        self._open = self._high = self._low = self._close = 0.
+
+    def _candle(self) -> OHLC:
+        return OHLC(period=pendulum.from_timestamp(self._start / 1000), open=self._open, high=self._high,
+                    low=self._low, close=self._close)
+
+    def add(self, trade: Trade) -> list[OHLC]:
+        """Adds trade, returns candle closed by it (if any)."""
+        timestamp = to_ms(trade.timestamp)
+        start = timestamp - timestamp % self.interval_ms
+        closed = []
+        if (self._start is not None and start < self._start) or (
+                self._last_closed is not None and start <= self._last_closed):
+            self.late += 1
+            return closed  # late trade of already closed candle
+        if self._start is not None and start > self._start:
+            closed.append(self._candle())
+            self._last_closed, self._start = self._start, None
+        if self._start is None:
+            self._start = start
+            self._open = self._high = self._low = self._close = trade.price
+        else:
+            self._high = max(self._high, trade.price)
+            self._low = min(self._low, trade.price)
+            self._close = trade.price
+        return closed
+
+    def close(self, now: dt.datetime) -> list[OHLC]:
+        """Closes current candle when its interval is over at now."""
+        if self._start is None or to_ms(now) < self._start + self.interval_ms:
+            return []
+        candle = self._candle()
+        self._last_closed, self._start = self._start, None
+        return [candle]
+
+    @property
+    def closes_at(self) -> dt.datetime | None:
+        """End of the current candle interval."""
+        return pendulum.from_timestamp((self._start + self.interval_ms) / 1000) if self._start is not None else None
+
+
+class TradeDeduplicator:
+    """Pages of recent trades overlap, passes only trades newer than already seen ones."""
+
+    def __init__(self) -> None:
+        self._last_ms = -1
+        self._last_keys: set[Any] = set()
+
+    def __call__(self, trades: list[Trade]) -> list[Trade]:
+        new = []
+        for trade in sorted(trades, key=lambda t: t.timestamp):
+            ms = to_ms(trade.timestamp)
+            key = trade.id or (trade.price, trade.size, trade.side)
+            if ms < self._last_ms or (ms == self._last_ms and key in self._last_keys):
+                continue
+            if ms > self._last_ms:
+                self._last_ms, self._last_keys = ms, set()
+            self._last_keys.add(key)
+            new.append(trade)
+        return new
+
+
+async def stream_trades(venue: Any, symbol_type: SymbolTypeEnum, poll_interval: float = 1.,
+                        base: AssetEnum = AssetEnum.BTC) -> AsyncIterator[list[Trade]]:
+    """Polls venue recent trades, yields new (deduplicated) trades."""
+    deduplicate = TradeDeduplicator()
+    while True:
+        started = time.monotonic()
+        if trades := deduplicate(await venue.get_trades(symbol_type, base=base) or []):
+            yield trades
+        await asyncio.sleep(max(0., poll_interval - (time.monotonic() - started)))
+
+
+async def stream_candles(venue: Any, symbol_type: SymbolTypeEnum, interval: dt.timedelta,
+                         poll_interval: float = 1., base: AssetEnum = AssetEnum.BTC,
+                         tape: TradeTape | None = None) -> AsyncIterator[OHLC]:
+    """
+    Yields candles built from polled trades. Candle is closed at its interval boundary (plus one poll interval for
+    the last trades to arrive), not when the first trade of the next interval comes.
+    """
+    builder = CandleBuilder(interval)
+    queue: asyncio.Queue[list[Trade]] = asyncio.Queue()
+    now = functools.partial(venue.now, symbol_type)  # trade timestamps are in venue time
+
+    async def poll() -> None:
+        async for trades in stream_trades(venue, symbol_type, poll_interval, base):
+            await queue.put(trades)
+
+    poller = asyncio.create_task(poll())
+    try:
+        while True:
+            timeout = None
+            if builder.closes_at is not None:
+                timeout = max(0., (builder.closes_at - now()).total_seconds() + poll_interval)
+            try:
+                trades = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                for candle in builder.close(now()):
+                    yield candle
+                continue
+            if tape is not None:
+                tape.extend(trades)
+            for trade in trades:
+                for candle in builder.add(trade):
+                    yield candle
+    finally:
+        poller.cancel()
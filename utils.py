@@ -7,7 +7,9 @@ from statistics import median
 
 from loguru import logger
 
+from src.enums import ExchangeEnum
 from src.models import OHLC
+from src.quality import VenueQuality
 
 def btc_to_sat(amount: float) -> int:
     return int(amount*100_000_000)
@@ -44,10 +46,16 @@ def get_median_ohlc(ohlc: list[OHLC]) -> list[OHLC]:
     return sort_ohlc([median_for_period(period) for period in sort_ohlc_to_periods(ohlc).values()])
 
 
+def get_quality_median_ohlc(ohlc_by_venue: dict[ExchangeEnum, list[OHLC]], quality: VenueQuality) -> list[OHLC]:
+    """Same as get_median_ohlc, but outlier candles are dropped and venues weighted by their quality score."""
+    return quality.median_ohlc(ohlc_by_venue)
+
+
 
 def debug_func(decorated_function):
     """
     Function decorator logging entry + exit and parameters and result of functions.
+    For coroutines and hot paths use src.tracing.trace which costs nothing when disabled.
 
     """
 